@@ -0,0 +1,72 @@
+"""Validation rules for contact submissions, shared by the API models and ``import_contacts.py``.
+
+Each rule checks a single value for the models and a whole pandas column at
+once for the importer, with the same limits and error messages.
+"""
+
+from dataclasses import dataclass
+from typing import Literal, Optional, get_args
+
+# Review workflow of a submission
+ContactStatus = Literal["new", "reviewed", "responded"]
+CONTACT_STATUSES = get_args(ContactStatus)
+
+INTERESTS = (
+    "Learning about products",
+    "Partnership opportunities",
+    "Joining the community",
+    "Research collaboration",
+    "Bulk orders",
+    "Other",
+)
+INTEREST_ERROR = f'Interest must be one of: {", ".join(INTERESTS)}'
+
+
+@dataclass(frozen=True)
+class TextRule:
+    """Surrounding whitespace is stripped, then the length must be within the limits."""
+
+    label: str
+    max_length: int
+    min_length: int = 0
+
+    @property
+    def too_short(self) -> str:
+        return f"{self.label} must be at least {self.min_length} characters long"
+
+    @property
+    def too_long(self) -> str:
+        return f"{self.label} must be less than {self.max_length} characters"
+
+    def check(self, value: str) -> str:
+        value = value.strip()
+        if len(value) < self.min_length:
+            raise ValueError(self.too_short)
+        if len(value) > self.max_length:
+            raise ValueError(self.too_long)
+        return value
+
+    def check_column(self, column):
+        """``column`` (a pandas Series of strings) stripped, with masks of the values too short and too long.
+
+        Missing values are neither.
+        """
+        stripped = column.str.strip()
+        lengths = stripped.str.len()
+        return stripped, lengths < self.min_length, lengths > self.max_length
+
+
+NAME = TextRule("Name", max_length=100, min_length=2)
+ORGANIZATION = TextRule("Organization", max_length=100)
+MESSAGE = TextRule("Message", max_length=1000, min_length=10)
+
+
+def check_interest(value: Optional[str]) -> Optional[str]:
+    if value and value not in INTERESTS:
+        raise ValueError(INTEREST_ERROR)
+    return value
+
+
+def check_interest_column(column):
+    """Mask of the values of ``column`` that are not allowed; missing and empty values are."""
+    return column.notna() & (column != "") & ~column.isin(INTERESTS)
@@ -0,0 +1,153 @@
+"""In-process fan-out of change events to Server-Sent Events clients.
+
+Events are encoded into SSE frames once, when published, and then handed to
+every subscriber as the same bytes. The most recent events are kept so that a
+reconnecting client can resume from its ``Last-Event-ID``; a client that
+asks for an event no longer kept gets a ``reset`` event, meaning it should
+reload what it shows.
+"""
+
+import asyncio
+import uuid
+from collections import deque
+from typing import Deque, Dict, Optional, Set, Tuple
+
+import fast_json
+
+
+class SlowSubscriberError(Exception):
+    """The subscriber fell too far behind and was dropped."""
+
+
+class SubscriberLimitError(Exception):
+    """The broker already serves as many subscribers as it may."""
+
+
+def sse_frame(event_id: Optional[str], event: str, data: bytes) -> bytes:
+    """One SSE event; ``data`` is compact JSON, so it holds no line breaks."""
+    head = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{head}event: {event}\ndata: ".encode() + data + b"\n\n"
+
+
+class Subscription:
+    """Frames waiting to be sent to one client, at most ``limit`` of them."""
+
+    def __init__(self, limit: int, first: bytes = b""):
+        self.limit = limit
+        self.dropped = False
+        self._first = first
+        self._frames: Deque[bytes] = deque()
+        self._wakeup = asyncio.Event()
+
+    def _push(self, frame: bytes) -> bool:
+        if len(self._frames) >= self.limit:
+            # Keeping up with a client that does not read would only grow memory
+            self.dropped = True
+            self._frames.clear()
+            self._wakeup.set()
+            return False
+        self._frames.append(frame)
+        self._wakeup.set()
+        return True
+
+    async def get(self, timeout: float) -> bytes:
+        """All frames queued so far, waiting up to ``timeout`` seconds for one (``b""`` if none came)."""
+        if self._first:
+            first, self._first = self._first, b""
+            return first
+        if not self._frames and not self.dropped:
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                return b""
+        if self.dropped:
+            raise SlowSubscriberError()
+        frames = b"".join(self._frames)
+        self._frames.clear()
+        return frames
+
+
+class EventBroker:
+    """Publishes events to every subscriber and keeps the last ``replay_size`` for resuming.
+
+    Event ids are ``<generation>-<sequence>`` unless the publisher supplies
+    its own (e.g. change stream resume tokens, which every worker agrees on).
+    Ids from another generation, i.e. from before a restart, cannot be
+    resumed from. Each subscriber buffers at most ``client_buffer`` frames.
+    """
+
+    def __init__(self, replay_size: int = 1000, client_buffer: int = 256, max_subscribers: int = 10000):
+        self.replay_size = replay_size
+        self.client_buffer = client_buffer
+        self.max_subscribers = max_subscribers
+        self.generation = uuid.uuid4().hex[:8]
+        self.published = 0
+        self.dropped = 0
+        self.resets = 0
+        self._sequence = 0
+        self._last_id = ""
+        # (sequence, frame) of recent events, and the sequence of each of their ids
+        self._recent: Deque[Tuple[int, bytes]] = deque()
+        self._sequences: Dict[str, int] = {}
+        self._ids: Deque[str] = deque()
+        self._subscribers: Set[Subscription] = set()
+
+    def __len__(self) -> int:
+        return len(self._subscribers)
+
+    def publish(self, event: str, data: dict, event_id: Optional[str] = None) -> str:
+        self._sequence += 1
+        event_id = event_id or f"{self.generation}-{self._sequence}"
+        frame = sse_frame(event_id, event, fast_json.dumps(data))
+        self.published += 1
+        self._last_id = event_id
+        if self.replay_size > 0:
+            if len(self._recent) >= self.replay_size:
+                self._recent.popleft()
+                self._sequences.pop(self._ids.popleft(), None)
+            self._recent.append((self._sequence, frame))
+            self._sequences[event_id] = self._sequence
+            self._ids.append(event_id)
+        dropped = [subscriber for subscriber in self._subscribers if not subscriber._push(frame)]
+        for subscriber in dropped:
+            self._subscribers.discard(subscriber)
+        self.dropped += len(dropped)
+        return event_id
+
+    def subscribe(self, last_event_id: Optional[str] = None) -> Subscription:
+        """Subscribe to events published from now on, after those since ``last_event_id``.
+
+        Raises ``SubscriberLimitError`` when ``max_subscribers`` are connected.
+        """
+        if len(self._subscribers) >= self.max_subscribers:
+            raise SubscriberLimitError()
+        first = b""
+        if last_event_id:
+            sequence = self._sequences.get(last_event_id)
+            if sequence is None:
+                self.resets += 1
+                first = sse_frame(self._last_id, "reset", b"{}")
+            else:
+                first = b"".join(frame for position, frame in self._recent if position > sequence)
+        subscription = Subscription(self.client_buffer, first)
+        self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        self._subscribers.discard(subscription)
+
+    def close(self) -> None:
+        """Disconnect every subscriber."""
+        for subscription in self._subscribers:
+            subscription.dropped = True
+            subscription._wakeup.set()
+        self._subscribers.clear()
+
+    def stats(self) -> dict:
+        return {
+            "subscribers": len(self._subscribers),
+            "published": self.published,
+            "dropped": self.dropped,
+            "resets": self.resets,
+        }
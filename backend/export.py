@@ -0,0 +1,130 @@
+"""Streaming CSV and Parquet exports.
+
+Both encoders consume documents as the repository yields them and emit
+bytes as they go, so memory use depends on the batch size, not on how many
+rows are exported.
+"""
+
+import csv
+import io
+import logging
+from datetime import datetime
+from typing import AsyncIterator, Dict, List, Sequence
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # optional dependency, only needed for Parquet exports
+    pa = None
+    pq = None
+
+logger = logging.getLogger(__name__)
+
+# Spreadsheet apps run cells starting with these as formulas
+FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+def _csv_value(value) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    value = str(value)
+    if value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+async def csv_chunks(documents: AsyncIterator[dict], fields: Sequence[str], rows_per_chunk: int = 500) -> AsyncIterator[bytes]:
+    """Encode documents as CSV with a header row, ``rows_per_chunk`` rows per yielded chunk."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(fields)
+    rows = 0
+    try:
+        async for document in documents:
+            writer.writerow([_csv_value(document.get(field)) for field in fields])
+            rows += 1
+            if rows % rows_per_chunk == 0:
+                yield buffer.getvalue().encode()
+                buffer.seek(0)
+                buffer.truncate()
+    except Exception as e:
+        # Headers are already sent, so the client only sees a truncated file
+        logger.error(f"CSV export failed after {rows} rows: {str(e)}")
+    yield buffer.getvalue().encode()
+
+
+class _ChunkSink:
+    """Write-only file object that hands written bytes back to the caller."""
+
+    def __init__(self):
+        self.chunks: List[bytes] = []
+        self.position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self.chunks.append(data)
+        self.position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.position
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def parquet_available() -> bool:
+    return pa is not None
+
+
+def arrow_schema(fields: Sequence[str], timestamps: Sequence[str] = (), integers: Sequence[str] = ()) -> "pa.Schema":
+    """String columns, except microsecond timestamps and 64-bit integers for the fields named."""
+    def column_type(field):
+        if field in timestamps:
+            return pa.timestamp("us")
+        return pa.int64() if field in integers else pa.string()
+    return pa.schema([(field, column_type(field)) for field in fields])
+
+
+async def parquet_chunks(documents: AsyncIterator[dict], schema: "pa.Schema", rows_per_group: int = 10000) -> AsyncIterator[bytes]:
+    """Encode documents as Parquet, one row group per ``rows_per_group`` documents.
+
+    Rows are collected column by column and written as a record batch; the
+    bytes of each row group are yielded as soon as it is written, and the
+    footer after the last one.
+    """
+    if pa is None:
+        raise RuntimeError("Parquet export requires pyarrow (pip install pyarrow)")
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema, compression="snappy")
+    columns: Dict[str, list] = {name: [] for name in schema.names}
+    rows = 0
+    try:
+        async for document in documents:
+            for name, values in columns.items():
+                values.append(document.get(name))
+            rows += 1
+            if rows % rows_per_group == 0:
+                writer.write_batch(pa.record_batch(list(columns.values()), schema=schema))
+                columns = {name: [] for name in schema.names}
+                yield sink.drain()
+        if rows % rows_per_group:
+            writer.write_batch(pa.record_batch(list(columns.values()), schema=schema))
+    except Exception as e:
+        # Without its footer the file is unreadable, which the client will notice
+        logger.error(f"Parquet export failed after {rows} rows: {str(e)}")
+        yield sink.drain()
+        return
+    writer.close()
+    yield sink.drain()
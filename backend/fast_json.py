@@ -0,0 +1,30 @@
+"""Direct JSON encoding of trusted stored documents.
+
+Documents read back from the datastore were validated on write, so the read
+endpoints serialize them straight to bytes instead of rebuilding pydantic
+models. orjson is used when installed; the stdlib fallback produces the same
+output, only slower.
+"""
+
+import json
+from datetime import datetime
+
+try:
+    import orjson
+except ImportError:  # optional speed-up
+    orjson = None
+
+
+def _default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content) -> bytes:
+    """Compact UTF-8 JSON, byte-for-byte what FastAPI's JSONResponse renders
+    for the same data after pydantic serialization (naive datetimes as ISO 8601).
+    """
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":"), default=_default).encode("utf-8")
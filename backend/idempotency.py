@@ -0,0 +1,60 @@
+"""Duplicate suppression for contact submissions.
+
+A submission is deduplicated on its ``Idempotency-Key`` header when the
+client sends one, otherwise (optionally) on a hash of its email and message
+within a short window. Keys are claimed in the datastore, which is shared by
+all workers, and recently seen keys are also remembered in a bounded
+in-process LRU so that repeats are answered without a database round trip.
+"""
+
+import hashlib
+import json
+from collections import OrderedDict
+from datetime import datetime
+from typing import Optional
+
+
+def request_fingerprint(data: dict) -> str:
+    """Hash of the normalised request body, to detect a key reused for a different request."""
+    canonical = json.dumps(data, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def header_key(value: str) -> str:
+    return "key:" + hashlib.sha256(value.encode()).hexdigest()
+
+
+def content_key(email: str, message: str) -> str:
+    return "content:" + hashlib.sha256(f"{email.lower()}\n{message}".encode()).hexdigest()
+
+
+class RecentKeys:
+    """Bounded LRU of claimed keys; entries expire with their claim."""
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, dict]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[dict]:
+        record = self._entries.get(key)
+        if record is None:
+            return None
+        if record["expires_at"] <= datetime.utcnow():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return record
+
+    def put(self, key: str, record: dict) -> None:
+        if self.max_entries <= 0:
+            return
+        self._entries[key] = record
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def discard(self, key: str) -> None:
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
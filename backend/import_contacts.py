@@ -0,0 +1,333 @@
+"""Import contact submissions in bulk from CSV or JSON Lines files, e.g. leads from partner spreadsheets.
+
+Run from the repository root (or the backend directory, as ``python
+import_contacts.py``) with the same environment as the API:
+
+    python -m backend.import_contacts leads.csv
+    python -m backend.import_contacts leads.jsonl --rejects leads-rejected.csv
+
+Files are read a chunk at a time and validated with the API's own rules
+(``contact_rules``) as pandas column operations; valid rows are stored with
+unordered bulk inserts. Rejected rows are written with their row number and
+reasons to a side file, ``<input>.rejected.csv`` unless ``--rejects`` says
+otherwise.
+
+Columns are those of the contact form (name, email, organization, interest,
+message) plus optional ``id`` (re-importing a file with ids rejects the rows
+already stored instead of duplicating them), ``submitted_at`` (ISO 8601,
+UTC unless it has an offset; defaults to the import time) and ``status``
+(defaults to new). Other columns are ignored. Imported submissions are
+counted in the analytics rollup but do not send notification emails.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import time
+import multiprocessing
+import uuid
+from collections import Counter
+from concurrent.futures import Executor, ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+ROOT_DIR = Path(__file__).resolve().parent
+# The backend modules import each other as top-level modules
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+import pandas as pd  # noqa: E402
+from dotenv import load_dotenv  # noqa: E402
+from pydantic.networks import validate_email  # noqa: E402
+from pydantic_core import PydanticCustomError  # noqa: E402
+
+from contact_rules import (  # noqa: E402
+    CONTACT_STATUSES,
+    INTEREST_ERROR,
+    MESSAGE,
+    NAME,
+    ORGANIZATION,
+    check_interest_column,
+)
+from storage import INITIAL_VERSION, BulkInsertError, contact_stats_deltas, engine_from_env  # noqa: E402
+
+load_dotenv(ROOT_DIR / '.env')
+
+FORMATS = ("csv", "jsonl")
+COLUMNS = ("id", "name", "email", "organization", "interest", "message", "submitted_at", "status")
+REQUIRED_COLUMNS = ("name", "email", "message")
+STATUS_ERROR = f"Status must be one of: {', '.join(CONTACT_STATUSES)}"
+# Distinct addresses per task for the email validation processes
+EMAIL_SHARD_SIZE = 2000
+
+
+def read_chunks(path: Path, file_format: str, chunk_size: int) -> Iterator[pd.DataFrame]:
+    """The rows of ``path`` as DataFrames of up to ``chunk_size`` rows, indexed by row number from 1.
+
+    JSON Lines that do not hold an object come back as rows with only a
+    ``_error`` column.
+    """
+    if file_format == "csv":
+        # Every cell as a string; only empty cells are missing
+        reader = pd.read_csv(path, dtype=str, keep_default_na=False, na_values=[""], chunksize=chunk_size)
+        for chunk in reader:
+            chunk.index += 1
+            yield chunk
+        return
+    with open(path, encoding="utf-8") as lines:
+        row = 0
+        records = []
+        for line in lines:
+            if not line.strip():
+                continue
+            row += 1
+            try:
+                record = json.loads(line)
+                if not isinstance(record, dict):
+                    raise ValueError("expected a JSON object")
+            except ValueError as e:
+                record = {"_error": f"Invalid JSON: {e}"}
+            records.append(record)
+            if len(records) == chunk_size:
+                yield pd.DataFrame(records, index=range(row - len(records) + 1, row + 1), dtype=object)
+                records = []
+        if records:
+            yield pd.DataFrame(records, index=range(row - len(records) + 1, row + 1), dtype=object)
+
+
+def _validate_emails(values: List[str]) -> Tuple[Dict[str, str], Dict[str, str]]:
+    """Each valid address normalised as ``EmailStr`` does, and the error of each invalid one."""
+    normalised, errors = {}, {}
+    for value in values:
+        try:
+            normalised[value] = validate_email(value)[1]
+        except PydanticCustomError as e:
+            errors[value] = e.message()
+    return normalised, errors
+
+
+def _email_column(column: pd.Series, pool: Optional[Executor] = None) -> Tuple[pd.Series, pd.Series]:
+    """The normalised addresses, and the error of each invalid one (None for valid ones).
+
+    Each distinct address is validated once per chunk; with a process
+    ``pool`` they are split between its workers, as checking the domain is
+    by far the slowest rule.
+    """
+    values = list(column.dropna().unique())
+    if pool is None or len(values) <= EMAIL_SHARD_SIZE:
+        normalised, errors = _validate_emails(values)
+    else:
+        normalised, errors = {}, {}
+        shards = [values[start:start + EMAIL_SHARD_SIZE] for start in range(0, len(values), EMAIL_SHARD_SIZE)]
+        for shard_normalised, shard_errors in pool.map(_validate_emails, shards):
+            normalised.update(shard_normalised)
+            errors.update(shard_errors)
+    return column.map(normalised), column.map(errors)
+
+
+def rejected_rows(chunk: pd.DataFrame, rows, errors) -> pd.DataFrame:
+    """The known columns of ``rows`` of a chunk, preceded by their row number and ``errors``."""
+    rejected = chunk.loc[rows, [name for name in COLUMNS if name in chunk]]
+    rejected.insert(0, "errors", list(errors))
+    rejected.insert(0, "row", rejected.index)
+    return rejected
+
+
+def validate_chunk(chunk: pd.DataFrame, now: datetime,
+                   email_pool: Optional[Executor] = None) -> Tuple[List[dict], pd.Index, pd.DataFrame]:
+    """Split a chunk into the documents to store (and their rows) and the rejected rows with their ``errors``."""
+    reasons = pd.Series("", index=chunk.index, dtype=object)
+
+    def reject(mask: pd.Series, message) -> None:
+        nonlocal reasons
+        reasons = reasons.where(~mask, reasons + message + "; ")
+
+    if "_error" in chunk:
+        reject(chunk["_error"].notna(), chunk["_error"])
+    columns = {}
+    for name in COLUMNS:
+        column = chunk[name] if name in chunk else pd.Series(None, index=chunk.index, dtype=object)
+        if pd.api.types.infer_dtype(column, skipna=True) not in ("string", "empty"):
+            # JSON numbers, lists and the like are not strings and fail like they would in the API
+            not_string = column.notna() & ~column.map(lambda value: isinstance(value, str))
+            reject(not_string, f"{name}: Input should be a valid string")
+            column = column.where(~not_string)
+        columns[name] = column.astype(object)
+    for name in REQUIRED_COLUMNS:
+        reject(columns[name].isna(), f"{name}: Field required")
+
+    document = pd.DataFrame(index=chunk.index)
+    for name, rule in (("name", NAME), ("message", MESSAGE), ("organization", ORGANIZATION)):
+        stripped, too_short, too_long = rule.check_column(columns[name])
+        reject(too_short, f"{name}: {rule.too_short}")
+        reject(too_long, f"{name}: {rule.too_long}")
+        document[name] = stripped
+    # An empty organization is stored as None, one of spaces as an empty string
+    organization = columns["organization"]
+    document["organization"] = document["organization"].where(organization.notna() & (organization != ""), None)
+    reject(check_interest_column(columns["interest"]), f"interest: {INTEREST_ERROR}")
+    document["interest"] = columns["interest"].where(columns["interest"].notna(), None)
+
+    email, email_errors = _email_column(columns["email"], email_pool)
+    reject(email_errors.notna(), "email: " + email_errors.fillna(""))
+    document["email"] = email
+
+    submitted_at = pd.to_datetime(columns["submitted_at"], utc=True, errors="coerce", format="ISO8601")
+    reject(columns["submitted_at"].notna() & submitted_at.isna(), "submitted_at: Input should be an ISO 8601 datetime")
+    status = columns["status"].where(columns["status"].notna() & (columns["status"] != ""), "new")
+    reject(~status.isin(CONTACT_STATUSES), f"status: {STATUS_ERROR}")
+
+    accepted = reasons == ""
+    document = document[accepted]
+    ids = columns["id"][accepted].copy()
+    missing_ids = ids.isna() | (ids == "")
+    ids[missing_ids] = [str(uuid.uuid4()) for _ in range(int(missing_ids.sum()))]
+    times = submitted_at[accepted].dt.tz_convert(None)
+    documents = [
+        {
+            "id": document_id,
+            "name": name,
+            "email": address,
+            "organization": organization,
+            "interest": interest,
+            "message": message,
+            "submitted_at": now if pd.isna(timestamp) else timestamp.to_pydatetime(),
+            "status": document_status,
+            "version": INITIAL_VERSION,
+        }
+        for document_id, name, address, organization, interest, message, timestamp, document_status in zip(
+            ids, document["name"], document["email"], document["organization"], document["interest"],
+            document["message"], times, status[accepted],
+        )
+    ]
+    return documents, document.index, rejected_rows(chunk, ~accepted, reasons[~accepted].str[:-2])
+
+
+class Importer:
+    """Stores validated documents ``batch_size`` at a time and writes rejected rows to ``rejects_path``.
+
+    Without a datastore rows are only validated.
+    """
+
+    def __init__(self, datastore, rejects_path: Path, batch_size: int):
+        self.datastore = datastore
+        self.rejects_path = rejects_path
+        self.batch_size = batch_size
+        self.rows = 0
+        self.imported = 0
+        self.rejected = 0
+
+    def write_rejects(self, rejected: pd.DataFrame) -> None:
+        if rejected.empty:
+            return
+        header = self.rejected == 0
+        rejected.to_csv(self.rejects_path, mode="w" if header else "a", header=header, index=False)
+        self.rejected += len(rejected)
+
+    async def store(self, documents: List[dict]) -> Dict[int, str]:
+        """Insert ``documents``; returns the error of each one the datastore refused (e.g. as already stored) by position."""
+        refused = {}
+        for start in range(0, len(documents), self.batch_size):
+            batch = documents[start:start + self.batch_size]
+            try:
+                await self.datastore.contacts.insert_many(batch)
+                stored = batch
+            except BulkInsertError as e:
+                refused.update((start + index, f"id: {error}") for index, error in e.failed.items())
+                stored = [document for index, document in enumerate(batch) if index not in e.failed]
+            deltas = Counter()
+            for document in stored:
+                deltas.update(contact_stats_deltas(document))
+            if deltas:
+                await self.datastore.contact_stats.increment(dict(deltas))
+            self.imported += len(stored)
+        return refused
+
+    async def import_chunk(self, chunk: pd.DataFrame, documents: List[dict], rows: pd.Index,
+                           rejected: pd.DataFrame) -> None:
+        """Store a validated chunk and write its rejected rows."""
+        self.rows += len(chunk)
+        if self.datastore is None:
+            self.imported += len(documents)
+        else:
+            refused = await self.store(documents)
+            if refused:
+                refused_rows = rejected_rows(chunk, rows[list(refused)], refused.values())
+                rejected = pd.concat([rejected, refused_rows]).sort_values("row")
+        self.write_rejects(rejected)
+
+
+def next_validated(chunks: Iterator[pd.DataFrame], email_pool: Optional[Executor]) -> Optional[tuple]:
+    """Read and validate the next chunk: ``(chunk, documents, rows, rejected)``, or None at the end."""
+    chunk = next(chunks, None)
+    if chunk is None:
+        return None
+    return (chunk, *validate_chunk(chunk, datetime.utcnow(), email_pool))
+
+
+def detect_format(path: Path, file_format: Optional[str]) -> str:
+    if file_format:
+        return file_format
+    return "jsonl" if path.suffix.lower() in (".jsonl", ".ndjson", ".json") else "csv"
+
+
+async def main(args) -> None:
+    path = Path(args.path)
+    file_format = detect_format(path, args.format)
+    rejects_path = Path(args.rejects) if args.rejects else path.with_name(path.name + ".rejected.csv")
+    datastore = None
+    if not args.dry_run:
+        datastore = engine_from_env()
+        await datastore.open()
+    importer = Importer(datastore, rejects_path, args.batch_size)
+    chunks = read_chunks(path, file_format, args.chunk_size)
+    # Spawned rather than forked, as the datastore client runs threads of its own
+    email_pool = ProcessPoolExecutor(args.workers, mp_context=multiprocessing.get_context("spawn")) if args.workers > 1 else None
+    start = time.perf_counter()
+    pending = None
+    try:
+        while True:
+            # The next chunk is read and validated in a thread while the last one is stored
+            validated = await asyncio.to_thread(next_validated, chunks, email_pool)
+            if pending is not None:
+                await pending
+                elapsed = time.perf_counter() - start
+                logging.info(
+                    f"{importer.rows} rows read, {importer.imported} imported, {importer.rejected} rejected "
+                    f"({importer.rows / elapsed:.0f} rows/s)"
+                )
+            if validated is None:
+                break
+            pending = asyncio.create_task(importer.import_chunk(*validated))
+    finally:
+        if pending is not None and not pending.done():
+            pending.cancel()
+        if email_pool is not None:
+            email_pool.shutdown(cancel_futures=True)
+        if datastore is not None:
+            await datastore.close()
+    elapsed = time.perf_counter() - start
+    verb = "Validated" if args.dry_run else "Imported"
+    logging.info(
+        f"{verb} {importer.imported} of {importer.rows} rows in {elapsed:.1f}s "
+        f"({importer.rows / elapsed if elapsed else 0:.0f} rows/s)"
+    )
+    if importer.rejected:
+        logging.warning(f"{importer.rejected} rows rejected, see {rejects_path}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path", help="CSV or JSON Lines file")
+    parser.add_argument("--format", choices=FORMATS, help="file format (default: from the file extension)")
+    parser.add_argument("--rejects", help="where to write rejected rows (default: <path>.rejected.csv)")
+    parser.add_argument("--chunk-size", type=int, default=50000, help="rows validated at a time")
+    parser.add_argument("--batch-size", type=int, default=5000, help="documents per bulk insert")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="processes validating email addresses")
+    parser.add_argument("--dry-run", action="store_true", help="only validate, writing the rejects file")
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    asyncio.run(main(parser.parse_args()))
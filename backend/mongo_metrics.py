@@ -0,0 +1,95 @@
+"""pymongo event listeners that feed the metrics registry.
+
+Only imported when the Mongo engine is selected. Pass the listeners to the
+engine (``create_engine(..., event_listeners=...)``) so they are registered
+on its client.
+"""
+
+from pymongo import monitoring
+
+from metrics import MetricsRegistry, request_timings
+
+
+class CommandMetrics(monitoring.CommandListener):
+    """Times every command (insert, find, getMore, aggregate, ...) by name and outcome."""
+
+    def __init__(self, registry: MetricsRegistry):
+        self.duration = registry.histogram(
+            "greenloop_db_command_duration_seconds",
+            "MongoDB command round trip time, as measured by the driver.",
+            ("command", "outcome"),
+        )
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        self._record(event, "success")
+
+    def failed(self, event):
+        self._record(event, "failure")
+
+    def _record(self, event, outcome: str) -> None:
+        seconds = event.duration_micros / 1_000_000
+        self.duration.observe((event.command_name, outcome), seconds)
+        timings = request_timings.get()
+        if timings is not None:
+            timings.add("db", seconds)
+
+
+class PoolMetrics(monitoring.ConnectionPoolListener):
+    """Tracks open and checked-out connections per server."""
+
+    def __init__(self, registry: MetricsRegistry):
+        self.connections = registry.gauge(
+            "greenloop_db_pool_connections",
+            "Connections in the MongoDB driver pool, by server and state (open includes in_use).",
+            ("address", "state"),
+        )
+        self.checkout_failures = registry.counter(
+            "greenloop_db_pool_checkout_failures_total",
+            "Connection check-outs that failed, by server and reason (e.g. timeout).",
+            ("address", "reason"),
+        )
+
+    @staticmethod
+    def _address(event) -> str:
+        host, port = event.address
+        return f"{host}:{port}"
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        self.connections.inc((self._address(event), "open"))
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        self.connections.dec((self._address(event), "open"))
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_check_out_failed(self, event):
+        self.checkout_failures.inc((self._address(event), str(event.reason)))
+
+    def connection_checked_out(self, event):
+        self.connections.inc((self._address(event), "in_use"))
+
+    def connection_checked_in(self, event):
+        self.connections.dec((self._address(event), "in_use"))
+
+
+def mongo_event_listeners(registry: MetricsRegistry) -> list:
+    return [CommandMetrics(registry), PoolMetrics(registry)]
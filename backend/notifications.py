@@ -0,0 +1,161 @@
+"""Email notifications for new contact submissions, delivered through the outbox.
+
+Configuration, read from the environment when the API or ``outbox_worker.py``
+starts:
+
+- NOTIFY_EMAIL_TO: comma-separated recipients; notifications are off when empty
+- NOTIFY_EMAIL_FROM: sender address
+- SMTP_HOST / SMTP_PORT / SMTP_USERNAME / SMTP_PASSWORD / SMTP_TIMEOUT
+- SMTP_SECURITY: ``none``, ``starttls`` or ``ssl``
+- OUTBOX_WORKERS, OUTBOX_BATCH_SIZE, OUTBOX_POLL_INTERVAL, OUTBOX_LINGER,
+  OUTBOX_LEASE, OUTBOX_MAX_ATTEMPTS, OUTBOX_RETRY_BASE, OUTBOX_RETRY_MAX: see ``OutboxWorker``
+"""
+
+import asyncio
+import logging
+import os
+import smtplib
+from email.header import Header
+from email.message import Message
+from email.mime.text import MIMEText
+from typing import Dict, List, Sequence, Tuple
+
+from outbox import OutboxWorker, PermanentDeliveryError
+from storage import OutboxRepository, outbox_message
+
+logger = logging.getLogger(__name__)
+
+CONTACT_SUBMITTED = "contact.submitted"
+
+
+def notification_recipients() -> List[str]:
+    return [address.strip() for address in os.environ.get('NOTIFY_EMAIL_TO', '').split(',') if address.strip()]
+
+
+def contact_notification(document: dict) -> dict:
+    """Outbox message announcing a stored submission."""
+    payload = {field: document.get(field) for field in ("name", "email", "organization", "interest", "message")}
+    payload["submitted_at"] = document["submitted_at"].isoformat()
+    return outbox_message(CONTACT_SUBMITTED, document["id"], payload)
+
+
+def _header(value: str):
+    # Header values must not contain line breaks, and need encoding beyond ASCII
+    value = " ".join(str(value).split())
+    return value if value.isascii() else Header(value, "utf-8")
+
+
+def contact_email(payload: dict, sender: str, recipients: Sequence[str]) -> Message:
+    # MIMEText (the compat32 API) builds messages some 30x faster than EmailMessage
+    email = MIMEText(
+        f"Name: {payload['name']}\n"
+        f"Email: {payload['email']}\n"
+        f"Organization: {payload.get('organization') or '-'}\n"
+        f"Interest: {payload.get('interest') or '-'}\n"
+        f"Submitted at: {payload['submitted_at']} UTC\n"
+        f"\n{payload['message']}\n",
+        "plain",
+        "utf-8",
+    )
+    email["Subject"] = _header(f"New contact form submission from {payload['name']}")
+    email["From"] = sender
+    email["To"] = ", ".join(recipients)
+    email["Reply-To"] = _header(payload["email"])
+    return email
+
+
+class SMTPMailer:
+    """Sends each batch over a single SMTP connection with smtplib.
+
+    ``send`` blocks, so call it from a worker thread. Connection failures
+    raise, failing the whole batch; per-message errors are returned by key,
+    with 5xx replies and unsendable messages marked permanent.
+    """
+
+    def __init__(self, host: str, port: int = 25, username: str = "", password: str = "",
+                 security: str = "none", timeout: float = 10.0):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.security = security
+        self.timeout = timeout
+
+    def send(self, emails: List[Tuple[str, Message]]) -> Dict[str, Exception]:
+        smtp_class = smtplib.SMTP_SSL if self.security == "ssl" else smtplib.SMTP
+        failures: Dict[str, Exception] = {}
+        with smtp_class(self.host, self.port, timeout=self.timeout) as smtp:
+            if self.security == "starttls":
+                smtp.starttls()
+            if self.username:
+                smtp.login(self.username, self.password)
+            for position, (key, email) in enumerate(emails):
+                try:
+                    refused = smtp.send_message(email)
+                except smtplib.SMTPServerDisconnected as e:
+                    # What was sent before is delivered; retry the rest
+                    for remaining, _ in emails[position:]:
+                        failures[remaining] = e
+                    break
+                except smtplib.SMTPRecipientsRefused as e:
+                    failures[key] = PermanentDeliveryError(f"All recipients refused: {e.recipients}")
+                except smtplib.SMTPResponseException as e:
+                    failures[key] = PermanentDeliveryError(str(e)) if e.smtp_code >= 500 else e
+                except (ValueError, UnicodeError) as e:
+                    failures[key] = PermanentDeliveryError(f"Cannot send email: {e}")
+                else:
+                    if refused:
+                        logger.warning(f"Notification {key} refused by some recipients: {refused}")
+        return failures
+
+
+class ContactEmailHandler:
+    """Outbox handler emailing each new submission to the notification recipients.
+
+    Emails are built and sent in a worker thread, keeping both off the event loop.
+    """
+
+    def __init__(self, mailer: SMTPMailer, sender: str, recipients: Sequence[str]):
+        self.mailer = mailer
+        self.sender = sender
+        self.recipients = list(recipients)
+
+    async def __call__(self, messages: List[dict]) -> Dict[str, Exception]:
+        return await asyncio.to_thread(self._deliver, messages)
+
+    def _deliver(self, messages: List[dict]) -> Dict[str, Exception]:
+        failures: Dict[str, Exception] = {}
+        emails = []
+        for message in messages:
+            try:
+                emails.append((message["id"], contact_email(message["payload"], self.sender, self.recipients)))
+            except (KeyError, ValueError) as e:
+                failures[message["id"]] = PermanentDeliveryError(f"Cannot build email: {e}")
+        if emails:
+            failures.update(self.mailer.send(emails))
+        return failures
+
+
+def outbox_worker_from_env(outbox: OutboxRepository) -> OutboxWorker:
+    mailer = SMTPMailer(
+        os.environ.get('SMTP_HOST', 'localhost'),
+        int(os.environ.get('SMTP_PORT', '25')),
+        username=os.environ.get('SMTP_USERNAME', ''),
+        password=os.environ.get('SMTP_PASSWORD', ''),
+        security=os.environ.get('SMTP_SECURITY', 'none').lower(),
+        timeout=float(os.environ.get('SMTP_TIMEOUT', '10')),
+    )
+    return OutboxWorker(
+        outbox,
+        {CONTACT_SUBMITTED: ContactEmailHandler(
+            mailer, os.environ.get('NOTIFY_EMAIL_FROM', 'greenloop@localhost'), notification_recipients()
+        )},
+        concurrency=int(os.environ.get('OUTBOX_WORKERS', '4')),
+        batch_size=int(os.environ.get('OUTBOX_BATCH_SIZE', '20')),
+        poll_interval=float(os.environ.get('OUTBOX_POLL_INTERVAL', '1')),
+        linger=float(os.environ.get('OUTBOX_LINGER', '0.1')),
+        lease=float(os.environ.get('OUTBOX_LEASE', '120')),
+        max_attempts=int(os.environ.get('OUTBOX_MAX_ATTEMPTS', '8')),
+        retry_base=float(os.environ.get('OUTBOX_RETRY_BASE', '5')),
+        retry_max=float(os.environ.get('OUTBOX_RETRY_MAX', '3600')),
+    )
@@ -0,0 +1,145 @@
+"""Background delivery of outbox messages by a pool of asyncio workers."""
+
+import asyncio
+import logging
+import random
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Deque, Dict, List
+
+from storage import OutboxRepository
+
+logger = logging.getLogger(__name__)
+
+# Delivers a batch of messages of one topic. Raising fails the whole batch;
+# otherwise the returned map holds the errors of the messages that failed.
+DeliveryHandler = Callable[[List[dict]], Awaitable[Dict[str, Exception]]]
+
+
+class PermanentDeliveryError(Exception):
+    """Delivery can never succeed (e.g. the address was rejected); do not retry."""
+
+
+class OutboxWorker:
+    """Drains an outbox with ``concurrency`` workers, each delivering up to ``batch_size`` messages at a time.
+
+    A worker claims a batch, hands each topic's messages to that topic's
+    handler and then deletes the delivered messages. Failures are retried
+    with exponential backoff (``retry_base`` doubling up to ``retry_max``
+    seconds, with jitter) until ``max_attempts`` deliveries have failed, and
+    are then dead-lettered. Idle workers poll every ``poll_interval`` seconds;
+    ``notify`` wakes one of them early, which then waits ``linger`` seconds
+    so that a burst of writes is delivered as one batch rather than one
+    claim per message. A claim is leased for ``lease`` seconds, which must
+    outlast a delivery.
+    """
+
+    def __init__(self, outbox: OutboxRepository, handlers: Dict[str, DeliveryHandler], concurrency: int = 4,
+                 batch_size: int = 20, poll_interval: float = 1.0, linger: float = 0.1, lease: float = 120.0,
+                 max_attempts: int = 8, retry_base: float = 5.0, retry_max: float = 3600.0):
+        self.outbox = outbox
+        self.handlers = handlers
+        self.concurrency = concurrency
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.linger = linger
+        self.lease = lease
+        self.max_attempts = max_attempts
+        self.retry_base = retry_base
+        self.retry_max = retry_max
+        self.delivered = 0
+        self.retried = 0
+        self.dead_lettered = 0
+        # Wake-up events of the workers waiting for work
+        self._idle: Deque[asyncio.Event] = deque()
+        self._closing = False
+        self._tasks: List[asyncio.Task] = []
+
+    def start(self) -> None:
+        self._tasks = [asyncio.create_task(self._run()) for _ in range(self.concurrency)]
+
+    def notify(self) -> None:
+        """Wake an idle worker, e.g. right after messages were written."""
+        if self._idle:
+            self._idle.popleft().set()
+
+    async def close(self) -> None:
+        """Stop claiming messages and wait for the batches being delivered."""
+        self._closing = True
+        while self._idle:
+            self._idle.popleft().set()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def stats(self) -> dict:
+        return {"delivered": self.delivered, "retried": self.retried, "dead_lettered": self.dead_lettered}
+
+    async def _run(self) -> None:
+        while not self._closing:
+            try:
+                claimed = await self.run_once()
+            except Exception as e:
+                logger.error(f"Outbox worker failed: {str(e)}")
+                claimed = 0
+            if claimed < self.batch_size and not self._closing:
+                try:
+                    await self._wait_for_work()
+                except Exception as e:
+                    logger.error(f"Outbox worker failed while idle: {str(e)}")
+                    await asyncio.sleep(self.poll_interval)
+
+    async def _wait_for_work(self) -> None:
+        wakeup = asyncio.Event()
+        self._idle.append(wakeup)
+        try:
+            await asyncio.wait_for(wakeup.wait(), self.poll_interval)
+        except asyncio.TimeoutError:
+            # notify() may have taken the event just as the wait timed out
+            if wakeup in self._idle:
+                self._idle.remove(wakeup)
+            return
+        if not self._closing:
+            await asyncio.sleep(self.linger)
+
+    async def run_once(self) -> int:
+        """Claim and deliver one batch; returns the number of messages claimed."""
+        now = datetime.utcnow()
+        messages = await self.outbox.claim(self.batch_size, now, now + timedelta(seconds=self.lease))
+        by_topic: Dict[str, List[dict]] = {}
+        for message in messages:
+            by_topic.setdefault(message["topic"], []).append(message)
+        for topic, batch in by_topic.items():
+            await self._deliver(topic, batch)
+        return len(messages)
+
+    async def _deliver(self, topic: str, batch: List[dict]) -> None:
+        handler = self.handlers.get(topic)
+        if handler is None:
+            failures = {message["id"]: PermanentDeliveryError(f"No handler for topic {topic!r}") for message in batch}
+        else:
+            try:
+                failures = await handler(batch)
+            except Exception as e:
+                failures = {message["id"]: e for message in batch}
+        delivered = [message["id"] for message in batch if message["id"] not in failures]
+        if delivered:
+            await self.outbox.complete(delivered)
+            self.delivered += len(delivered)
+        for message in batch:
+            error = failures.get(message["id"])
+            if error is not None:
+                await self._failed(message, error)
+
+    async def _failed(self, message: dict, error: Exception) -> None:
+        reason = f"{type(error).__name__}: {error}"
+        if isinstance(error, PermanentDeliveryError) or message["attempts"] >= self.max_attempts:
+            logger.error(f"Outbox message {message['id']} dead-lettered after {message['attempts']} attempt(s): {reason}")
+            await self.outbox.dead_letter(message["id"], reason)
+            self.dead_lettered += 1
+            return
+        # Half the backoff is fixed, half random, so failed batches do not retry in lockstep
+        delay = min(self.retry_max, self.retry_base * 2 ** (message["attempts"] - 1))
+        delay = delay / 2 + random.uniform(0, delay / 2)
+        logger.warning(f"Outbox message {message['id']} failed, retrying in {delay:.0f}s: {reason}")
+        await self.outbox.retry(message["id"], datetime.utcnow() + timedelta(seconds=delay), reason)
+        self.retried += 1
@@ -0,0 +1,50 @@
+"""Deliver outbox messages (notification emails) outside the API process.
+
+Run from the backend directory with the same environment as the API, which
+should then set OUTBOX_WORKER_MODE=external:
+
+    python outbox_worker.py
+
+Any number of these may run against the same datastore; each message is
+claimed by one worker at a time. Stops on SIGINT/SIGTERM after the batches
+being sent are done.
+"""
+
+import asyncio
+import logging
+import signal
+import sys
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+from notifications import notification_recipients, outbox_worker_from_env
+from storage import engine_from_env
+
+ROOT_DIR = Path(__file__).parent
+load_dotenv(ROOT_DIR / '.env')
+
+
+async def main() -> None:
+    if not notification_recipients():
+        sys.exit("NOTIFY_EMAIL_TO must list the notification recipients")
+    datastore = engine_from_env()
+    await datastore.open()
+    worker = outbox_worker_from_env(datastore.outbox)
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(signum, stop.set)
+    try:
+        worker.start()
+        logging.info(f"Outbox worker started with {worker.concurrency} workers")
+        await stop.wait()
+    finally:
+        await worker.close()
+        await datastore.close()
+        logging.info(f"Outbox worker stopped: {worker.stats()}")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    asyncio.run(main())
@@ -0,0 +1,138 @@
+"""Admission control for the write endpoints.
+
+Each configured route gets a token bucket per client IP, and all of them share
+a cap on requests in flight, so a single client cannot flood the datastore
+and starve everyone else of connections. The two are switched on and off
+separately: the buckets need the client IP, which is only right once
+``proxy_hops`` matches the deployment, while the cap needs no configuration.
+Rejections are answered with 429 before the request reaches validation or
+the datastore.
+"""
+
+import logging
+import math
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+from starlette.responses import JSONResponse
+
+from storage import RateLimitRepository
+from storage.memory import MemoryRateLimitRepository
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class RateLimitRule:
+    name: str
+    per_minute: float
+    burst: float
+
+    @property
+    def rate(self) -> float:
+        return self.per_minute / 60
+
+
+class RateLimiter:
+    """Rules, bucket store and counters shared with ``RateLimitMiddleware``.
+
+    ``rules`` maps (method, path) to a rule. Buckets live in process memory
+    until ``store`` is pointed at a shared repository (see the storage
+    engines' ``rate_limits``) so that limits hold across workers.
+    ``enabled`` turns the per-IP buckets on, ``concurrency_enabled`` the cap
+    of ``max_in_flight`` requests across the rule routes.
+    """
+
+    def __init__(self, rules: Dict[Tuple[str, str], RateLimitRule], max_in_flight: int = 64,
+                 proxy_hops: int = 0, enabled: bool = True, concurrency_enabled: bool = True):
+        self.rules = rules
+        self.max_in_flight = max_in_flight
+        self.proxy_hops = proxy_hops
+        self.enabled = enabled
+        self.concurrency_enabled = concurrency_enabled
+        self.store: RateLimitRepository = MemoryRateLimitRepository()
+        self.in_flight = 0
+        self.admitted = {rule.name: 0 for rule in rules.values()}
+        self.throttled = {rule.name: 0 for rule in rules.values()}
+        self.concurrency_rejected = 0
+
+    def client_ip(self, scope) -> str:
+        if self.proxy_hops:
+            # Each trusted proxy appends the address it saw, so the client is
+            # proxy_hops entries from the right
+            for name, value in scope.get("headers", []):
+                if name == b"x-forwarded-for":
+                    hops = [hop.strip() for hop in value.decode("latin-1").split(",")]
+                    if len(hops) >= self.proxy_hops:
+                        return hops[-self.proxy_hops]
+                    break
+        client = scope.get("client")
+        return client[0] if client else "unknown"
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "concurrency_enabled": self.concurrency_enabled,
+            "in_flight": self.in_flight,
+            "max_in_flight": self.max_in_flight,
+            "concurrency_rejected": self.concurrency_rejected,
+            "routes": {
+                name: {"admitted": self.admitted[name], "throttled": self.throttled[name]}
+                for name in self.admitted
+            },
+        }
+
+
+class RateLimitMiddleware:
+    def __init__(self, app, limiter: RateLimiter):
+        self.app = app
+        self.limiter = limiter
+
+    async def __call__(self, scope, receive, send):
+        limiter = self.limiter
+        rule: Optional[RateLimitRule] = None
+        if scope["type"] == "http" and (limiter.enabled or limiter.concurrency_enabled):
+            rule = limiter.rules.get((scope["method"], scope["path"]))
+        if rule is None:
+            await self.app(scope, receive, send)
+            return
+
+        if limiter.enabled:
+            try:
+                allowed, retry_after = await limiter.store.take(
+                    f"{rule.name}:{limiter.client_ip(scope)}", rule.rate, rule.burst
+                )
+            except Exception as e:
+                # Fail open: an unavailable shared store must not take the form down
+                logger.error(f"Rate limit store error: {str(e)}")
+                allowed, retry_after = True, 0.0
+            if not allowed:
+                limiter.throttled[rule.name] += 1
+                await self._reject(scope, receive, send, retry_after)
+                return
+        if limiter.concurrency_enabled and limiter.in_flight >= limiter.max_in_flight:
+            limiter.concurrency_rejected += 1
+            await self._reject(scope, receive, send, 1)
+            return
+
+        limiter.admitted[rule.name] += 1
+        limiter.in_flight += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limiter.in_flight -= 1
+
+    @staticmethod
+    async def _reject(scope, receive, send, retry_after: float):
+        # The request never reaches routing; rules are keyed by route path, so
+        # metrics can label it with that instead
+        scope["route_path"] = scope["path"]
+        response = JSONResponse(
+            status_code=429,
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+            content={
+                "success": False,
+                "message": "Too many requests. Please try again later."
+            }
+        )
+        await response(scope, receive, send)
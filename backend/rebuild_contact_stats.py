@@ -0,0 +1,37 @@
+"""Recompute the contact submission analytics rollup from scratch.
+
+Run from the backend directory with the same environment as the API:
+
+    python rebuild_contact_stats.py
+
+Safe to run at any time, but submissions stored while it runs may be
+missing from the counts until the next rebuild.
+"""
+
+import asyncio
+import logging
+import time
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+from storage import engine_from_env
+
+ROOT_DIR = Path(__file__).parent
+load_dotenv(ROOT_DIR / '.env')
+
+
+async def main() -> None:
+    datastore = engine_from_env()
+    await datastore.open()
+    try:
+        start = time.perf_counter()
+        buckets = await datastore.contact_stats.rebuild()
+        logging.info(f"Rebuilt {buckets} contact stats buckets in {time.perf_counter() - start:.2f}s")
+    finally:
+        await datastore.close()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    asyncio.run(main())
@@ -0,0 +1,123 @@
+"""In-process response cache for the admin list endpoints.
+
+Entries are rendered response bodies keyed by namespace, path and query
+string, evicted least-recently-used (by entry count and total size) and after
+a TTL. Writes invalidate their whole namespace and bump its generation; a
+read passes the generation it started at to ``put``, so a response read
+before a concurrent write is not stored after it. The cache is per worker: with
+several workers a write only clears the worker that served it, so the TTL
+bounds how stale another worker's entries can get.
+"""
+
+import hashlib
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Tuple
+
+CacheKey = Tuple[str, str, str]
+
+
+@dataclass
+class CachedResponse:
+    body: bytes
+    etag: str
+    headers: Dict[str, str] = field(default_factory=dict)
+    expires_at: float = 0.0
+
+
+def make_etag(body: bytes) -> str:
+    """Strong ETag derived from the exact response bytes."""
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return etag in (candidate.strip() for candidate in if_none_match.split(","))
+
+
+class ResponseCache:
+    def __init__(self, max_entries: int = 256, max_bytes: int = 32 * 1024 * 1024, ttl: float = 5.0,
+                 enabled: bool = True):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.enabled = enabled
+        self._entries: "OrderedDict[CacheKey, CachedResponse]" = OrderedDict()
+        self._size = 0
+        self._generations: Dict[str, int] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def key(namespace: str, path: str, query_string: str) -> CacheKey:
+        # Parameter order does not change the response, so normalise it
+        query = "&".join(sorted(part for part in query_string.split("&") if part))
+        return namespace, path, query
+
+    def get(self, key: CacheKey) -> Optional[CachedResponse]:
+        if not self.enabled:
+            return None
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        if entry.expires_at <= time.monotonic():
+            self._remove(key)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def generation(self, namespace: str) -> int:
+        """Take before reading the datastore and pass to ``put``."""
+        return self._generations.get(namespace, 0)
+
+    def put(self, key: CacheKey, body: bytes, headers: Optional[Dict[str, str]] = None,
+            generation: Optional[int] = None) -> CachedResponse:
+        """Store and return the entry, unless the namespace was invalidated since ``generation``."""
+        entry = CachedResponse(body, make_etag(body), headers or {}, time.monotonic() + self.ttl)
+        if not self.enabled or len(body) > self.max_bytes:
+            return entry
+        if generation is not None and generation != self.generation(key[0]):
+            return entry
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = entry
+        self._size += len(body)
+        while len(self._entries) > self.max_entries or self._size > self.max_bytes:
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+        return entry
+
+    def invalidate(self, namespace: str) -> None:
+        self._generations[namespace] = self.generation(namespace) + 1
+        stale = [key for key in self._entries if key[0] == namespace]
+        for key in stale:
+            self._remove(key)
+        self.invalidations += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._size = 0
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._entries),
+            "bytes": self._size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+    def _remove(self, key: CacheKey) -> None:
+        entry = self._entries.pop(key)
+        self._size -= len(entry.body)
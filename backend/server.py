@@ -1,27 +1,292 @@
-from fastapi import FastAPI, APIRouter, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, APIRouter, Header, HTTPException, Query, Request, Response
+from fastapi.responses import JSONResponse, StreamingResponse
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
-from motor.motor_asyncio import AsyncIOMotorClient
+from contextlib import asynccontextmanager
 import os
+import asyncio
+import json
+import base64
+import functools
 import logging
+import time
 from pathlib import Path
-from pydantic import BaseModel, Field, EmailStr, validator
-from typing import List, Optional
+import export
+import fast_json
+from contact_rules import MESSAGE, NAME, ORGANIZATION, ContactStatus, check_interest
+from event_stream import EventBroker, SlowSubscriberError, SubscriberLimitError
+from metrics import MetricsMiddleware, MetricsRegistry, timed
+from notifications import contact_notification, notification_recipients, outbox_worker_from_env
+from outbox import OutboxWorker
+from rate_limit import RateLimiter, RateLimitMiddleware, RateLimitRule
+from idempotency import RecentKeys, content_key, header_key, request_fingerprint
+from response_cache import CachedResponse, ResponseCache, etag_matches
+from storage import (
+    SUMMARY_RESOLUTIONS,
+    INITIAL_VERSION,
+    BulkInsertError,
+    ContactFilters,
+    ContactKey,
+    StorageEngine,
+    contact_stats_deltas,
+    contact_status_change_deltas,
+    engine_from_env,
+    floor_time,
+    status_retention_from_env,
+)
+from write_buffer import BufferFullError, WriteBuffer
+from pydantic import BaseModel, Field, EmailStr, ValidationError, validator
+from typing import AsyncIterator, Iterable, List, Literal, Optional, Tuple, Union
 import uuid
-from datetime import datetime
+from collections import Counter
+from datetime import date, datetime, timedelta, timezone
 
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
-# MongoDB connection
-mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ['DB_NAME']]
+# Storage engine: "mongo" (MONGO_URL + DB_NAME), "sqlite" (SQLITE_PATH) or
+# "memory", with the Mongo client options read by storage.mongo_options_from_env.
+# It is opened in the app lifespan, not at import; startup pings it and warms
+# up the connection pool before the worker takes traffic.
+STORAGE_ENGINE = os.environ.get('STORAGE_ENGINE', 'mongo')
+datastore: Optional[StorageEngine] = None
+
+# Probes: GET /api/healthz answers while the process is up, GET /api/readyz
+# only once startup has finished and a datastore round trip completes within
+# READINESS_TIMEOUT_MS. Startup phase durations are kept for both the
+# response and the metrics.
+READINESS_TIMEOUT_MS = int(os.environ.get('READINESS_TIMEOUT_MS', '1000'))
+accepting_traffic = False
+startup_timings: dict = {}
+
+# Status checks are kept raw for STATUS_RAW_RETENTION_HOURS, then as
+# per-client summaries per minute and per hour. A background task builds the
+# summaries and drops expired data every STATUS_DOWNSAMPLE_INTERVAL seconds
+# (0 disables it), leaving STATUS_DOWNSAMPLE_DELAY seconds for in-flight checks.
+STATUS_RETENTION = status_retention_from_env()
+STATUS_DOWNSAMPLE_INTERVAL = float(os.environ.get('STATUS_DOWNSAMPLE_INTERVAL', '60'))
+STATUS_DOWNSAMPLE_DELAY = float(os.environ.get('STATUS_DOWNSAMPLE_DELAY', '10'))
+STATUS_PAGE_SIZE_MAX = int(os.environ.get('STATUS_PAGE_SIZE_MAX', '1000'))
+# resolution=auto serves ranges up to these spans from the finer tier
+STATUS_AUTO_RAW_SPAN = timedelta(hours=1)
+STATUS_AUTO_MINUTE_SPAN = timedelta(days=1)
+status_maintenance_task: Optional[asyncio.Task] = None
+
+# Page size for the admin contact list (GET /api/contact)
+CONTACT_PAGE_SIZE_DEFAULT = int(os.environ.get('CONTACT_PAGE_SIZE_DEFAULT', '100'))
+CONTACT_PAGE_SIZE_MAX = int(os.environ.get('CONTACT_PAGE_SIZE_MAX', '500'))
+
+# Contact search (GET /api/contact/search): page size, and how deep results
+# can be paged, since every page re-ranks the matches before it
+CONTACT_SEARCH_PAGE_SIZE_DEFAULT = int(os.environ.get('CONTACT_SEARCH_PAGE_SIZE_DEFAULT', '20'))
+CONTACT_SEARCH_PAGE_SIZE_MAX = int(os.environ.get('CONTACT_SEARCH_PAGE_SIZE_MAX', '100'))
+CONTACT_SEARCH_MAX_OFFSET = int(os.environ.get('CONTACT_SEARCH_MAX_OFFSET', '1000'))
+
+# Contact form writes: "direct" inserts one document per request, "buffered"
+# coalesces submissions into insert_many flushes. With buffered writes the
+# response is sent after the flush ("write" ack) or right after queueing
+# ("enqueue" ack).
+CONTACT_WRITE_MODE = os.environ.get('CONTACT_WRITE_MODE', 'direct')
+CONTACT_WRITE_ACK = os.environ.get('CONTACT_WRITE_ACK', 'write')
+CONTACT_BUFFER_MAX_BATCH = int(os.environ.get('CONTACT_BUFFER_MAX_BATCH', '100'))
+CONTACT_BUFFER_FLUSH_INTERVAL_MS = int(os.environ.get('CONTACT_BUFFER_FLUSH_INTERVAL_MS', '50'))
+CONTACT_BUFFER_MAX_QUEUE = int(os.environ.get('CONTACT_BUFFER_MAX_QUEUE', '10000'))
+CONTACT_BUFFER_RETRY_AFTER = int(os.environ.get('CONTACT_BUFFER_RETRY_AFTER', '1'))
+contact_write_buffer: Optional[WriteBuffer] = None
+
+# Email notifications for new submissions go to NOTIFY_EMAIL_TO (off when
+# empty). Every write stores the submissions' outbox messages with them;
+# OUTBOX_WORKER_MODE=in-process delivers them from a worker pool in this
+# process, "external" leaves that to outbox_worker.py, which keeps delivery
+# work off the API's event loop (with SQLite, whose queries share one thread
+# with the API's, prefer it). SMTP and worker settings are read by
+# notifications.outbox_worker_from_env.
+NOTIFY_EMAIL_TO = notification_recipients()
+OUTBOX_WORKER_MODE = os.environ.get('OUTBOX_WORKER_MODE', 'in-process')
+outbox_worker: Optional[OutboxWorker] = None
+
+# Live feed of new and updated submissions at GET /api/contact/stream (SSE).
+# CONTACT_EVENTS_SOURCE=local publishes this process's own writes;
+# "change-stream" follows a Mongo change stream instead (needs a replica set),
+# so that every worker sees the writes of all of them. The last
+# CONTACT_STREAM_REPLAY events are kept for clients resuming with
+# Last-Event-ID; a client more than CONTACT_STREAM_CLIENT_BUFFER events behind
+# is disconnected and left to reconnect.
+CONTACT_EVENTS_SOURCE = os.environ.get('CONTACT_EVENTS_SOURCE', 'local')
+CONTACT_STREAM_HEARTBEAT = float(os.environ.get('CONTACT_STREAM_HEARTBEAT', '15'))
+CONTACT_STREAM_RETRY_MS = int(os.environ.get('CONTACT_STREAM_RETRY_MS', '3000'))
+contact_events = EventBroker(
+    replay_size=int(os.environ.get('CONTACT_STREAM_REPLAY', '1000')),
+    client_buffer=int(os.environ.get('CONTACT_STREAM_CLIENT_BUFFER', '256')),
+    max_subscribers=int(os.environ.get('CONTACT_STREAM_MAX_CLIENTS', '10000')),
+)
+contact_change_stream_task: Optional[asyncio.Task] = None
+
+# Duplicate suppression for POST /api/contact: an Idempotency-Key header is
+# honoured for CONTACT_IDEMPOTENCY_TTL seconds. Optionally, requests without
+# one can be matched by content: with CONTACT_DEDUP_WINDOW set (off by
+# default), the same email and message within that many seconds count as a
+# repeat, which also merges genuinely repeated submissions.
+# A key is claimed as pending before the write, for at most
+# CONTACT_IDEMPOTENCY_PENDING_TTL seconds should the process die mid-write;
+# repeats are answered 409 until the write succeeded (and replayed from then
+# on) or failed (and the key is free again).
+CONTACT_IDEMPOTENCY_TTL = int(os.environ.get('CONTACT_IDEMPOTENCY_TTL', str(24 * 60 * 60)))
+CONTACT_IDEMPOTENCY_PENDING_TTL = int(os.environ.get('CONTACT_IDEMPOTENCY_PENDING_TTL', '60'))
+CONTACT_IDEMPOTENCY_RETRY_AFTER = int(os.environ.get('CONTACT_IDEMPOTENCY_RETRY_AFTER', '1'))
+CONTACT_DEDUP_WINDOW = int(os.environ.get('CONTACT_DEDUP_WINDOW', '0'))
+IDEMPOTENCY_KEY_MAX_LENGTH = 255
+# Completed claims only
+recent_contact_keys = RecentKeys(int(os.environ.get('CONTACT_IDEMPOTENCY_CACHE_SIZE', '10000')))
+# Settling the claims of buffered writes acknowledged before their flush
+contact_key_tasks: set = set()
+
+# Most ids PATCH /api/contact accepts in one request
+CONTACT_STATUS_BULK_MAX_IDS = int(os.environ.get('CONTACT_STATUS_BULK_MAX_IDS', '1000'))
+
+# Limits for POST /api/contact/batch
+CONTACT_BATCH_MAX_ITEMS = int(os.environ.get('CONTACT_BATCH_MAX_ITEMS', '1000'))
+CONTACT_BATCH_MAX_BYTES = int(os.environ.get('CONTACT_BATCH_MAX_BYTES', str(5 * 1024 * 1024)))
+
+# Streaming (NDJSON) list responses
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+STREAM_BATCH_SIZE = int(os.environ.get('STREAM_BATCH_SIZE', '500'))
+
+# CSV/Parquet exports of contact submissions. Parquet needs pyarrow; each row
+# group is encoded and sent as soon as it is full.
+EXPORT_PARQUET_ROW_GROUP_SIZE = int(os.environ.get('EXPORT_PARQUET_ROW_GROUP_SIZE', '10000'))
+EXPORT_MEDIA_TYPES = {"csv": "text/csv; charset=utf-8", "parquet": "application/vnd.apache.parquet"}
+
+# Cache for the polled admin list endpoints, invalidated by writes. Responses
+# carry strong ETags so an unchanged poll is answered with 304.
+response_cache = ResponseCache(
+    max_entries=int(os.environ.get('RESPONSE_CACHE_MAX_ENTRIES', '256')),
+    max_bytes=int(os.environ.get('RESPONSE_CACHE_MAX_BYTES', str(32 * 1024 * 1024))),
+    ttl=float(os.environ.get('RESPONSE_CACHE_TTL', '5')),
+    enabled=os.environ.get('RESPONSE_CACHE_ENABLED', '1').lower() in ('1', 'true', 'yes', 'on'),
+)
+
+# Admission control for the write endpoints: token buckets per client IP and
+# route, off unless RATE_LIMIT_ENABLED=1, plus a cap of WRITE_CONCURRENCY_LIMIT
+# writes in flight, on unless WRITE_CONCURRENCY_LIMIT_ENABLED=0.
+# RATE_LIMIT_PROXY_HOPS is the number of trusted proxies in front of the app
+# that append to X-Forwarded-For; behind a proxy it must be set, or every
+# visitor is keyed by the proxy's address and shares one bucket.
+# RATE_LIMIT_STORE=datastore keeps the buckets in the storage engine so limits
+# hold across workers.
+RATE_LIMIT_STORE = os.environ.get('RATE_LIMIT_STORE', 'memory')
+rate_limiter = RateLimiter(
+    rules={
+        ("POST", "/api/contact"): RateLimitRule(
+            "contact",
+            per_minute=float(os.environ.get('RATE_LIMIT_CONTACT_PER_MINUTE', '10')),
+            burst=float(os.environ.get('RATE_LIMIT_CONTACT_BURST', '5')),
+        ),
+        ("POST", "/api/contact/batch"): RateLimitRule(
+            "contact_batch",
+            per_minute=float(os.environ.get('RATE_LIMIT_CONTACT_BATCH_PER_MINUTE', '6')),
+            burst=float(os.environ.get('RATE_LIMIT_CONTACT_BATCH_BURST', '3')),
+        ),
+        ("POST", "/api/status"): RateLimitRule(
+            "status",
+            per_minute=float(os.environ.get('RATE_LIMIT_STATUS_PER_MINUTE', '120')),
+            burst=float(os.environ.get('RATE_LIMIT_STATUS_BURST', '30')),
+        ),
+    },
+    max_in_flight=int(os.environ.get('WRITE_CONCURRENCY_LIMIT', '64')),
+    proxy_hops=int(os.environ.get('RATE_LIMIT_PROXY_HOPS', '0')),
+    enabled=os.environ.get('RATE_LIMIT_ENABLED', '0').lower() in ('1', 'true', 'yes', 'on'),
+    concurrency_enabled=os.environ.get('WRITE_CONCURRENCY_LIMIT_ENABLED', '1').lower() in ('1', 'true', 'yes', 'on'),
+)
+
+# Prometheus metrics at GET /api/metrics. METRICS_ENABLED=0 turns off request
+# and datastore instrumentation; SERVER_TIMING_ENABLED=0 drops the per-response
+# Server-Timing header.
+METRICS_ENABLED = os.environ.get('METRICS_ENABLED', '1').lower() in ('1', 'true', 'yes', 'on')
+SERVER_TIMING_ENABLED = os.environ.get('SERVER_TIMING_ENABLED', '1').lower() in ('1', 'true', 'yes', 'on')
+PROMETHEUS_MEDIA_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+metrics = MetricsRegistry()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global datastore, contact_write_buffer, status_maintenance_task, outbox_worker, contact_change_stream_task
+    global accepting_traffic
+    started = time.perf_counter()
+    if CONTACT_EVENTS_SOURCE == "change-stream" and STORAGE_ENGINE != "mongo":
+        raise ValueError("CONTACT_EVENTS_SOURCE=change-stream needs STORAGE_ENGINE=mongo")
+    event_listeners = []
+    if STORAGE_ENGINE == "mongo" and METRICS_ENABLED:
+        from mongo_metrics import mongo_event_listeners
+        event_listeners = mongo_event_listeners(metrics)
+    datastore = engine_from_env(event_listeners)
+    # Connect and build indexes/schema, then fill the connection pool
+    await datastore.open()
+    opened = time.perf_counter()
+    await datastore.warm_up()
+    warmed_up = time.perf_counter()
+    response_cache.clear()
+    recent_contact_keys.clear()
+    if RATE_LIMIT_STORE == "datastore":
+        rate_limiter.store = datastore.rate_limits
+    if rate_limiter.enabled and not rate_limiter.proxy_hops:
+        logging.warning(
+            "Rate limiting keys clients by their socket address (RATE_LIMIT_PROXY_HOPS=0); "
+            "behind a proxy all visitors share one bucket"
+        )
+    if CONTACT_WRITE_MODE == "buffered":
+        contact_write_buffer = WriteBuffer(
+            datastore.contacts,
+            max_batch=CONTACT_BUFFER_MAX_BATCH,
+            flush_interval=CONTACT_BUFFER_FLUSH_INTERVAL_MS / 1000,
+            max_queue=CONTACT_BUFFER_MAX_QUEUE,
+            on_flush=contacts_written,
+            outbox=contact_outbox,
+        )
+        contact_write_buffer.start()
+    if NOTIFY_EMAIL_TO and OUTBOX_WORKER_MODE == "in-process":
+        outbox_worker = outbox_worker_from_env(datastore.outbox)
+        outbox_worker.start()
+    if STATUS_DOWNSAMPLE_INTERVAL > 0:
+        status_maintenance_task = asyncio.create_task(run_status_maintenance())
+    if CONTACT_EVENTS_SOURCE == "change-stream":
+        contact_change_stream_task = asyncio.create_task(follow_contact_changes())
+    startup_timings.update(
+        open_ms=round((opened - started) * 1000, 2),
+        warm_up_ms=round((warmed_up - opened) * 1000, 2),
+        total_ms=round((time.perf_counter() - started) * 1000, 2),
+    )
+    logging.info(
+        f"Started with the {datastore.name} datastore in {startup_timings['total_ms']} ms "
+        f"(open {startup_timings['open_ms']} ms, warm-up {startup_timings['warm_up_ms']} ms)"
+    )
+    accepting_traffic = True
+    try:
+        yield
+    finally:
+        # Fail readiness first so load balancers stop sending new requests
+        accepting_traffic = False
+        contact_events.close()
+        if contact_change_stream_task is not None:
+            contact_change_stream_task.cancel()
+            contact_change_stream_task = None
+        if status_maintenance_task is not None:
+            status_maintenance_task.cancel()
+            status_maintenance_task = None
+        if contact_write_buffer is not None:
+            # Flush queued submissions before the connection goes away
+            await contact_write_buffer.close()
+            contact_write_buffer = None
+        if contact_key_tasks:
+            await asyncio.gather(*contact_key_tasks, return_exceptions=True)
+        if outbox_worker is not None:
+            # Lets batches being sent finish; the rest is delivered after restart
+            await outbox_worker.close()
+            outbox_worker = None
+        await datastore.close()
 
 # Create the main app without a prefix
-app = FastAPI(title="GreenLoop Project API", version="1.0.0")
+app = FastAPI(title="GreenLoop Project API", version="1.0.0", lifespan=lifespan)
 
 # Create a router with the /api prefix
 api_router = APIRouter(prefix="/api")
@@ -36,6 +301,13 @@ class StatusCheck(BaseModel):
 class StatusCheckCreate(BaseModel):
     client_name: str
 
+class StatusCheckSummary(BaseModel):
+    client_name: str
+    bucket_start: datetime
+    count: int
+    first_seen: datetime
+    last_seen: datetime
+
 class ContactSubmissionCreate(BaseModel):
     name: str
     email: EmailStr
@@ -43,42 +315,22 @@ class ContactSubmissionCreate(BaseModel):
     interest: Optional[str] = None
     message: str
 
+    # The rules live in contact_rules so that import_contacts.py applies the same ones
     @validator('name')
     def validate_name(cls, v):
-        if len(v.strip()) < 2:
-            raise ValueError('Name must be at least 2 characters long')
-        if len(v.strip()) > 100:
-            raise ValueError('Name must be less than 100 characters')
-        return v.strip()
+        return NAME.check(v)
 
     @validator('organization')
     def validate_organization(cls, v):
-        if v and len(v.strip()) > 100:
-            raise ValueError('Organization must be less than 100 characters')
-        return v.strip() if v else None
+        return ORGANIZATION.check(v) if v else None
 
     @validator('interest')
     def validate_interest(cls, v):
-        if v:
-            valid_interests = [
-                "Learning about products",
-                "Partnership opportunities", 
-                "Joining the community",
-                "Research collaboration",
-                "Bulk orders",
-                "Other"
-            ]
-            if v not in valid_interests:
-                raise ValueError(f'Interest must be one of: {", ".join(valid_interests)}')
-        return v
+        return check_interest(v)
 
     @validator('message')
     def validate_message(cls, v):
-        if len(v.strip()) < 10:
-            raise ValueError('Message must be at least 10 characters long')
-        if len(v.strip()) > 1000:
-            raise ValueError('Message must be less than 1000 characters')
-        return v.strip()
+        return MESSAGE.check(v)
 
 class ContactSubmission(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
@@ -88,84 +340,854 @@ class ContactSubmission(BaseModel):
     interest: Optional[str] = None
     message: str
     submitted_at: datetime = Field(default_factory=datetime.utcnow)
-    status: str = "new"
+    status: ContactStatus = "new"
+    # Bumped by every status change, for optimistic concurrency
+    version: int = INITIAL_VERSION
+
+class ContactStatusUpdate(BaseModel):
+    status: ContactStatus
+    # Only update while the submission is at this version
+    version: Optional[int] = None
+
+class ContactStatusFilter(BaseModel):
+    status: Optional[ContactStatus] = None
+    interest: Optional[str] = None
+    submitted_after: Optional[datetime] = None
+    submitted_before: Optional[datetime] = None
+
+class ContactBulkStatusUpdate(BaseModel):
+    status: ContactStatus
+    # Either the ids to update or a filter selecting them
+    ids: Optional[List[str]] = Field(None, min_length=1, max_length=CONTACT_STATUS_BULK_MAX_IDS)
+    filter: Optional[ContactStatusFilter] = None
+
+class ContactSearchResult(ContactSubmission):
+    score: float
+
+# Public fields of stored documents. Reads project to these fields and encode
+# the trusted documents directly, without rebuilding the models.
+CONTACT_FIELDS = tuple(ContactSubmission.model_fields)
+STATUS_CHECK_FIELDS = tuple(StatusCheck.model_fields)
+CONTACT_EXPORT_SCHEMA = (
+    export.arrow_schema(CONTACT_FIELDS, timestamps=("submitted_at",), integers=("version",))
+    if export.parquet_available() else None
+)
+
+# Counters kept by the cache, rate limiter and write buffer, mirrored into the
+# registry whenever /api/metrics is scraped
+cache_events = metrics.counter("greenloop_response_cache_events_total", "Response cache lookups and removals.", ("event",))
+cache_size = metrics.gauge("greenloop_response_cache_size", "Response cache entries and bytes held.", ("unit",))
+rate_limit_requests = metrics.counter("greenloop_rate_limit_requests_total", "Write requests seen by the rate limiter.", ("route", "decision"))
+writes_in_flight = metrics.gauge("greenloop_writes_in_flight", "Rate-limited write requests currently being handled.")
+contact_buffer_pending = metrics.gauge("greenloop_contact_buffer_pending", "Contact submissions queued in the write buffer.")
+outbox_messages = metrics.counter("greenloop_outbox_messages_total", "Outbox messages handled by this process's workers.", ("outcome",))
+contact_stream_clients = metrics.gauge("greenloop_contact_stream_clients", "Clients connected to the live contact feed.")
+contact_stream_events = metrics.counter("greenloop_contact_stream_events_total", "Live contact feed events and clients.", ("event",))
+startup_duration = metrics.gauge("greenloop_startup_duration_seconds", "Time spent in each startup phase of this process.", ("phase",))
+
+def collect_component_metrics() -> None:
+    cache = response_cache.stats()
+    for event in ("hits", "misses", "evictions", "invalidations"):
+        cache_events.set((event,), cache[event])
+    cache_size.set(("entries",), cache["entries"])
+    cache_size.set(("bytes",), cache["bytes"])
+    limits = rate_limiter.stats()
+    for route, counts in limits["routes"].items():
+        rate_limit_requests.set((route, "admitted"), counts["admitted"])
+        rate_limit_requests.set((route, "throttled"), counts["throttled"])
+    rate_limit_requests.set(("*", "concurrency_rejected"), limits["concurrency_rejected"])
+    writes_in_flight.set((), limits["in_flight"])
+    contact_buffer_pending.set((), len(contact_write_buffer) if contact_write_buffer is not None else 0)
+    if outbox_worker is not None:
+        for outcome, count in outbox_worker.stats().items():
+            outbox_messages.set((outcome,), count)
+    stream = contact_events.stats()
+    contact_stream_clients.set((), stream["subscribers"])
+    for event in ("published", "dropped", "resets"):
+        contact_stream_events.set((event,), stream[event])
+    for phase in ("open", "warm_up", "total"):
+        if f"{phase}_ms" in startup_timings:
+            startup_duration.set((phase,), startup_timings[f"{phase}_ms"] / 1000)
+
+metrics.on_collect(collect_component_metrics)
+
+# Keyset pagination helpers
+def _as_naive_utc(value: datetime) -> datetime:
+    """Stored datetimes are naive UTC, so normalise aware query values to match."""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+def encode_contact_cursor(submitted_at: datetime, submission_id: str) -> str:
+    raw = f"{submitted_at.isoformat()}|{submission_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def contact_filters(status: Optional[ContactStatus], interest: Optional[str], submitted_after: Optional[datetime],
+                    submitted_before: Optional[datetime]) -> ContactFilters:
+    return ContactFilters(
+        status=status,
+        interest=interest,
+        submitted_after=_as_naive_utc(submitted_after) if submitted_after else None,
+        submitted_before=_as_naive_utc(submitted_before) if submitted_before else None,
+    )
+
+def decode_contact_cursor(cursor: str) -> ContactKey:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        submitted_at, submission_id = base64.urlsafe_b64decode(padded).decode().split("|", 1)
+        return _as_naive_utc(datetime.fromisoformat(submitted_at)), submission_id
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+# Status check time series
+async def maintain_status_checks(now: datetime) -> None:
+    """Downsample completed minutes and hours, then drop data past its retention."""
+    settled = now - timedelta(seconds=STATUS_DOWNSAMPLE_DELAY)
+    for resolution in SUMMARY_RESOLUTIONS:
+        await datastore.status_checks.downsample(resolution, floor_time(settled, resolution))
+    await datastore.status_checks.purge(now)
+    response_cache.invalidate("status")
+
+async def run_status_maintenance() -> None:
+    while True:
+        try:
+            await maintain_status_checks(datetime.utcnow())
+        except Exception as e:
+            logging.error(f"Status check maintenance failed: {str(e)}")
+        await asyncio.sleep(STATUS_DOWNSAMPLE_INTERVAL)
+
+def status_resolution(since: Optional[datetime], until: Optional[datetime], now: datetime) -> str:
+    """The cheapest tier that still holds ``since`` at a useful granularity for the range."""
+    if since is None:
+        return "raw"
+    span = (until or now) - since
+    if span <= STATUS_AUTO_RAW_SPAN and since >= now - STATUS_RETENTION.raw:
+        return "raw"
+    if span <= STATUS_AUTO_MINUTE_SPAN and since >= now - STATUS_RETENTION.minute:
+        return "minute"
+    return "hour"
+
+# Contact form response bodies shared by the single and batch endpoints
+def contact_validation_error(e: Exception) -> dict:
+    if isinstance(e, ValidationError):
+        # Per field, with the messages the single endpoint's 422 carries
+        errors = {}
+        for error in e.errors(include_url=False):
+            field = ".".join(str(part) for part in error["loc"]) or "validation"
+            errors.setdefault(field, []).append(error["msg"])
+    else:
+        errors = {"validation": [str(e)]}
+    return {
+        "success": False,
+        "message": "Please check your input and try again.",
+        "errors": errors
+    }
+
+def contact_server_error() -> dict:
+    return {
+        "success": False,
+        "message": "An error occurred while processing your request. Please try again later."
+    }
+
+def contact_success(submission_id: str, replayed: bool = False) -> JSONResponse:
+    return JSONResponse(
+        status_code=200,
+        headers={"Idempotent-Replayed": "true"} if replayed else None,
+        content={
+            "success": True,
+            "message": "Thank you for your message! We'll get back to you soon.",
+            "id": submission_id
+        }
+    )
+
+# Contact submission duplicate suppression
+def contact_dedup_key(idempotency_key: Optional[str], submission: ContactSubmission) -> Tuple[Optional[str], int]:
+    """The key a submission is deduplicated on and how long it is held."""
+    if idempotency_key:
+        if len(idempotency_key) > IDEMPOTENCY_KEY_MAX_LENGTH:
+            raise ValueError(f"Idempotency-Key must be at most {IDEMPOTENCY_KEY_MAX_LENGTH} characters")
+        return header_key(idempotency_key), CONTACT_IDEMPOTENCY_TTL
+    if CONTACT_DEDUP_WINDOW > 0:
+        return content_key(submission.email, submission.message), CONTACT_DEDUP_WINDOW
+    return None, 0
+
+async def claim_contact_key(key: str, fingerprint: str, submission_id: str) -> Optional[dict]:
+    """Claim ``key`` as pending for this submission, or return the record of the submission that holds it."""
+    original = recent_contact_keys.get(key)
+    if original is None:
+        record = {"fingerprint": fingerprint, "id": submission_id, "state": "pending"}
+        expires_at = datetime.utcnow() + timedelta(seconds=CONTACT_IDEMPOTENCY_PENDING_TTL)
+        original = await datastore.idempotency.claim(key, record, expires_at)
+        # Claims from before the state was recorded were only made for completed writes
+        if original is not None and original.get("state", "done") == "done":
+            recent_contact_keys.put(key, original)
+    return original
+
+async def complete_contact_key(key: str, ttl: int, fingerprint: str, submission_id: str) -> None:
+    """Keep ``key`` for replays now that its submission is stored."""
+    record = {"fingerprint": fingerprint, "id": submission_id, "state": "done"}
+    expires_at = datetime.utcnow() + timedelta(seconds=ttl)
+    try:
+        await datastore.idempotency.complete(key, record, expires_at)
+    except Exception as e:
+        # The pending claim still expires on its own; until then repeats get 409
+        logging.error(f"Failed to complete idempotency key: {str(e)}")
+        return
+    recent_contact_keys.put(key, {**record, "expires_at": expires_at})
+
+async def release_contact_key(key: str) -> None:
+    recent_contact_keys.discard(key)
+    try:
+        await datastore.idempotency.release(key)
+    except Exception as e:
+        logging.error(f"Failed to release idempotency key: {str(e)}")
+
+def settle_contact_key(key: str, ttl: int, fingerprint: str, submission_id: str, write: asyncio.Future) -> None:
+    """Complete or release the claim of a buffered write once its flush is done."""
+    if write.cancelled() or write.exception() is not None:
+        settle = release_contact_key(key)
+    else:
+        settle = complete_contact_key(key, ttl, fingerprint, submission_id)
+    task = asyncio.create_task(settle)
+    contact_key_tasks.add(task)
+    task.add_done_callback(contact_key_tasks.discard)
+
+def contact_outbox(documents: List[dict]) -> List[dict]:
+    """Outbox messages to store with new submissions."""
+    return [contact_notification(document) for document in documents] if NOTIFY_EMAIL_TO else []
+
+# Live contact feed
+def publish_contact_events(event: str, documents: Iterable[dict]) -> None:
+    """Announce this process's writes on the live feed, unless a change stream does that."""
+    if CONTACT_EVENTS_SOURCE == "local":
+        for document in documents:
+            contact_events.publish(event, document)
+
+async def follow_contact_changes() -> None:
+    """Feed the live feed from the Mongo change stream, resuming after the last change seen."""
+    token = None
+    while True:
+        try:
+            async for token, event, document in datastore.contacts.watch(token):
+                if event == "created":
+                    document = {field: document.get(field) for field in CONTACT_FIELDS}
+                contact_events.publish(event, document, token)
+        except Exception as e:
+            logging.error(f"Contact change stream failed: {str(e)}")
+            await asyncio.sleep(1)
+
+async def contact_event_frames(subscription) -> AsyncIterator[bytes]:
+    yield f"retry: {CONTACT_STREAM_RETRY_MS}\n\n".encode()
+    try:
+        while True:
+            try:
+                frames = await subscription.get(CONTACT_STREAM_HEARTBEAT)
+            except SlowSubscriberError:
+                # The client reconnects with Last-Event-ID and catches up from the replay buffer
+                return
+            # A comment line keeps idle connections from being cut by proxies
+            yield frames or b": keepalive\n\n"
+    finally:
+        contact_events.unsubscribe(subscription)
+
+async def contacts_written(documents: List[dict]) -> None:
+    """Bring the cache, the live feed and the analytics rollup up to date with newly stored submissions."""
+    response_cache.invalidate("contact")
+    publish_contact_events("created", ({field: document.get(field) for field in CONTACT_FIELDS} for document in documents))
+    if outbox_worker is not None:
+        outbox_worker.notify()
+    deltas = Counter()
+    for document in documents:
+        deltas.update(contact_stats_deltas(document))
+    try:
+        await datastore.contact_stats.increment(dict(deltas))
+    except Exception as e:
+        # The submissions are stored; rebuild_contact_stats.py repairs the counts
+        logging.error(f"Failed to update contact stats: {str(e)}")
+
+async def contacts_status_changed(previous: List[dict], status: str) -> None:
+    """Bring the cache, the live feed and the rollup up to date after moving submissions (as they were before) to ``status``."""
+    response_cache.invalidate("contact")
+    publish_contact_events("status", (
+        {"id": document["id"], "status": status, "version": (document.get("version") or INITIAL_VERSION) + 1}
+        for document in previous
+    ))
+    deltas = Counter()
+    for document in previous:
+        deltas.update(contact_status_change_deltas(document, status))
+    try:
+        await datastore.contact_stats.increment({bucket: delta for bucket, delta in deltas.items() if delta})
+    except Exception as e:
+        logging.error(f"Failed to update contact stats: {str(e)}")
+
+async def save_contact_submission(submission: ContactSubmission, track: bool = False) -> Optional[asyncio.Future]:
+    """Write a submission directly or through the write buffer (may raise BufferFullError).
+
+    With ``enqueue`` acks the buffered write is still in flight on return:
+    with ``track`` its future is returned, otherwise failures are only
+    logged. In every other case the submission is stored when this returns.
+    """
+    if contact_write_buffer is not None:
+        enqueue = CONTACT_WRITE_ACK == "enqueue"
+        pending = contact_write_buffer.submit(submission.dict(), wait=track or not enqueue)
+        if enqueue:
+            return pending
+        await pending
+    else:
+        document = submission.dict()
+        await datastore.contacts.insert(document, contact_outbox([document]))
+        await contacts_written([document])
+
+def parse_contact_batch(body: bytes, content_type: str) -> list:
+    """Split a batch body into raw items.
+
+    NDJSON lines that are not valid JSON are kept as ``ValueError`` items so
+    they are reported per item; a malformed JSON array rejects the batch.
+    """
+    if NDJSON_MEDIA_TYPE in content_type:
+        items = []
+        for line in body.decode().splitlines():
+            if not line.strip():
+                continue
+            try:
+                items.append(json.loads(line))
+            except ValueError as e:
+                items.append(ValueError(f"Invalid JSON: {str(e)}"))
+        return items
+    items = json.loads(body)
+    if not isinstance(items, list):
+        raise ValueError("Request body must be a JSON array of contact submissions")
+    return items
+
+def summarize_contact_stats(buckets: List[dict], period: str) -> dict:
+    """Fold daily rollup buckets into totals and a per-day or per-week series."""
+    totals = {"total": 0, "by_status": Counter(), "by_interest": Counter()}
+    series = {}
+    for bucket in buckets:
+        start = date.fromisoformat(bucket["day"])
+        if period == "week":
+            start -= timedelta(days=start.weekday())
+        point = series.setdefault(start, {"total": 0, "by_status": Counter(), "by_interest": Counter()})
+        for summary in (totals, point):
+            if bucket["dimension"] == "total":
+                summary["total"] += bucket["count"]
+            else:
+                summary[f"by_{bucket['dimension']}"][bucket["value"]] += bucket["count"]
+
+    def counts(summary: dict) -> dict:
+        return {
+            "total": summary["total"],
+            "by_status": {value: count for value, count in sorted(summary["by_status"].items()) if count},
+            "by_interest": {value: count for value, count in sorted(summary["by_interest"].items()) if count},
+        }
+
+    return {
+        **counts(totals),
+        "period": period,
+        "series": [{"start": start.isoformat(), **counts(series[start])} for start in sorted(series)],
+    }
+
+# Cached JSON responses
+def cached_json_response(request: Request, entry: CachedResponse) -> Response:
+    headers = {**entry.headers, "ETag": entry.etag, "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), entry.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(entry.body, media_type="application/json", headers=headers)
+
+# Streaming helpers
+def wants_ndjson(request: Request, stream: bool) -> bool:
+    return stream or NDJSON_MEDIA_TYPE in request.headers.get("accept", "")
+
+async def ndjson_lines(documents, name: str):
+    """Encode documents one per line as the repository yields them."""
+    try:
+        async for document in documents:
+            yield fast_json.dumps(document) + b"\n"
+    except Exception as e:
+        # Headers are already sent, so the client only sees a truncated stream
+        logging.error(f"Error streaming {name}: {str(e)}")
+
+def ndjson_response(documents, name: str) -> StreamingResponse:
+    return StreamingResponse(ndjson_lines(documents, name), media_type=NDJSON_MEDIA_TYPE)
 
 # Add your routes to the router instead of directly to app
 @api_router.get("/")
 async def root():
     return {"message": "GreenLoop Project API is running"}
 
+@api_router.get("/healthz")
+async def healthz():
+    # Liveness only: no datastore call, so a slow database does not get the process restarted
+    return {"status": "ok"}
+
+@api_router.get("/readyz")
+async def readyz():
+    if not accepting_traffic:
+        return JSONResponse({"status": "unavailable", "reason": "Starting up or shutting down"}, status_code=503)
+    started = time.perf_counter()
+    try:
+        await asyncio.wait_for(datastore.ping(), READINESS_TIMEOUT_MS / 1000)
+    except asyncio.TimeoutError:
+        return JSONResponse({"status": "unavailable", "reason": f"No datastore reply within {READINESS_TIMEOUT_MS} ms"}, status_code=503)
+    except Exception as e:
+        logging.error(f"Readiness check failed: {str(e)}")
+        return JSONResponse({"status": "unavailable", "reason": "Datastore unreachable"}, status_code=503)
+    return {
+        "status": "ready",
+        "datastore": datastore.name,
+        "latency_ms": round((time.perf_counter() - started) * 1000, 2),
+        "startup_ms": startup_timings,
+    }
+
 @api_router.post("/status", response_model=StatusCheck)
 async def create_status_check(input: StatusCheckCreate):
     status_dict = input.dict()
     status_obj = StatusCheck(**status_dict)
-    _ = await db.status_checks.insert_one(status_obj.dict())
+    await datastore.status_checks.insert(status_obj.dict())
+    response_cache.invalidate("status")
     return status_obj
 
-@api_router.get("/status", response_model=List[StatusCheck])
-async def get_status_checks():
-    status_checks = await db.status_checks.find().to_list(1000)
-    return [StatusCheck(**status_check) for status_check in status_checks]
+@api_router.get("/status", response_model=Union[List[StatusCheck], List[StatusCheckSummary]])
+async def get_status_checks(
+    request: Request,
+    client_name: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    resolution: Literal["auto", "raw", "minute", "hour"] = "auto",
+    limit: int = Query(STATUS_PAGE_SIZE_MAX, ge=1, le=STATUS_PAGE_SIZE_MAX),
+    stream: bool = False,
+):
+    """List status checks, newest first.
+
+    ``resolution=raw`` returns individual checks; ``minute`` and ``hour``
+    return per-client summaries (count, first and last seen) for completed
+    intervals. ``auto`` picks raw checks for short recent ranges and coarser
+    summaries for longer or older ones; the tier used is returned in the
+    ``X-Resolution`` header. ``since`` is inclusive, ``until`` exclusive.
+
+    With ``?stream=1`` or ``Accept: application/x-ndjson`` every retained
+    raw check is streamed as NDJSON and the other parameters are ignored.
+    """
+    if wants_ndjson(request, stream):
+        return ndjson_response(datastore.status_checks.iterate(STREAM_BATCH_SIZE, STATUS_CHECK_FIELDS), "status checks")
+    since = _as_naive_utc(since) if since else None
+    until = _as_naive_utc(until) if until else None
+    if resolution == "auto":
+        resolution = status_resolution(since, until, datetime.utcnow())
+    cache_key = ResponseCache.key("status", request.url.path, request.url.query)
+    entry = response_cache.get(cache_key)
+    if entry is None:
+        generation = response_cache.generation("status")
+        if resolution == "raw":
+            status_checks = await datastore.status_checks.list(limit, STATUS_CHECK_FIELDS, client_name, since, until)
+        else:
+            status_checks = await datastore.status_checks.summaries(resolution, limit, client_name, since, until)
+        with timed("serialize"):
+            body = fast_json.dumps(status_checks)
+        entry = response_cache.put(cache_key, body, {"X-Resolution": resolution}, generation=generation)
+    return cached_json_response(request, entry)
 
 @api_router.post("/contact")
-async def submit_contact_form(contact_data: ContactSubmissionCreate):
+async def submit_contact_form(contact_data: ContactSubmissionCreate, idempotency_key: Optional[str] = Header(None)):
     try:
         # Create contact submission object
         submission = ContactSubmission(**contact_data.dict())
         
+        # Retries and double submits get the original response back
+        dedup_key, dedup_ttl = contact_dedup_key(idempotency_key, submission)
+        if dedup_key:
+            fingerprint = request_fingerprint(contact_data.dict())
+            original = await claim_contact_key(dedup_key, fingerprint, submission.id)
+            if original is not None:
+                if idempotency_key and original["fingerprint"] != fingerprint:
+                    return JSONResponse(
+                        status_code=422,
+                        content={
+                            "success": False,
+                            "message": "This Idempotency-Key was already used for a different submission."
+                        }
+                    )
+                if original.get("state", "done") == "pending":
+                    # Its write may still fail, so there is nothing to replay yet
+                    return JSONResponse(
+                        status_code=409,
+                        headers={"Retry-After": str(CONTACT_IDEMPOTENCY_RETRY_AFTER)},
+                        content={
+                            "success": False,
+                            "message": "This submission is still being processed. Please try again in a moment."
+                        }
+                    )
+                return contact_success(original["id"], replayed=True)
+        
         # Save to database
-        result = await db.contact_submissions.insert_one(submission.dict())
+        try:
+            in_flight = await save_contact_submission(submission, track=dedup_key is not None)
+        except Exception:
+            if dedup_key:
+                await release_contact_key(dedup_key)
+            raise
+        if dedup_key:
+            if in_flight is None:
+                await complete_contact_key(dedup_key, dedup_ttl, fingerprint, submission.id)
+            else:
+                in_flight.add_done_callback(
+                    functools.partial(settle_contact_key, dedup_key, dedup_ttl, fingerprint, submission.id)
+                )
         
-        if result.inserted_id:
-            return JSONResponse(
-                status_code=200,
-                content={
-                    "success": True,
-                    "message": "Thank you for your message! We'll get back to you soon.",
-                    "id": submission.id
-                }
-            )
-        else:
-            raise HTTPException(status_code=500, detail="Failed to save submission")
+        return contact_success(submission.id)
             
-    except ValueError as e:
+    except BufferFullError:
         return JSONResponse(
-            status_code=400,
+            status_code=503,
+            headers={"Retry-After": str(CONTACT_BUFFER_RETRY_AFTER)},
             content={
                 "success": False,
-                "message": "Please check your input and try again.",
-                "errors": {"validation": [str(e)]}
+                "message": "We're receiving a lot of messages right now. Please try again in a moment."
             }
         )
+    except ValueError as e:
+        return JSONResponse(status_code=400, content=contact_validation_error(e))
     except Exception as e:
         logging.error(f"Contact form submission error: {str(e)}")
-        return JSONResponse(
-            status_code=500,
-            content={
-                "success": False,
-                "message": "An error occurred while processing your request. Please try again later."
-            }
-        )
+        return JSONResponse(status_code=500, content=contact_server_error())
+
+@api_router.post("/contact/batch")
+async def submit_contact_batch(request: Request):
+    """Submit many contact forms at once (JSON array or NDJSON body).
+
+    Every item is validated, the valid ones are written with one unordered
+    insert_many, and the response lists a result per item in request order:
+    the new id, or the same error body that POST /api/contact returns.
+    """
+    body = await request.body()
+    if len(body) > CONTACT_BATCH_MAX_BYTES:
+        return JSONResponse(status_code=413, content={
+            "success": False,
+            "message": f"Batch body must be at most {CONTACT_BATCH_MAX_BYTES} bytes."
+        })
+    try:
+        items = parse_contact_batch(body, request.headers.get("content-type", ""))
+    except ValueError as e:
+        return JSONResponse(status_code=400, content=contact_validation_error(e))
+    if len(items) > CONTACT_BATCH_MAX_ITEMS:
+        return JSONResponse(status_code=413, content={
+            "success": False,
+            "message": f"Batch must contain at most {CONTACT_BATCH_MAX_ITEMS} submissions."
+        })
+
+    results = []
+    documents = []
+    document_indexes = []
+    with timed("validate"):
+        for index, item in enumerate(items):
+            try:
+                if isinstance(item, Exception):
+                    raise item
+                if not isinstance(item, dict):
+                    raise ValueError("Each submission must be a JSON object")
+                submission = ContactSubmission(**ContactSubmissionCreate(**item).dict())
+            except ValueError as e:
+                results.append({"index": index, **contact_validation_error(e)})
+                continue
+            results.append({"index": index, "success": True, "id": submission.id})
+            documents.append(submission.dict())
+            document_indexes.append(index)
+
+    if documents:
+        try:
+            await datastore.contacts.insert_many(documents, contact_outbox(documents))
+            await contacts_written(documents)
+        except BulkInsertError as e:
+            await contacts_written([document for index, document in enumerate(documents) if index not in e.failed])
+            for document_index, error in e.failed.items():
+                index = document_indexes[document_index]
+                logging.error(f"Contact batch item {index} write error: {error}")
+                results[index] = {"index": index, **contact_server_error()}
+        except Exception as e:
+            logging.error(f"Contact batch submission error: {str(e)}")
+            return JSONResponse(status_code=500, content=contact_server_error())
+
+    accepted = sum(1 for result in results if result["success"])
+    return JSONResponse(
+        status_code=200,
+        content={
+            "success": accepted == len(results),
+            "accepted": accepted,
+            "rejected": len(results) - accepted,
+            "results": results
+        }
+    )
 
 @api_router.get("/contact", response_model=List[ContactSubmission])
-async def get_contact_submissions():
-    """Get all contact submissions (for admin use)"""
+async def get_contact_submissions(
+    request: Request,
+    limit: int = Query(CONTACT_PAGE_SIZE_DEFAULT, ge=1, le=CONTACT_PAGE_SIZE_MAX),
+    cursor: Optional[str] = None,
+    status: Optional[ContactStatus] = None,
+    interest: Optional[str] = None,
+    submitted_after: Optional[datetime] = None,
+    submitted_before: Optional[datetime] = None,
+    stream: bool = False,
+):
+    """Get contact submissions, newest first (for admin use).
+
+    Results are keyset-paginated: when more rows exist, the opaque cursor for
+    the next page is returned in the ``X-Next-Cursor`` header. In streaming
+    mode (``?stream=1`` or ``Accept: application/x-ndjson``) every matching
+    submission after ``cursor`` is streamed as NDJSON and ``limit`` is ignored.
+    Non-streamed pages are cached and carry an ETag for conditional polling.
+    """
+    after = decode_contact_cursor(cursor) if cursor else None
+    filters = contact_filters(status, interest, submitted_after, submitted_before)
+    if wants_ndjson(request, stream):
+        return ndjson_response(
+            datastore.contacts.iterate(filters, after, STREAM_BATCH_SIZE, CONTACT_FIELDS), "contact submissions"
+        )
+    cache_key = ResponseCache.key("contact", request.url.path, request.url.query)
+    entry = response_cache.get(cache_key)
+    if entry is not None:
+        return cached_json_response(request, entry)
+    generation = response_cache.generation("contact")
     try:
-        submissions = await db.contact_submissions.find().sort("submitted_at", -1).to_list(100)
-        return [ContactSubmission(**submission) for submission in submissions]
+        submissions = await datastore.contacts.list_page(filters, limit + 1, after, CONTACT_FIELDS)
+        headers = {}
+        if len(submissions) > limit:
+            submissions = submissions[:limit]
+            last = submissions[-1]
+            headers["X-Next-Cursor"] = encode_contact_cursor(last["submitted_at"], last["id"])
+        with timed("serialize"):
+            body = fast_json.dumps(submissions)
     except Exception as e:
         logging.error(f"Error fetching contact submissions: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to fetch submissions")
+    return cached_json_response(request, response_cache.put(cache_key, body, headers, generation=generation))
+
+@api_router.get("/contact/search", response_model=List[ContactSearchResult])
+async def search_contact_submissions(
+    request: Request,
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(CONTACT_SEARCH_PAGE_SIZE_DEFAULT, ge=1, le=CONTACT_SEARCH_PAGE_SIZE_MAX),
+    offset: int = Query(0, ge=0, le=CONTACT_SEARCH_MAX_OFFSET),
+    status: Optional[ContactStatus] = None,
+    interest: Optional[str] = None,
+):
+    """Search submissions by name, organization and message, most relevant first.
+
+    Matches any word of ``q``; a name match ranks above an organization
+    match, which ranks above a message match. When more results exist the
+    offset of the next page is returned in the ``X-Next-Offset`` header.
+    """
+    cache_key = ResponseCache.key("contact", request.url.path, request.url.query)
+    entry = response_cache.get(cache_key)
+    if entry is not None:
+        return cached_json_response(request, entry)
+    generation = response_cache.generation("contact")
+    try:
+        results = await datastore.contacts.search(
+            q, ContactFilters(status=status, interest=interest), limit + 1, offset, CONTACT_FIELDS
+        )
+        headers = {}
+        if len(results) > limit:
+            results = results[:limit]
+            if offset + limit <= CONTACT_SEARCH_MAX_OFFSET:
+                headers["X-Next-Offset"] = str(offset + limit)
+        with timed("serialize"):
+            body = fast_json.dumps(results)
+    except Exception as e:
+        logging.error(f"Error searching contact submissions: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to search submissions")
+    return cached_json_response(request, response_cache.put(cache_key, body, headers, generation=generation))
+
+@api_router.get("/contact/stats")
+async def get_contact_stats(
+    request: Request,
+    period: Literal["day", "week"] = "day",
+    since: Optional[date] = None,
+    until: Optional[date] = None,
+):
+    """Submission counts by status and interest, overall and per day or week.
+
+    Served from the rollup maintained on every write, so the cost grows with
+    the number of days in range, not with the number of submissions. Weeks
+    start on Monday; ``since`` and ``until`` are inclusive days (UTC).
+    """
+    cache_key = ResponseCache.key("contact", request.url.path, request.url.query)
+    entry = response_cache.get(cache_key)
+    if entry is None:
+        generation = response_cache.generation("contact")
+        try:
+            buckets = await datastore.contact_stats.buckets(
+                since.isoformat() if since else None, until.isoformat() if until else None
+            )
+        except Exception as e:
+            logging.error(f"Error fetching contact stats: {str(e)}")
+            raise HTTPException(status_code=500, detail="Failed to fetch contact stats")
+        entry = response_cache.put(cache_key, fast_json.dumps(summarize_contact_stats(buckets, period)), generation=generation)
+    return cached_json_response(request, entry)
+
+@api_router.get("/contact/export")
+async def export_contact_submissions(
+    format: Literal["csv", "parquet"] = "csv",
+    cursor: Optional[str] = None,
+    status: Optional[ContactStatus] = None,
+    interest: Optional[str] = None,
+    submitted_after: Optional[datetime] = None,
+    submitted_before: Optional[datetime] = None,
+):
+    """Download matching submissions, newest first, as CSV or Parquet.
+
+    Takes the same filters as GET /api/contact. Rows are read from the
+    datastore in batches and encoded as they arrive, so the export never
+    holds the whole result in memory.
+    """
+    if format == "parquet" and CONTACT_EXPORT_SCHEMA is None:
+        raise HTTPException(status_code=501, detail="Parquet export is not available on this server")
+    after = decode_contact_cursor(cursor) if cursor else None
+    filters = contact_filters(status, interest, submitted_after, submitted_before)
+    documents = datastore.contacts.iterate(filters, after, STREAM_BATCH_SIZE, CONTACT_FIELDS)
+    if format == "csv":
+        chunks = export.csv_chunks(documents, CONTACT_FIELDS, STREAM_BATCH_SIZE)
+    else:
+        chunks = export.parquet_chunks(documents, CONTACT_EXPORT_SCHEMA, EXPORT_PARQUET_ROW_GROUP_SIZE)
+    filename = f"contact-submissions-{datetime.utcnow():%Y%m%dT%H%M%SZ}.{format}"
+    return StreamingResponse(
+        chunks,
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+@api_router.get("/contact/stream")
+async def stream_contact_events(
+    last_event_id: Optional[str] = Header(None),
+    last_event_id_query: Optional[str] = Query(None, alias="last_event_id", description="For clients that cannot set headers"),
+):
+    """Server-Sent Events feed of submissions as they change.
+
+    ``created`` events carry a new submission, ``status`` events the id,
+    status and version of one whose status changed. Reconnecting with
+    Last-Event-ID replays what was missed; ``reset`` means those events are
+    gone and the list should be reloaded.
+    """
+    try:
+        subscription = contact_events.subscribe(last_event_id or last_event_id_query)
+    except SubscriberLimitError:
+        raise HTTPException(status_code=503, detail="Too many live feed clients", headers={"Retry-After": "30"})
+    return StreamingResponse(
+        contact_event_frames(subscription),
+        media_type="text/event-stream",
+        # X-Accel-Buffering stops nginx from holding events back
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@api_router.patch("/contact")
+async def update_contact_statuses(update: ContactBulkStatusUpdate):
+    """Move many submissions to a status: those listed in ``ids``, or every one matching ``filter``.
+
+    Submissions already at the status are left as they are; the others get
+    the new status and a new version.
+    """
+    if (update.ids is None) == (update.filter is None):
+        raise HTTPException(status_code=422, detail="Give either ids or filter")
+    filters = None
+    if update.filter is not None:
+        filters = contact_filters(
+            update.filter.status, update.filter.interest, update.filter.submitted_after, update.filter.submitted_before
+        )
+    try:
+        previous = await datastore.contacts.set_status_many(update.status, update.ids, filters)
+    except Exception as e:
+        logging.error(f"Error updating contact statuses: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to update submissions")
+    if previous:
+        await contacts_status_changed(previous, update.status)
+    return {"success": True, "status": update.status, "updated": len(previous)}
+
+# Declared after the fixed /contact/... paths so that they are matched first
+@api_router.get("/contact/{submission_id}", response_model=ContactSubmission)
+async def get_contact_submission(request: Request, submission_id: str):
+    """Get one submission; cached and ETagged like the list."""
+    cache_key = ResponseCache.key("contact", request.url.path, request.url.query)
+    entry = response_cache.get(cache_key)
+    if entry is None:
+        generation = response_cache.generation("contact")
+        try:
+            submission = await datastore.contacts.get(submission_id, CONTACT_FIELDS)
+        except Exception as e:
+            logging.error(f"Error fetching contact submission: {str(e)}")
+            raise HTTPException(status_code=500, detail="Failed to fetch submission")
+        if submission is None:
+            raise HTTPException(status_code=404, detail="Submission not found")
+        entry = response_cache.put(cache_key, fast_json.dumps(submission), generation=generation)
+    return cached_json_response(request, entry)
+
+@api_router.patch("/contact/{submission_id}", response_model=ContactSubmission)
+async def update_contact_status(submission_id: str, update: ContactStatusUpdate):
+    """Move a submission to another status and return it.
+
+    With ``version`` the change only applies if nobody changed the
+    submission since that version was read; otherwise the answer is 409.
+    """
+    try:
+        previous = await datastore.contacts.set_status(submission_id, update.status, update.version)
+        current = await datastore.contacts.get(submission_id, ("version",)) if previous is None else None
+    except Exception as e:
+        logging.error(f"Error updating contact submission: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to update submission")
+    if previous is None:
+        if current is None:
+            raise HTTPException(status_code=404, detail="Submission not found")
+        raise HTTPException(
+            status_code=409,
+            detail=f"Submission is at version {current.get('version') or INITIAL_VERSION}, not {update.version}",
+        )
+    await contacts_status_changed([previous], update.status)
+    submission = {field: previous.get(field) for field in CONTACT_FIELDS}
+    submission["status"] = update.status
+    submission["version"] = (previous.get("version") or INITIAL_VERSION) + 1
+    return Response(fast_json.dumps(submission), media_type="application/json")
+
+@api_router.get("/cache/stats")
+async def get_cache_stats():
+    """Response cache hit/miss counters."""
+    return response_cache.stats()
+
+@api_router.get("/rate-limit/stats")
+async def get_rate_limit_stats():
+    """Admitted versus throttled write requests."""
+    return rate_limiter.stats()
+
+@api_router.get("/outbox/stats")
+async def get_outbox_stats():
+    """Outbox messages by status, and what this process's workers have handled."""
+    try:
+        counts = await datastore.outbox.counts()
+    except Exception as e:
+        logging.error(f"Error fetching outbox stats: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to fetch outbox stats")
+    return {"messages": counts, "worker": outbox_worker.stats() if outbox_worker is not None else None}
+
+@api_router.get("/metrics")
+async def get_metrics():
+    """Latency histograms, datastore timings and component counters for Prometheus."""
+    return Response(metrics.render(), media_type=PROMETHEUS_MEDIA_TYPE)
 
 # Include the router in the main app
 app.include_router(api_router)
 
+# Added before CORS so that CORS stays outermost and 429s carry its headers
+app.add_middleware(RateLimitMiddleware, limiter=rate_limiter)
+
+# Wraps the rate limiter so that rejected requests are measured too
+if METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware, registry=metrics, server_timing=SERVER_TIMING_ENABLED)
+
 app.add_middleware(
     CORSMiddleware,
     allow_credentials=True,
     allow_origins=os.environ.get('CORS_ORIGINS', '*').split(','),
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Next-Offset", "X-Resolution", "ETag", "Idempotent-Replayed", "Content-Disposition"],
 )
 
 # Configure logging
@@ -174,7 +1196,3 @@ logging.basicConfig(
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 )
 logger = logging.getLogger(__name__)
-
-@app.on_event("shutdown")
-async def shutdown_db_client():
-    client.close()
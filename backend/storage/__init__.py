@@ -0,0 +1,156 @@
+"""Pluggable storage engines for the GreenLoop Project API.
+
+Engines are imported lazily so that e.g. the in-memory engine does not pull in
+Motor, and aiosqlite is only needed when the SQLite engine is selected.
+"""
+
+import os
+from datetime import timedelta
+from pathlib import Path
+from typing import Optional, Sequence
+
+from .base import (
+    BulkInsertError,
+    ContactFilters,
+    ContactKey,
+    ContactRepository,
+    ContactStatsRepository,
+    DuplicateKeyError,
+    INITIAL_VERSION,
+    IdempotencyRepository,
+    OUTBOX_STATUSES,
+    OutboxRepository,
+    RateLimitRepository,
+    Repository,
+    SEARCH_FIELD_WEIGHTS,
+    STATUS_RESOLUTIONS,
+    SUMMARY_RESOLUTIONS,
+    StatsBucket,
+    StatusCheckRepository,
+    StatusRetention,
+    StorageEngine,
+    STATS_DIMENSIONS,
+    UNSPECIFIED,
+    contact_stats_deltas,
+    contact_status_change_deltas,
+    floor_time,
+    outbox_message,
+    take_token,
+)
+
+ENGINES = ("mongo", "memory", "sqlite")
+DEFAULT_SQLITE_PATH = Path(__file__).resolve().parent.parent / 'greenloop.db'
+
+
+def status_retention_from_env() -> StatusRetention:
+    """Status check tiers from STATUS_RAW_RETENTION_HOURS, STATUS_MINUTE_RETENTION_DAYS and STATUS_HOUR_RETENTION_DAYS.
+
+    Shared by the API and the command-line tools: opening a Mongo engine
+    updates the TTL indexes to this retention, so every process must agree on it.
+    """
+    return StatusRetention(
+        raw=timedelta(hours=float(os.environ.get('STATUS_RAW_RETENTION_HOURS', '48'))),
+        minute=timedelta(days=float(os.environ.get('STATUS_MINUTE_RETENTION_DAYS', '30'))),
+        hour=timedelta(days=float(os.environ.get('STATUS_HOUR_RETENTION_DAYS', '400'))),
+    )
+
+
+def mongo_options_from_env() -> dict:
+    """Mongo client pool, timeout and compression options.
+
+    Each process has its own pool of up to MONGO_MAX_POOL_SIZE connections;
+    ``warm_up`` opens MONGO_MIN_POOL_SIZE of them. Requests wait at most
+    MONGO_WAIT_QUEUE_TIMEOUT_MS for a free connection. MONGO_COMPRESSORS (e.g.
+    "zstd,snappy,zlib") compresses traffic to a remote server; zstd and snappy
+    need the zstandard and python-snappy packages.
+    """
+    options = {
+        "maxPoolSize": int(os.environ.get('MONGO_MAX_POOL_SIZE', '100')),
+        "minPoolSize": int(os.environ.get('MONGO_MIN_POOL_SIZE', '10')),
+        "maxIdleTimeMS": int(os.environ.get('MONGO_MAX_IDLE_TIME_MS', '300000')),
+        "connectTimeoutMS": int(os.environ.get('MONGO_CONNECT_TIMEOUT_MS', '5000')),
+        "serverSelectionTimeoutMS": int(os.environ.get('MONGO_SERVER_SELECTION_TIMEOUT_MS', '5000')),
+        # 0 lets a query run as long as it needs
+        "socketTimeoutMS": int(os.environ.get('MONGO_SOCKET_TIMEOUT_MS', '0')),
+        "waitQueueTimeoutMS": int(os.environ.get('MONGO_WAIT_QUEUE_TIMEOUT_MS', '5000')),
+    }
+    if os.environ.get('MONGO_COMPRESSORS'):
+        options["compressors"] = os.environ['MONGO_COMPRESSORS']
+    return options
+
+
+def create_engine(name: str, mongo_url: Optional[str] = None, db_name: Optional[str] = None,
+                  sqlite_path: Optional[str] = None, event_listeners: Sequence = (),
+                  status_retention: Optional[StatusRetention] = None,
+                  mongo_options: Optional[dict] = None) -> StorageEngine:
+    """Build (but do not open) an engine.
+
+    ``event_listeners`` are pymongo listeners and ``mongo_options`` extra
+    keyword arguments (pool size, timeouts, compressors) for the Mongo client;
+    ``status_retention`` defaults to ``status_retention_from_env()``.
+    """
+    status_retention = status_retention or status_retention_from_env()
+    if name == "mongo":
+        from .mongo import MongoEngine
+        return MongoEngine(mongo_url, db_name, event_listeners, status_retention, mongo_options)
+    if name == "memory":
+        from .memory import MemoryEngine
+        return MemoryEngine(status_retention)
+    if name == "sqlite":
+        from .sqlite import SQLiteEngine
+        return SQLiteEngine(sqlite_path, status_retention)
+    raise ValueError(f"Unknown storage engine {name!r}; expected one of: {', '.join(ENGINES)}")
+
+
+def engine_from_env(event_listeners: Sequence = ()) -> StorageEngine:
+    """Build (but do not open) the engine configured in the environment.
+
+    STORAGE_ENGINE selects it: "mongo" (MONGO_URL + DB_NAME), "sqlite"
+    (SQLITE_PATH) or "memory". The API and the command-line tools all build
+    their engine here, so they share the retention and client settings.
+    """
+    return create_engine(
+        os.environ.get('STORAGE_ENGINE', 'mongo'),
+        mongo_url=os.environ.get('MONGO_URL'),
+        db_name=os.environ.get('DB_NAME'),
+        sqlite_path=os.environ.get('SQLITE_PATH', str(DEFAULT_SQLITE_PATH)),
+        event_listeners=event_listeners,
+        status_retention=status_retention_from_env(),
+        mongo_options=mongo_options_from_env(),
+    )
+
+
+__all__ = [
+    "BulkInsertError",
+    "ContactFilters",
+    "ContactKey",
+    "ContactRepository",
+    "ContactStatsRepository",
+    "DEFAULT_SQLITE_PATH",
+    "DuplicateKeyError",
+    "ENGINES",
+    "INITIAL_VERSION",
+    "IdempotencyRepository",
+    "OUTBOX_STATUSES",
+    "OutboxRepository",
+    "RateLimitRepository",
+    "Repository",
+    "SEARCH_FIELD_WEIGHTS",
+    "STATS_DIMENSIONS",
+    "STATUS_RESOLUTIONS",
+    "SUMMARY_RESOLUTIONS",
+    "StatsBucket",
+    "StatusCheckRepository",
+    "StatusRetention",
+    "StorageEngine",
+    "UNSPECIFIED",
+    "contact_stats_deltas",
+    "contact_status_change_deltas",
+    "create_engine",
+    "engine_from_env",
+    "floor_time",
+    "mongo_options_from_env",
+    "outbox_message",
+    "status_retention_from_env",
+    "take_token",
+]
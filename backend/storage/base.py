@@ -0,0 +1,354 @@
+"""Repository interfaces shared by every storage engine.
+
+Repositories take and return plain documents (dicts shaped like the pydantic
+models' ``.dict()``) so the route handlers do not depend on the engine. Read
+methods accept ``fields`` to fetch only those fields (projected in the query
+where the engine supports it); the engine's internal keys such as Mongo's
+``_id`` are never returned when ``fields`` is given.
+"""
+
+import uuid
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import AsyncIterator, Dict, List, Optional, Sequence, Tuple
+
+# Position after which a contact listing continues, as (submitted_at, id)
+ContactKey = Tuple[datetime, str]
+
+# Submissions stored before versioning count as version 1
+INITIAL_VERSION = 1
+
+# Contact submission rollup bucket: (day as YYYY-MM-DD, dimension, value).
+# Dimensions are "total" (value ""), "status" and "interest".
+StatsBucket = Tuple[str, str, str]
+STATS_DIMENSIONS = ("total", "status", "interest")
+UNSPECIFIED = "unspecified"
+
+# Fields covered by contact search and their relevance weights
+SEARCH_FIELD_WEIGHTS = {"name": 10, "organization": 5, "message": 1}
+
+
+class DuplicateKeyError(Exception):
+    """A document with the same unique key already exists."""
+
+
+class BulkInsertError(Exception):
+    """Some documents of an unordered bulk insert failed; the rest were written.
+
+    ``failed`` maps the index of each failed document to its error message.
+    """
+
+    def __init__(self, failed: Dict[int, str]):
+        super().__init__(f"{len(failed)} document(s) failed to insert")
+        self.failed = failed
+
+
+@dataclass
+class ContactFilters:
+    """Filters for contact listings. Datetimes are naive UTC."""
+    status: Optional[str] = None
+    interest: Optional[str] = None
+    submitted_after: Optional[datetime] = None
+    submitted_before: Optional[datetime] = None
+
+
+class Repository(ABC):
+    @abstractmethod
+    async def insert(self, document: dict) -> None:
+        ...
+
+    @abstractmethod
+    async def insert_many(self, documents: List[dict]) -> None:
+        """Insert documents without stopping at the first failure.
+
+        Raises ``BulkInsertError`` listing the documents that were not written.
+        """
+
+    @abstractmethod
+    async def get(self, document_id: str, fields: Optional[Sequence[str]] = None) -> Optional[dict]:
+        ...
+
+
+class ContactRepository(Repository):
+    """Contact submissions, listed newest first by (submitted_at, id).
+
+    Inserts take the outbox messages (see ``OutboxRepository``) to store
+    with the submissions, so a notification is queued if and only if its
+    submission was written. Each message's ``source_id`` names its submission.
+    """
+
+    @abstractmethod
+    async def insert(self, document: dict, outbox: Sequence[dict] = ()) -> None:
+        ...
+
+    @abstractmethod
+    async def insert_many(self, documents: List[dict], outbox: Sequence[dict] = ()) -> None:
+        """Insert documents without stopping at the first failure.
+
+        Raises ``BulkInsertError`` listing the documents that were not
+        written; their outbox messages are dropped.
+        """
+
+    @abstractmethod
+    async def list_page(self, filters: ContactFilters, limit: int, after: Optional[ContactKey] = None,
+                        fields: Optional[Sequence[str]] = None) -> List[dict]:
+        """Return up to ``limit`` submissions strictly after the ``after`` key."""
+
+    @abstractmethod
+    def iterate(self, filters: ContactFilters, after: Optional[ContactKey] = None, batch_size: int = 500,
+                fields: Optional[Sequence[str]] = None) -> AsyncIterator[dict]:
+        """Yield every matching submission, fetching ``batch_size`` at a time."""
+
+    @abstractmethod
+    async def search(self, query: str, filters: ContactFilters, limit: int, offset: int = 0,
+                     fields: Optional[Sequence[str]] = None) -> List[dict]:
+        """Return submissions matching any word of ``query``, most relevant first.
+
+        Each document carries its relevance as ``score``; scores are only
+        comparable within one engine.
+        """
+
+    @abstractmethod
+    async def set_status(self, document_id: str, status: str, expected_version: Optional[int] = None) -> Optional[dict]:
+        """Set one submission's status and bump its ``version``.
+
+        With ``expected_version`` the update only applies while the
+        submission is at that version. Returns the submission as it was
+        before, or None when nothing matched (missing, or at another version).
+        """
+
+    @abstractmethod
+    async def set_status_many(self, status: str, ids: Optional[Sequence[str]] = None,
+                              filters: Optional[ContactFilters] = None) -> List[dict]:
+        """Move the submissions with ``ids``, or else those matching ``filters``, to ``status``.
+
+        Submissions already at ``status`` are left alone. Returns ``{"id",
+        "status", "submitted_at", "version"}`` of each changed submission as it
+        was before.
+        """
+
+
+# Status check tiers: raw points, then per-client summaries per minute and per hour
+STATUS_RESOLUTIONS = ("raw", "minute", "hour")
+SUMMARY_RESOLUTIONS = ("minute", "hour")
+
+
+@dataclass
+class StatusRetention:
+    """How long each status check tier is kept."""
+    raw: timedelta = timedelta(days=2)
+    minute: timedelta = timedelta(days=30)
+    hour: timedelta = timedelta(days=400)
+
+
+def floor_time(value: datetime, resolution: str) -> datetime:
+    """Start of the minute or hour ``value`` falls in."""
+    value = value.replace(second=0, microsecond=0)
+    return value.replace(minute=0) if resolution == "hour" else value
+
+
+class StatusCheckRepository(Repository):
+    """Raw status checks plus per-client summaries downsampled from them.
+
+    Summaries are ``{"client_name", "bucket_start", "count", "first_seen",
+    "last_seen"}``: minute summaries are built from raw points and hour
+    summaries from minute summaries, so each tier can expire on its own
+    schedule (``StatusRetention``).
+    """
+
+    @abstractmethod
+    async def list(self, limit: int, fields: Optional[Sequence[str]] = None, client_name: Optional[str] = None,
+                   since: Optional[datetime] = None, until: Optional[datetime] = None) -> List[dict]:
+        """Newest raw checks first, optionally for one client and timestamps in [since, until)."""
+
+    @abstractmethod
+    def iterate(self, batch_size: int = 500, fields: Optional[Sequence[str]] = None) -> AsyncIterator[dict]:
+        ...
+
+    @abstractmethod
+    async def summaries(self, resolution: str, limit: int, client_name: Optional[str] = None,
+                        since: Optional[datetime] = None, until: Optional[datetime] = None) -> List[dict]:
+        """Newest summaries of ``resolution`` first, with bucket_start in [since, until)."""
+
+    @abstractmethod
+    async def downsample(self, resolution: str, until: datetime) -> None:
+        """Build the ``resolution`` summaries for buckets that start before ``until``.
+
+        Starts again from the newest existing summary (recomputing it), so
+        runs are idempotent and catch up after downtime. ``until`` must be
+        bucket aligned and should be far enough in the past that no more
+        points will arrive for the buckets before it.
+        """
+
+    @abstractmethod
+    async def purge(self, now: datetime) -> None:
+        """Drop data older than the retention, where the datastore does not expire it itself."""
+
+
+class IdempotencyRepository(ABC):
+    """Short-lived claims on idempotency keys, shared by every worker."""
+
+    @abstractmethod
+    async def claim(self, key: str, record: dict, expires_at: datetime) -> Optional[dict]:
+        """Store ``record`` under ``key`` unless an unexpired claim exists.
+
+        Returns None when the key was claimed by this call, otherwise the
+        existing record with its ``expires_at``.
+        """
+
+    @abstractmethod
+    async def complete(self, key: str, record: dict, expires_at: datetime) -> None:
+        """Replace the claim made for ``record["id"]`` with ``record``, kept until ``expires_at``.
+
+        Called once the guarded write succeeded; does nothing if the claim
+        expired and was taken over by another submission in the meantime.
+        """
+
+    @abstractmethod
+    async def release(self, key: str) -> None:
+        """Drop a claim, e.g. because the write it guarded failed."""
+
+
+def contact_stats_deltas(document: dict, sign: int = 1) -> Dict[StatsBucket, int]:
+    """Rollup increments for adding (``sign=1``) or removing (``sign=-1``) a submission."""
+    day = document["submitted_at"].date().isoformat()
+    return {
+        (day, "total", ""): sign,
+        (day, "status", document.get("status") or UNSPECIFIED): sign,
+        (day, "interest", document.get("interest") or UNSPECIFIED): sign,
+    }
+
+
+def contact_status_change_deltas(document: dict, new_status: str) -> Dict[StatsBucket, int]:
+    """Rollup increments for moving a stored submission to ``new_status``."""
+    day = document["submitted_at"].date().isoformat()
+    old_status = document.get("status") or UNSPECIFIED
+    if old_status == new_status:
+        return {}
+    return {(day, "status", old_status): -1, (day, "status", new_status): 1}
+
+
+class ContactStatsRepository(ABC):
+    """Submission counts per day by status and by interest, kept up to date by the writers.
+
+    Reads cost O(buckets) however many submissions exist. ``rebuild``
+    recomputes every bucket from the submissions themselves, e.g. after a
+    failed increment or a bulk import; increments made while it runs may be lost.
+    """
+
+    @abstractmethod
+    async def increment(self, deltas: Dict[StatsBucket, int]) -> None:
+        """Add each delta to its bucket, creating missing buckets."""
+
+    @abstractmethod
+    async def buckets(self, since: Optional[str] = None, until: Optional[str] = None) -> List[dict]:
+        """Return ``{"day", "dimension", "value", "count"}`` for days in [since, until]."""
+
+    @abstractmethod
+    async def rebuild(self) -> int:
+        """Recompute the rollup from the stored submissions; returns the bucket count."""
+
+
+OUTBOX_STATUSES = ("pending", "dead")
+
+
+def outbox_message(topic: str, source_id: str, payload: dict, now: Optional[datetime] = None) -> dict:
+    """A new outbox message, due immediately."""
+    now = now or datetime.utcnow()
+    return {
+        "id": str(uuid.uuid4()),
+        "topic": topic,
+        "source_id": source_id,
+        "payload": payload,
+        "status": "pending",
+        "attempts": 0,
+        "next_attempt_at": now,
+        "created_at": now,
+        "last_error": None,
+    }
+
+
+class OutboxRepository(ABC):
+    """Messages to deliver once the write they belong to is stored.
+
+    Messages are ``pending`` until delivered, when they are deleted, or
+    ``dead`` once delivery is given up. Claiming a message leases it: its
+    ``next_attempt_at`` moves to the end of the lease and ``attempts`` goes
+    up, so a message whose worker died is claimed again when the lease runs
+    out. Delivery is therefore at least once.
+    """
+
+    @abstractmethod
+    async def claim(self, limit: int, now: datetime, lease_until: datetime) -> List[dict]:
+        """Lease up to ``limit`` pending messages due at ``now``, oldest due first."""
+
+    @abstractmethod
+    async def complete(self, message_ids: Sequence[str]) -> None:
+        """Delete delivered messages."""
+
+    @abstractmethod
+    async def retry(self, message_id: str, next_attempt_at: datetime, error: str) -> None:
+        ...
+
+    @abstractmethod
+    async def dead_letter(self, message_id: str, error: str) -> None:
+        ...
+
+    @abstractmethod
+    async def counts(self) -> Dict[str, int]:
+        """Number of messages per status."""
+
+
+def take_token(tokens: float, elapsed: float, rate: float, burst: float) -> Tuple[bool, float, float]:
+    """Token bucket step: refill for ``elapsed`` seconds, then try to take one token.
+
+    Returns (allowed, tokens left, seconds until a token is available).
+    """
+    tokens = min(burst, tokens + elapsed * rate)
+    if tokens >= 1:
+        return True, tokens - 1, 0.0
+    return False, tokens, (1 - tokens) / rate
+
+
+class RateLimitRepository(ABC):
+    """Token buckets shared by every worker using the same datastore."""
+
+    @abstractmethod
+    async def take(self, key: str, rate: float, burst: float) -> Tuple[bool, float]:
+        """Take a token from bucket ``key`` (``rate`` tokens/second, at most ``burst``).
+
+        Returns whether the request is allowed and, if not, the seconds to wait.
+        """
+
+
+class StorageEngine(ABC):
+    """Owns the connection and hands out the repositories.
+
+    ``open`` connects and prepares indexes/schema; ``close`` releases the
+    connection. Repositories are only usable between the two. ``ping`` and
+    ``warm_up`` may be called once the engine is open.
+    """
+
+    name = "base"
+    contacts: ContactRepository
+    status_checks: StatusCheckRepository
+    idempotency: IdempotencyRepository
+    rate_limits: RateLimitRepository
+    contact_stats: ContactStatsRepository
+    outbox: OutboxRepository
+
+    @abstractmethod
+    async def open(self) -> None:
+        ...
+
+    @abstractmethod
+    async def close(self) -> None:
+        ...
+
+    async def ping(self) -> None:
+        """One round trip to the datastore; raises if it cannot be reached."""
+
+    async def warm_up(self) -> None:
+        """Open the connections the engine keeps ready before traffic arrives."""
+        await self.ping()
@@ -0,0 +1,396 @@
+"""In-memory storage engine for tests, local load testing and single-node demos.
+
+Nothing is persisted: all data is lost when the process exits.
+"""
+
+import asyncio
+import bisect
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import AsyncIterator, Dict, List, Optional, Sequence, Tuple
+
+from .base import (
+    BulkInsertError,
+    ContactFilters,
+    ContactKey,
+    ContactRepository,
+    ContactStatsRepository,
+    DuplicateKeyError,
+    INITIAL_VERSION,
+    IdempotencyRepository,
+    OUTBOX_STATUSES,
+    OutboxRepository,
+    RateLimitRepository,
+    SUMMARY_RESOLUTIONS,
+    StatsBucket,
+    StatusCheckRepository,
+    StatusRetention,
+    StorageEngine,
+    contact_stats_deltas,
+    floor_time,
+    take_token,
+)
+from .search import InvertedIndex
+
+
+def _project(document: dict, fields: Optional[Sequence[str]]) -> dict:
+    if not fields:
+        return dict(document)
+    return {field: document.get(field) for field in fields}
+
+
+class MemoryRepository:
+    def __init__(self):
+        # Documents by id, plus the same documents in insertion order
+        self._documents: Dict[str, dict] = {}
+        self._rows: List[dict] = []
+
+    def _add(self, document: dict) -> None:
+        if document["id"] in self._documents:
+            raise DuplicateKeyError(f"Duplicate id {document['id']!r}")
+        document = dict(document)
+        self._documents[document["id"]] = document
+        self._rows.append(document)
+        self._added(document)
+
+    def _added(self, document: dict) -> None:
+        """Hook for subclasses that keep extra indexes."""
+
+    async def insert(self, document: dict) -> None:
+        self._add(document)
+
+    async def insert_many(self, documents: List[dict]) -> None:
+        failed = {}
+        for index, document in enumerate(documents):
+            try:
+                self._add(document)
+            except DuplicateKeyError as e:
+                failed[index] = str(e)
+        if failed:
+            raise BulkInsertError(failed)
+
+    async def get(self, document_id: str, fields: Optional[Sequence[str]] = None) -> Optional[dict]:
+        document = self._documents.get(document_id)
+        return _project(document, fields) if document is not None else None
+
+
+def _matches(document: dict, filters: ContactFilters) -> bool:
+    if filters.status and document.get("status") != filters.status:
+        return False
+    if filters.interest and document.get("interest") != filters.interest:
+        return False
+    if filters.submitted_after and document["submitted_at"] < filters.submitted_after:
+        return False
+    if filters.submitted_before and document["submitted_at"] >= filters.submitted_before:
+        return False
+    return True
+
+
+class MemoryContactRepository(MemoryRepository, ContactRepository):
+    def __init__(self, outbox: "MemoryOutboxRepository"):
+        super().__init__()
+        self.outbox = outbox
+        # (submitted_at, id) keys in ascending order; listings walk it backwards
+        self._keys: List[ContactKey] = []
+        self._search_index = InvertedIndex()
+
+    async def insert(self, document: dict, outbox: Sequence[dict] = ()) -> None:
+        self._add(document)
+        self.outbox.enqueue(outbox)
+
+    async def insert_many(self, documents: List[dict], outbox: Sequence[dict] = ()) -> None:
+        try:
+            await super().insert_many(documents)
+        except BulkInsertError as e:
+            failed_ids = {documents[index]["id"] for index in e.failed}
+            self.outbox.enqueue([message for message in outbox if message["source_id"] not in failed_ids])
+            raise
+        self.outbox.enqueue(outbox)
+
+    def _added(self, document: dict) -> None:
+        document.setdefault("version", INITIAL_VERSION)
+        bisect.insort(self._keys, (document["submitted_at"], document["id"]))
+        self._search_index.add(document["id"], document)
+
+    def _scan(self, filters: ContactFilters, after: Optional[ContactKey], limit: int) -> List[dict]:
+        """Stored documents (not copies) matching ``filters``, newest first."""
+        position = bisect.bisect_left(self._keys, after) if after else len(self._keys)
+        page = []
+        while position > 0 and len(page) < limit:
+            position -= 1
+            _, document_id = self._keys[position]
+            document = self._documents[document_id]
+            if _matches(document, filters):
+                page.append(document)
+        return page
+
+    async def list_page(self, filters: ContactFilters, limit: int, after: Optional[ContactKey] = None,
+                        fields: Optional[Sequence[str]] = None) -> List[dict]:
+        return [_project(document, fields) for document in self._scan(filters, after, limit)]
+
+    async def iterate(self, filters: ContactFilters, after: Optional[ContactKey] = None, batch_size: int = 500,
+                      fields: Optional[Sequence[str]] = None) -> AsyncIterator[dict]:
+        while True:
+            # Resume from the last key so concurrent inserts cannot shift the position
+            batch = self._scan(filters, after, batch_size)
+            for document in batch:
+                yield _project(document, fields)
+            if len(batch) < batch_size:
+                return
+            after = (batch[-1]["submitted_at"], batch[-1]["id"])
+            await asyncio.sleep(0)
+
+    async def search(self, query: str, filters: ContactFilters, limit: int, offset: int = 0,
+                     fields: Optional[Sequence[str]] = None) -> List[dict]:
+        accept = None
+        if filters != ContactFilters():
+            accept = lambda document_id: _matches(self._documents[document_id], filters)
+        hits = self._search_index.search(query, offset + limit, accept)
+        return [{**_project(self._documents[document_id], fields), "score": score} for score, document_id in hits[offset:]]
+
+    def _set_status(self, document: dict, status: str) -> dict:
+        previous = dict(document)
+        document["status"] = status
+        document["version"] = document.get("version", INITIAL_VERSION) + 1
+        return previous
+
+    async def set_status(self, document_id: str, status: str, expected_version: Optional[int] = None) -> Optional[dict]:
+        document = self._documents.get(document_id)
+        if document is None or (expected_version is not None and document.get("version", INITIAL_VERSION) != expected_version):
+            return None
+        return self._set_status(document, status)
+
+    async def set_status_many(self, status: str, ids: Optional[Sequence[str]] = None,
+                              filters: Optional[ContactFilters] = None) -> List[dict]:
+        if ids is not None:
+            documents = [self._documents[document_id] for document_id in dict.fromkeys(ids) if document_id in self._documents]
+        else:
+            documents = [document for document in self._rows if _matches(document, filters or ContactFilters())]
+        return [
+            _project(self._set_status(document, status), ("id", "status", "submitted_at", "version"))
+            for document in documents if document.get("status") != status
+        ]
+
+
+class MemoryStatusCheckRepository(MemoryRepository, StatusCheckRepository):
+    """Raw checks in arrival (and so timestamp) order, summaries keyed by (client_name, bucket_start)."""
+
+    def __init__(self, retention: StatusRetention):
+        super().__init__()
+        self.retention = retention
+        # Rows purged from the front of _rows, so that iterate offsets stay valid
+        self._dropped = 0
+        self._summaries: Dict[str, Dict[Tuple[str, datetime], dict]] = {resolution: {} for resolution in SUMMARY_RESOLUTIONS}
+
+    async def list(self, limit: int, fields: Optional[Sequence[str]] = None, client_name: Optional[str] = None,
+                   since: Optional[datetime] = None, until: Optional[datetime] = None) -> List[dict]:
+        page = []
+        for document in reversed(self._rows):
+            if since and document["timestamp"] < since:
+                break
+            if (until and document["timestamp"] >= until) or (client_name and document["client_name"] != client_name):
+                continue
+            page.append(_project(document, fields))
+            if len(page) >= limit:
+                break
+        return page
+
+    async def iterate(self, batch_size: int = 500, fields: Optional[Sequence[str]] = None) -> AsyncIterator[dict]:
+        # Positions count purged rows too, so purges between batches skip nothing
+        position = self._dropped
+        while True:
+            start = max(position - self._dropped, 0)
+            batch = self._rows[start:start + batch_size]
+            if not batch:
+                return
+            for document in batch:
+                yield _project(document, fields)
+            position = self._dropped + start + len(batch)
+            await asyncio.sleep(0)
+
+    async def summaries(self, resolution: str, limit: int, client_name: Optional[str] = None,
+                        since: Optional[datetime] = None, until: Optional[datetime] = None) -> List[dict]:
+        matching = [
+            summary for (summary_client, bucket_start), summary in self._summaries[resolution].items()
+            if (not client_name or summary_client == client_name)
+            and (not since or bucket_start >= since) and (not until or bucket_start < until)
+        ]
+        matching.sort(key=lambda summary: (summary["bucket_start"], summary["client_name"]), reverse=True)
+        return [dict(summary) for summary in matching[:limit]]
+
+    def _sources(self, resolution: str, start: Optional[datetime]):
+        """(client_name, time, count, first_seen, last_seen) records the ``resolution`` tier is built from."""
+        if resolution == "minute":
+            for document in reversed(self._rows):
+                if start and document["timestamp"] < start:
+                    return
+                yield document["client_name"], document["timestamp"], 1, document["timestamp"], document["timestamp"]
+        else:
+            for summary in self._summaries["minute"].values():
+                yield summary["client_name"], summary["bucket_start"], summary["count"], summary["first_seen"], summary["last_seen"]
+
+    async def downsample(self, resolution: str, until: datetime) -> None:
+        target = self._summaries[resolution]
+        start = max((bucket_start for _, bucket_start in target), default=None)
+        rebuilt: Dict[Tuple[str, datetime], dict] = {}
+        for client_name, bucket_time, count, first_seen, last_seen in self._sources(resolution, start):
+            if bucket_time >= until or (start and bucket_time < start):
+                continue
+            key = (client_name, floor_time(bucket_time, resolution))
+            summary = rebuilt.get(key)
+            if summary is None:
+                rebuilt[key] = {"client_name": client_name, "bucket_start": key[1], "count": count,
+                                "first_seen": first_seen, "last_seen": last_seen}
+            else:
+                summary["count"] += count
+                summary["first_seen"] = min(summary["first_seen"], first_seen)
+                summary["last_seen"] = max(summary["last_seen"], last_seen)
+        target.update(rebuilt)
+
+    async def purge(self, now: datetime) -> None:
+        cutoff = now - self.retention.raw
+        expired = 0
+        while expired < len(self._rows) and self._rows[expired]["timestamp"] < cutoff:
+            del self._documents[self._rows[expired]["id"]]
+            expired += 1
+        del self._rows[:expired]
+        self._dropped += expired
+        for resolution in SUMMARY_RESOLUTIONS:
+            cutoff = now - getattr(self.retention, resolution)
+            summaries = self._summaries[resolution]
+            for key in [key for key in summaries if key[1] < cutoff]:
+                del summaries[key]
+
+
+class MemoryIdempotencyRepository(IdempotencyRepository):
+    # Expired claims are swept after this many new claims
+    PURGE_EVERY = 1000
+
+    def __init__(self):
+        self._claims: Dict[str, dict] = {}
+        self._claims_since_purge = 0
+
+    async def claim(self, key: str, record: dict, expires_at: datetime) -> Optional[dict]:
+        self._claims_since_purge += 1
+        if self._claims_since_purge >= self.PURGE_EVERY:
+            self._purge_expired()
+        existing = self._claims.get(key)
+        if existing is not None and existing["expires_at"] > datetime.utcnow():
+            return dict(existing)
+        self._claims[key] = {**record, "expires_at": expires_at}
+        return None
+
+    async def complete(self, key: str, record: dict, expires_at: datetime) -> None:
+        existing = self._claims.get(key)
+        if existing is not None and existing.get("id") == record.get("id"):
+            self._claims[key] = {**record, "expires_at": expires_at}
+
+    async def release(self, key: str) -> None:
+        self._claims.pop(key, None)
+
+    def _purge_expired(self) -> None:
+        self._claims_since_purge = 0
+        now = datetime.utcnow()
+        for key in [key for key, claim in self._claims.items() if claim["expires_at"] <= now]:
+            del self._claims[key]
+
+
+class MemoryRateLimitRepository(RateLimitRepository):
+    """Per-process token buckets, least recently used buckets evicted first."""
+
+    def __init__(self, max_buckets: int = 100000):
+        self.max_buckets = max_buckets
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    async def take(self, key: str, rate: float, burst: float) -> Tuple[bool, float]:
+        now = time.monotonic()
+        tokens, updated = self._buckets.pop(key, (burst, now))
+        allowed, tokens, retry_after = take_token(tokens, now - updated, rate, burst)
+        self._buckets[key] = (tokens, now)
+        if len(self._buckets) > self.max_buckets:
+            self._buckets.popitem(last=False)
+        return allowed, retry_after
+
+
+class MemoryContactStatsRepository(ContactStatsRepository):
+    def __init__(self, contacts: MemoryContactRepository):
+        self.contacts = contacts
+        self._counts: Dict[StatsBucket, int] = {}
+
+    async def increment(self, deltas: Dict[StatsBucket, int]) -> None:
+        for bucket, delta in deltas.items():
+            self._counts[bucket] = self._counts.get(bucket, 0) + delta
+
+    async def buckets(self, since: Optional[str] = None, until: Optional[str] = None) -> List[dict]:
+        return [
+            {"day": day, "dimension": dimension, "value": value, "count": count}
+            for (day, dimension, value), count in sorted(self._counts.items())
+            if (since is None or day >= since) and (until is None or day <= until)
+        ]
+
+    async def rebuild(self) -> int:
+        self._counts = {}
+        for document in self.contacts._rows:
+            await self.increment(contact_stats_deltas(document))
+        return len(self._counts)
+
+
+class MemoryOutboxRepository(OutboxRepository):
+    def __init__(self):
+        self._messages: Dict[str, dict] = {}
+
+    def enqueue(self, messages: Sequence[dict]) -> None:
+        for message in messages:
+            self._messages[message["id"]] = dict(message)
+
+    async def claim(self, limit: int, now: datetime, lease_until: datetime) -> List[dict]:
+        due = [
+            message for message in self._messages.values()
+            if message["status"] == "pending" and message["next_attempt_at"] <= now
+        ]
+        due.sort(key=lambda message: message["next_attempt_at"])
+        claimed = []
+        for message in due[:limit]:
+            message["next_attempt_at"] = lease_until
+            message["attempts"] += 1
+            claimed.append(dict(message))
+        return claimed
+
+    async def complete(self, message_ids: Sequence[str]) -> None:
+        for message_id in message_ids:
+            self._messages.pop(message_id, None)
+
+    async def retry(self, message_id: str, next_attempt_at: datetime, error: str) -> None:
+        message = self._messages.get(message_id)
+        if message is not None:
+            message.update(next_attempt_at=next_attempt_at, last_error=error)
+
+    async def dead_letter(self, message_id: str, error: str) -> None:
+        message = self._messages.get(message_id)
+        if message is not None:
+            message.update(status="dead", last_error=error)
+
+    async def counts(self) -> Dict[str, int]:
+        counts = {status: 0 for status in OUTBOX_STATUSES}
+        for message in self._messages.values():
+            counts[message["status"]] += 1
+        return counts
+
+
+class MemoryEngine(StorageEngine):
+    name = "memory"
+
+    def __init__(self, status_retention: Optional[StatusRetention] = None):
+        self.outbox = MemoryOutboxRepository()
+        self.contacts = MemoryContactRepository(self.outbox)
+        self.status_checks = MemoryStatusCheckRepository(status_retention or StatusRetention())
+        self.idempotency = MemoryIdempotencyRepository()
+        self.rate_limits = MemoryRateLimitRepository()
+        self.contact_stats = MemoryContactStatsRepository(self.contacts)
+
+    async def open(self) -> None:
+        pass
+
+    async def close(self) -> None:
+        pass
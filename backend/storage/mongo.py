@@ -0,0 +1,602 @@
+"""MongoDB storage engine (Motor)."""
+
+import asyncio
+import uuid
+from datetime import datetime, timedelta
+from typing import AsyncIterator, Dict, List, Optional, Sequence, Tuple
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ASCENDING, DESCENDING, TEXT, IndexModel, ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError, OperationFailure
+from pymongo.errors import DuplicateKeyError as MongoDuplicateKeyError
+
+from .base import (
+    BulkInsertError,
+    ContactFilters,
+    ContactKey,
+    ContactRepository,
+    ContactStatsRepository,
+    DuplicateKeyError,
+    INITIAL_VERSION,
+    IdempotencyRepository,
+    OUTBOX_STATUSES,
+    OutboxRepository,
+    RateLimitRepository,
+    SEARCH_FIELD_WEIGHTS,
+    StatsBucket,
+    StatusCheckRepository,
+    StatusRetention,
+    StorageEngine,
+    SUMMARY_RESOLUTIONS,
+    UNSPECIFIED,
+)
+from .search import tokenize
+
+CONTACT_SORT = [("submitted_at", DESCENDING), ("id", DESCENDING)]
+
+# Every admin list query sorts on (submitted_at, id) and optionally filters on
+# status and/or interest, so each filter combination gets its own compound index
+# ending in the sort keys. That keeps deep pages as cheap as the first one.
+CONTACT_SUBMISSION_INDEXES = [
+    # Lookups and status updates by the app-level id
+    IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+    IndexModel([("submitted_at", DESCENDING), ("id", DESCENDING)], name="submitted_at_id"),
+    IndexModel([("status", ASCENDING), ("submitted_at", DESCENDING), ("id", DESCENDING)], name="status_submitted_at_id"),
+    IndexModel([("interest", ASCENDING), ("submitted_at", DESCENDING), ("id", DESCENDING)], name="interest_submitted_at_id"),
+    IndexModel([("status", ASCENDING), ("interest", ASCENDING), ("submitted_at", DESCENDING), ("id", DESCENDING)], name="status_interest_submitted_at_id"),
+    # Backs /contact/search; a collection can only have one text index
+    IndexModel([(field, TEXT) for field in SEARCH_FIELD_WEIGHTS], name="contact_text", weights=SEARCH_FIELD_WEIGHTS),
+]
+
+# Claims are unique per key and removed by Mongo's TTL monitor once expired
+IDEMPOTENCY_KEY_INDEXES = [
+    IndexModel([("key", ASCENDING)], name="key_unique", unique=True),
+    IndexModel([("expires_at", ASCENDING)], name="expires_at_ttl", expireAfterSeconds=0),
+]
+
+# Idle buckets are full again after burst/rate seconds and can then be dropped
+RATE_LIMIT_BUCKET_INDEXES = [
+    IndexModel([("key", ASCENDING)], name="key_unique", unique=True),
+    IndexModel([("expires_at", ASCENDING)], name="expires_at_ttl", expireAfterSeconds=0),
+]
+
+# One document per (day, dimension, value) rollup bucket
+CONTACT_STATS_INDEXES = [
+    IndexModel([("day", ASCENDING), ("dimension", ASCENDING), ("value", ASCENDING)], name="day_dimension_value", unique=True),
+]
+
+
+# Workers poll for due pending messages; claims are found again by their token
+OUTBOX_INDEXES = [
+    IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+    IndexModel([("status", ASCENDING), ("next_attempt_at", ASCENDING)], name="status_next_attempt_at"),
+    IndexModel([("claim", ASCENDING)], name="claim", sparse=True),
+]
+
+
+def status_check_indexes(retention: timedelta) -> List[IndexModel]:
+    """Raw checks expire through a TTL index on timestamp, which also serves time-range reads."""
+    return [
+        IndexModel([("timestamp", ASCENDING)], name="timestamp_ttl", expireAfterSeconds=int(retention.total_seconds())),
+        IndexModel([("client_name", ASCENDING), ("timestamp", DESCENDING)], name="client_name_timestamp"),
+    ]
+
+
+def status_summary_indexes(retention: timedelta) -> List[IndexModel]:
+    return [
+        IndexModel([("client_name", ASCENDING), ("bucket_start", ASCENDING)], name="client_name_bucket_start", unique=True),
+        IndexModel([("bucket_start", ASCENDING)], name="bucket_start_ttl", expireAfterSeconds=int(retention.total_seconds())),
+    ]
+
+
+async def ensure_indexes(collection, indexes: List[IndexModel]) -> None:
+    """Create indexes, first updating the expiry of TTL indexes that exist with another one."""
+    try:
+        await collection.create_indexes(indexes)
+        return
+    except OperationFailure as e:
+        # IndexOptionsConflict / IndexKeySpecsConflict
+        if e.code not in (85, 86):
+            raise
+    for index in indexes:
+        document = index.document
+        if "expireAfterSeconds" in document:
+            await collection.database.command(
+                "collMod", collection.name,
+                index={"name": document["name"], "expireAfterSeconds": document["expireAfterSeconds"]},
+            )
+    await collection.create_indexes(indexes)
+
+
+def _truncate_time(field: str, resolution: str) -> dict:
+    """Aggregation expression for the start of the minute or hour of ``field`` ($dateTrunc needs MongoDB 5)."""
+    parts = {"year": {"$year": field}, "month": {"$month": field}, "day": {"$dayOfMonth": field}, "hour": {"$hour": field}}
+    if resolution == "minute":
+        parts["minute"] = {"$minute": field}
+    return {"$dateFromParts": parts}
+
+
+def _time_range(field: str, since: Optional[datetime], until: Optional[datetime]) -> dict:
+    time_range = {}
+    if since:
+        time_range["$gte"] = since
+    if until:
+        time_range["$lt"] = until
+    return {field: time_range} if time_range else {}
+
+
+def _or_unspecified(field: str) -> dict:
+    """Aggregation expression for ``document.get(field) or UNSPECIFIED``."""
+    return {"$cond": [{"$eq": [{"$ifNull": [f"${field}", ""]}, ""]}, UNSPECIFIED, f"${field}"]}
+
+
+# Recomputes every rollup bucket from contact_submissions; $out swaps the
+# result in for contact_stats in one step and keeps its indexes
+CONTACT_STATS_REBUILD_PIPELINE = [
+    {"$project": {
+        "_id": 0,
+        "day": {"$dateToString": {"format": "%Y-%m-%d", "date": "$submitted_at"}},
+        "status": _or_unspecified("status"),
+        "interest": _or_unspecified("interest"),
+    }},
+    {"$project": {"buckets": [
+        {"day": "$day", "dimension": "total", "value": ""},
+        {"day": "$day", "dimension": "status", "value": "$status"},
+        {"day": "$day", "dimension": "interest", "value": "$interest"},
+    ]}},
+    {"$unwind": "$buckets"},
+    {"$group": {"_id": "$buckets", "count": {"$sum": 1}}},
+    {"$project": {"_id": 0, "day": "$_id.day", "dimension": "$_id.dimension", "value": "$_id.value", "count": 1}},
+    {"$out": "contact_stats"},
+]
+
+
+# Bulk status updates are sent in bulk_write calls of this many operations
+STATUS_UPDATE_CHUNK = 1000
+
+
+def _version_is(version: int) -> dict:
+    # Submissions stored before versioning have no version field
+    return {"$in": [version, None]} if version == INITIAL_VERSION else version
+
+
+def _with_version(document: Optional[dict], fields: Optional[Sequence[str]] = None) -> Optional[dict]:
+    """Submissions stored before versioning read as ``INITIAL_VERSION``, as on the other engines."""
+    if document is not None and (not fields or "version" in fields):
+        document.setdefault("version", INITIAL_VERSION)
+    return document
+
+
+def _status_update(status: str) -> list:
+    """Pipeline update setting ``status`` and bumping the version."""
+    return [{"$set": {"status": status, "version": {"$add": [{"$ifNull": ["$version", INITIAL_VERSION]}, 1]}}}]
+
+
+def build_contact_query(filters: ContactFilters, after: Optional[ContactKey] = None) -> dict:
+    query = {}
+    if filters.status:
+        query["status"] = filters.status
+    if filters.interest:
+        query["interest"] = filters.interest
+    submitted_range = {}
+    if filters.submitted_after:
+        submitted_range["$gte"] = filters.submitted_after
+    if filters.submitted_before:
+        submitted_range["$lt"] = filters.submitted_before
+    if submitted_range:
+        query["submitted_at"] = submitted_range
+    if after:
+        # Strictly after the last row of the previous page in (submitted_at, id) desc order
+        last_submitted_at, last_id = after
+        keyset = {"$or": [
+            {"submitted_at": {"$lt": last_submitted_at}},
+            {"submitted_at": last_submitted_at, "id": {"$lt": last_id}},
+        ]}
+        query = {"$and": [query, keyset]} if query else keyset
+    return query
+
+
+def projection(fields: Optional[Sequence[str]]) -> Optional[dict]:
+    if not fields:
+        return None
+    return {"_id": 0, **{field: 1 for field in fields}}
+
+
+class MongoRepository:
+    def __init__(self, collection):
+        self.collection = collection
+
+    async def insert(self, document: dict) -> None:
+        try:
+            await self.collection.insert_one(document)
+        except MongoDuplicateKeyError as e:
+            raise DuplicateKeyError(str(e))
+
+    async def insert_many(self, documents: List[dict]) -> None:
+        try:
+            await self.collection.insert_many(documents, ordered=False)
+        except BulkWriteError as e:
+            raise BulkInsertError({
+                error["index"]: error.get("errmsg", "write error")
+                for error in e.details.get("writeErrors", [])
+            })
+
+    async def get(self, document_id: str, fields: Optional[Sequence[str]] = None) -> Optional[dict]:
+        return await self.collection.find_one({"id": document_id}, projection(fields))
+
+
+class MongoContactRepository(MongoRepository, ContactRepository):
+    """Submissions and their outbox messages.
+
+    The two are separate writes, submissions first: multi-document
+    transactions would need a replica set. A crash between them can lose a
+    notification but never sends one for a submission that was not stored.
+    """
+
+    def __init__(self, collection, outbox_collection):
+        super().__init__(collection)
+        self.outbox_collection = outbox_collection
+
+    async def _enqueue(self, messages: Sequence[dict]) -> None:
+        if messages:
+            # insert_many adds _id to the documents it is given
+            await self.outbox_collection.insert_many([dict(message) for message in messages], ordered=False)
+
+    async def insert(self, document: dict, outbox: Sequence[dict] = ()) -> None:
+        await super().insert(document)
+        await self._enqueue(outbox)
+
+    async def insert_many(self, documents: List[dict], outbox: Sequence[dict] = ()) -> None:
+        try:
+            await super().insert_many(documents)
+        except BulkInsertError as e:
+            failed_ids = {documents[index]["id"] for index in e.failed}
+            await self._enqueue([message for message in outbox if message["source_id"] not in failed_ids])
+            raise
+        await self._enqueue(outbox)
+
+    async def get(self, document_id: str, fields: Optional[Sequence[str]] = None) -> Optional[dict]:
+        return _with_version(await super().get(document_id, fields), fields)
+
+    async def list_page(self, filters: ContactFilters, limit: int, after: Optional[ContactKey] = None,
+                        fields: Optional[Sequence[str]] = None) -> List[dict]:
+        cursor = self.collection.find(build_contact_query(filters, after), projection(fields)).sort(CONTACT_SORT)
+        return [_with_version(document, fields) for document in await cursor.to_list(limit)]
+
+    async def iterate(self, filters: ContactFilters, after: Optional[ContactKey] = None, batch_size: int = 500,
+                      fields: Optional[Sequence[str]] = None) -> AsyncIterator[dict]:
+        cursor = self.collection.find(build_contact_query(filters, after), projection(fields))
+        cursor = cursor.sort(CONTACT_SORT).batch_size(batch_size)
+        async for document in cursor:
+            yield _with_version(document, fields)
+
+    async def search(self, query: str, filters: ContactFilters, limit: int, offset: int = 0,
+                     fields: Optional[Sequence[str]] = None) -> List[dict]:
+        terms = tokenize(query)
+        if not terms:
+            return []
+        # Re-joined tokens: the text index stems them, and $search operators
+        # such as negation and phrases are not passed through
+        score = {"$meta": "textScore"}
+        cursor = self.collection.find(
+            {"$text": {"$search": " ".join(terms)}, **build_contact_query(filters)},
+            {**(projection(fields) or {}), "score": score},
+        )
+        cursor = cursor.sort([("score", score)]).skip(offset).limit(limit)
+        return [_with_version(document, fields) for document in await cursor.to_list(limit)]
+
+    async def set_status(self, document_id: str, status: str, expected_version: Optional[int] = None) -> Optional[dict]:
+        query = {"id": document_id}
+        if expected_version is not None:
+            query["version"] = _version_is(expected_version)
+        return _with_version(await self.collection.find_one_and_update(
+            query, _status_update(status), projection={"_id": 0}, return_document=ReturnDocument.BEFORE
+        ))
+
+    async def set_status_many(self, status: str, ids: Optional[Sequence[str]] = None,
+                              filters: Optional[ContactFilters] = None) -> List[dict]:
+        query = {"id": {"$in": list(ids)}} if ids is not None else build_contact_query(filters or ContactFilters())
+        cursor = self.collection.find(
+            {"$and": [query, {"status": {"$ne": status}}]}, projection(("id", "status", "submitted_at", "version"))
+        )
+        changed = []
+        chunk = []
+        async for document in cursor.batch_size(STATUS_UPDATE_CHUNK):
+            chunk.append(document)
+            if len(chunk) == STATUS_UPDATE_CHUNK:
+                changed.extend(await self._update_chunk(chunk, status))
+                chunk = []
+        if chunk:
+            changed.extend(await self._update_chunk(chunk, status))
+        return changed
+
+    async def _update_chunk(self, documents: List[dict], status: str) -> List[dict]:
+        """Move ``documents`` to ``status`` unless they changed since they were read."""
+        result = await self.collection.bulk_write(
+            [
+                UpdateOne({"id": document["id"], "version": document.get("version")}, _status_update(status))
+                for document in documents
+            ],
+            ordered=False,
+        )
+        if result.modified_count < len(documents):
+            # Some changed in between and were skipped; keep those this write moved
+            cursor = self.collection.find(
+                {"id": {"$in": [document["id"] for document in documents]}}, projection(("id", "status", "version"))
+            )
+            current = {document["id"]: document async for document in cursor}
+            documents = [
+                document for document in documents
+                if current.get(document["id"], {}).get("status") == status
+                and current[document["id"]].get("version") == (document.get("version") or INITIAL_VERSION) + 1
+            ]
+        return [
+            {"id": document["id"], "status": document.get("status"), "submitted_at": document["submitted_at"],
+             "version": document.get("version")}
+            for document in documents
+        ]
+
+    async def watch(self, resume_after: Optional[str] = None) -> AsyncIterator[Tuple[str, str, dict]]:
+        """Follow new submissions and status changes from every process, through a change stream.
+
+        Yields ``(token, event, document)``: ``"created"`` with the stored
+        submission, or ``"status"`` with its id, status and version. Passing
+        a token resumes after that change. Change streams need a replica set.
+        """
+        pipeline = [{"$match": {"operationType": {"$in": ["insert", "update", "replace"]}}}]
+        resume = {"_data": resume_after} if resume_after else None
+        async with self.collection.watch(pipeline, full_document="updateLookup", resume_after=resume) as stream:
+            async for change in stream:
+                document = change.get("fullDocument")
+                if document is None:
+                    # Deleted again before the update could be looked up
+                    continue
+                document.pop("_id", None)
+                if change["operationType"] == "insert":
+                    yield change["_id"]["_data"], "created", _with_version(document)
+                elif "status" in change.get("updateDescription", {}).get("updatedFields", {"status": None}):
+                    yield change["_id"]["_data"], "status", {
+                        "id": document["id"], "status": document.get("status"), "version": document.get("version"),
+                    }
+
+
+class MongoStatusCheckRepository(MongoRepository, StatusCheckRepository):
+    """Raw checks in ``status_checks``, summaries in one collection per resolution.
+
+    Every tier has a TTL index, so ``purge`` is left to the TTL monitor.
+    """
+
+    def __init__(self, collection, summary_collections: Dict[str, object]):
+        super().__init__(collection)
+        self.summary_collections = summary_collections
+
+    async def list(self, limit: int, fields: Optional[Sequence[str]] = None, client_name: Optional[str] = None,
+                   since: Optional[datetime] = None, until: Optional[datetime] = None) -> List[dict]:
+        query = _time_range("timestamp", since, until)
+        if client_name:
+            query["client_name"] = client_name
+        cursor = self.collection.find(query, projection(fields)).sort([("timestamp", DESCENDING)])
+        return await cursor.to_list(limit)
+
+    async def iterate(self, batch_size: int = 500, fields: Optional[Sequence[str]] = None) -> AsyncIterator[dict]:
+        async for document in self.collection.find({}, projection(fields)).batch_size(batch_size):
+            yield document
+
+    async def summaries(self, resolution: str, limit: int, client_name: Optional[str] = None,
+                        since: Optional[datetime] = None, until: Optional[datetime] = None) -> List[dict]:
+        query = _time_range("bucket_start", since, until)
+        if client_name:
+            query["client_name"] = client_name
+        cursor = self.summary_collections[resolution].find(query, {"_id": 0})
+        cursor = cursor.sort([("bucket_start", DESCENDING), ("client_name", DESCENDING)])
+        return await cursor.to_list(limit)
+
+    async def downsample(self, resolution: str, until: datetime) -> None:
+        target = self.summary_collections[resolution]
+        latest = await target.find_one({}, {"bucket_start": 1}, sort=[("bucket_start", DESCENDING)])
+        if resolution == "minute":
+            source, time_field = self.collection, "timestamp"
+            count, first_seen, last_seen = {"$sum": 1}, {"$min": "$timestamp"}, {"$max": "$timestamp"}
+        else:
+            source, time_field = self.summary_collections["minute"], "bucket_start"
+            count, first_seen, last_seen = {"$sum": "$count"}, {"$min": "$first_seen"}, {"$max": "$last_seen"}
+        pipeline = [
+            {"$match": _time_range(time_field, latest["bucket_start"] if latest else None, until)},
+            {"$group": {
+                "_id": {"client_name": "$client_name", "bucket_start": _truncate_time(f"${time_field}", resolution)},
+                "count": count,
+                "first_seen": first_seen,
+                "last_seen": last_seen,
+            }},
+            {"$project": {"_id": 0, "client_name": "$_id.client_name", "bucket_start": "$_id.bucket_start",
+                          "count": 1, "first_seen": 1, "last_seen": 1}},
+            {"$merge": {"into": target.name, "on": ["client_name", "bucket_start"],
+                        "whenMatched": "replace", "whenNotMatched": "insert"}},
+        ]
+        await source.aggregate(pipeline).to_list(None)
+
+    async def purge(self, now: datetime) -> None:
+        pass
+
+
+class MongoIdempotencyRepository(IdempotencyRepository):
+    def __init__(self, collection):
+        self.collection = collection
+
+    async def claim(self, key: str, record: dict, expires_at: datetime) -> Optional[dict]:
+        try:
+            await self.collection.insert_one({"key": key, "expires_at": expires_at, "record": record})
+            return None
+        except MongoDuplicateKeyError:
+            pass
+        # The TTL monitor only runs about once a minute, so an expired claim
+        # may still be present: take it over atomically if so
+        now = datetime.utcnow()
+        replaced = await self.collection.replace_one(
+            {"key": key, "expires_at": {"$lte": now}},
+            {"key": key, "expires_at": expires_at, "record": record},
+        )
+        if replaced.modified_count:
+            return None
+        existing = await self.collection.find_one({"key": key}, {"_id": 0})
+        if existing is None:
+            return None
+        return {**existing["record"], "expires_at": existing["expires_at"]}
+
+    async def complete(self, key: str, record: dict, expires_at: datetime) -> None:
+        await self.collection.update_one(
+            {"key": key, "record.id": record.get("id")}, {"$set": {"record": record, "expires_at": expires_at}}
+        )
+
+    async def release(self, key: str) -> None:
+        await self.collection.delete_one({"key": key})
+
+
+class MongoRateLimitRepository(RateLimitRepository):
+    """Token buckets updated atomically server-side with a pipeline update (MongoDB 4.2+)."""
+
+    def __init__(self, collection):
+        self.collection = collection
+
+    async def take(self, key: str, rate: float, burst: float) -> Tuple[bool, float]:
+        now = datetime.utcnow()
+        elapsed = {"$divide": [{"$subtract": [now, {"$ifNull": ["$updated_at", now]}]}, 1000]}
+        refilled = {"$min": [burst, {"$add": [{"$ifNull": ["$tokens", burst]}, {"$multiply": [elapsed, rate]}]}]}
+        bucket = await self.collection.find_one_and_update(
+            {"key": key},
+            [
+                {"$set": {"tokens": refilled, "updated_at": now}},
+                {"$set": {"allowed": {"$gte": ["$tokens", 1]}}},
+                {"$set": {
+                    "tokens": {"$cond": ["$allowed", {"$subtract": ["$tokens", 1]}, "$tokens"]},
+                    "expires_at": now + timedelta(seconds=burst / rate),
+                }},
+            ],
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+        if bucket["allowed"]:
+            return True, 0.0
+        return False, (1 - bucket["tokens"]) / rate
+
+
+class MongoOutboxRepository(OutboxRepository):
+    def __init__(self, collection):
+        self.collection = collection
+
+    async def claim(self, limit: int, now: datetime, lease_until: datetime) -> List[dict]:
+        due = {"status": "pending", "next_attempt_at": {"$lte": now}}
+        candidates = await self.collection.find(due, {"_id": 1}).sort([("next_attempt_at", ASCENDING)]).to_list(limit)
+        if not candidates:
+            return []
+        # The filter is checked again per document, so a message another
+        # worker claimed in the meantime is skipped rather than claimed twice
+        token = str(uuid.uuid4())
+        await self.collection.update_many(
+            {"_id": {"$in": [candidate["_id"] for candidate in candidates]}, **due},
+            {"$set": {"next_attempt_at": lease_until, "claim": token}, "$inc": {"attempts": 1}},
+        )
+        cursor = self.collection.find({"claim": token}, {"_id": 0, "claim": 0}).sort([("created_at", ASCENDING)])
+        return await cursor.to_list(None)
+
+    async def complete(self, message_ids: Sequence[str]) -> None:
+        await self.collection.delete_many({"id": {"$in": list(message_ids)}})
+
+    async def retry(self, message_id: str, next_attempt_at: datetime, error: str) -> None:
+        await self.collection.update_one(
+            {"id": message_id}, {"$set": {"next_attempt_at": next_attempt_at, "last_error": error}}
+        )
+
+    async def dead_letter(self, message_id: str, error: str) -> None:
+        await self.collection.update_one({"id": message_id}, {"$set": {"status": "dead", "last_error": error}})
+
+    async def counts(self) -> Dict[str, int]:
+        rows = await self.collection.aggregate([{"$group": {"_id": "$status", "count": {"$sum": 1}}}]).to_list(None)
+        return {**{status: 0 for status in OUTBOX_STATUSES}, **{row["_id"]: row["count"] for row in rows}}
+
+
+class MongoContactStatsRepository(ContactStatsRepository):
+    def __init__(self, collection, contacts_collection):
+        self.collection = collection
+        self.contacts_collection = contacts_collection
+
+    async def increment(self, deltas: Dict[StatsBucket, int]) -> None:
+        if not deltas:
+            return
+        await self.collection.bulk_write(
+            [
+                UpdateOne({"day": day, "dimension": dimension, "value": value}, {"$inc": {"count": delta}}, upsert=True)
+                for (day, dimension, value), delta in deltas.items()
+            ],
+            ordered=False,
+        )
+
+    async def buckets(self, since: Optional[str] = None, until: Optional[str] = None) -> List[dict]:
+        day_range = {}
+        if since:
+            day_range["$gte"] = since
+        if until:
+            day_range["$lte"] = until
+        cursor = self.collection.find(
+            {"day": day_range} if day_range else {},
+            projection(("day", "dimension", "value", "count")),
+        ).sort([("day", ASCENDING), ("dimension", ASCENDING), ("value", ASCENDING)])
+        return await cursor.to_list(None)
+
+    async def rebuild(self) -> int:
+        await self.contacts_collection.aggregate(CONTACT_STATS_REBUILD_PIPELINE).to_list(None)
+        return await self.collection.count_documents({})
+
+
+class MongoEngine(StorageEngine):
+    name = "mongo"
+
+    def __init__(self, mongo_url: str, db_name: str, event_listeners: Sequence = (),
+                 status_retention: Optional[StatusRetention] = None, client_options: Optional[dict] = None):
+        self.mongo_url = mongo_url
+        self.db_name = db_name
+        self.event_listeners = list(event_listeners)
+        # Pool, timeout and compression options for the client (maxPoolSize, ...)
+        self.client_options = dict(client_options or {})
+        self.status_retention = status_retention or StatusRetention()
+        self.client = None
+        self.db = None
+
+    async def open(self) -> None:
+        self.client = AsyncIOMotorClient(self.mongo_url, event_listeners=self.event_listeners, **self.client_options)
+        self.db = self.client[self.db_name]
+        # The client connects lazily; fail here rather than on the first request
+        await self.ping()
+        self.contacts = MongoContactRepository(self.db.contact_submissions, self.db.outbox)
+        self.status_checks = MongoStatusCheckRepository(
+            self.db.status_checks,
+            {resolution: self.db[f"status_checks_{resolution}"] for resolution in SUMMARY_RESOLUTIONS},
+        )
+        self.idempotency = MongoIdempotencyRepository(self.db.contact_idempotency_keys)
+        self.rate_limits = MongoRateLimitRepository(self.db.rate_limit_buckets)
+        self.contact_stats = MongoContactStatsRepository(self.db.contact_stats, self.db.contact_submissions)
+        self.outbox = MongoOutboxRepository(self.db.outbox)
+        await self.db.contact_submissions.create_indexes(CONTACT_SUBMISSION_INDEXES)
+        await self.db.contact_idempotency_keys.create_indexes(IDEMPOTENCY_KEY_INDEXES)
+        await self.db.rate_limit_buckets.create_indexes(RATE_LIMIT_BUCKET_INDEXES)
+        await self.db.contact_stats.create_indexes(CONTACT_STATS_INDEXES)
+        await self.db.outbox.create_indexes(OUTBOX_INDEXES)
+        await ensure_indexes(self.db.status_checks, status_check_indexes(self.status_retention.raw))
+        for resolution in SUMMARY_RESOLUTIONS:
+            await ensure_indexes(
+                self.db[f"status_checks_{resolution}"],
+                status_summary_indexes(getattr(self.status_retention, resolution)),
+            )
+
+    async def ping(self) -> None:
+        await self.client.admin.command("ping")
+
+    async def warm_up(self) -> None:
+        # Concurrent pings each check out a connection, so the pool opens
+        # minPoolSize of them now instead of growing under the first requests
+        connections = max(1, self.client_options.get("minPoolSize", 0))
+        await asyncio.gather(*(self.ping() for _ in range(connections)))
+
+    async def close(self) -> None:
+        if self.client is not None:
+            self.client.close()
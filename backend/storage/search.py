@@ -0,0 +1,91 @@
+"""Tokenizer and in-process inverted index for contact search.
+
+Engines with their own text index (Mongo, SQLite FTS5) only use ``tokenize``
+to clean up queries; the in-memory engine keeps an ``InvertedIndex`` that is
+updated as submissions are stored.
+"""
+
+import heapq
+import math
+import re
+from typing import Callable, Dict, List, Mapping, Optional, Tuple
+
+from .base import SEARCH_FIELD_WEIGHTS
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+# Too common to help ranking, and their postings would cover most documents
+STOPWORDS = frozenset(
+    "a about an and are as at be but by can for from have i in is it me my of on or our so that "
+    "the their this to us we with you your".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lower-cased words of ``text`` without stopwords, in order."""
+    return [token for token in TOKEN_PATTERN.findall(text.lower()) if token not in STOPWORDS]
+
+
+class InvertedIndex:
+    """Term -> {document id: term weight} postings over the search fields.
+
+    A query matches documents containing any of its terms. Scores are
+    tf-idf: each term contributes idf * (1 + log(weighted tf)), so a hit in
+    the name counts more than one in the message. The tf part is computed
+    when a document is added, leaving one multiply-add per posting at query time.
+    """
+
+    def __init__(self, weights: Mapping[str, float] = SEARCH_FIELD_WEIGHTS):
+        self.weights = dict(weights)
+        self._postings: Dict[str, Dict[str, float]] = {}
+        self._documents = 0
+
+    def __len__(self):
+        return self._documents
+
+    def _term_weights(self, document: dict) -> Dict[str, float]:
+        term_weights: Dict[str, float] = {}
+        for field, weight in self.weights.items():
+            for token in tokenize(document.get(field) or ""):
+                term_weights[token] = term_weights.get(token, 0) + weight
+        return term_weights
+
+    def add(self, document_id: str, document: dict) -> None:
+        for term, weight in self._term_weights(document).items():
+            self._postings.setdefault(term, {})[document_id] = 1 + math.log(weight)
+        self._documents += 1
+
+    def remove(self, document_id: str, document: dict) -> None:
+        for term in self._term_weights(document):
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.pop(document_id, None)
+                if not postings:
+                    del self._postings[term]
+        self._documents -= 1
+
+    def search(self, query: str, limit: int, accept: Optional[Callable[[str], bool]] = None) -> List[Tuple[float, str]]:
+        """Best ``limit`` (score, document id) pairs, only among the ids ``accept`` allows if given."""
+        scores: Dict[str, float] = {}
+        for term in set(tokenize(query)):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + self._documents / len(postings))
+            if not scores:
+                scores = {document_id: idf * tf for document_id, tf in postings.items()}
+                continue
+            get = scores.get
+            for document_id, tf in postings.items():
+                scores[document_id] = get(document_id, 0) + idf * tf
+        if accept is None:
+            return heapq.nlargest(limit, ((score, document_id) for document_id, score in scores.items()))
+        # Filter the best candidates first and widen the window only when too
+        # few of them pass, so a filter costs a full pass only when selective
+        window = limit * 8
+        while True:
+            candidates = heapq.nlargest(window, ((score, document_id) for document_id, score in scores.items()))
+            hits = [hit for hit in candidates if accept(hit[1])]
+            if len(hits) >= limit or window >= len(scores):
+                return hits[:limit]
+            window *= 8
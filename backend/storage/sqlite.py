@@ -0,0 +1,678 @@
+"""SQLite storage engine (aiosqlite) for cheap single-node deployments.
+
+Datetimes are stored as ISO-8601 text with fixed microsecond precision so
+that text order matches time order and the indexes serve the sorts.
+"""
+
+import asyncio
+import json
+import sqlite3
+import time
+from datetime import datetime
+from typing import AsyncIterator, Dict, List, Optional, Sequence, Tuple
+
+try:
+    import aiosqlite
+except ImportError:  # optional dependency, only needed for this engine
+    aiosqlite = None
+
+from .base import (
+    BulkInsertError,
+    ContactFilters,
+    ContactKey,
+    ContactRepository,
+    ContactStatsRepository,
+    DuplicateKeyError,
+    INITIAL_VERSION,
+    IdempotencyRepository,
+    OUTBOX_STATUSES,
+    OutboxRepository,
+    RateLimitRepository,
+    StatsBucket,
+    StatusCheckRepository,
+    StatusRetention,
+    SEARCH_FIELD_WEIGHTS,
+    SUMMARY_RESOLUTIONS,
+    StorageEngine,
+    UNSPECIFIED,
+    take_token,
+)
+from .search import tokenize
+
+SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS contact_submissions (
+        id TEXT PRIMARY KEY,
+        name TEXT NOT NULL,
+        email TEXT NOT NULL,
+        organization TEXT,
+        interest TEXT,
+        message TEXT NOT NULL,
+        submitted_at TEXT NOT NULL,
+        status TEXT NOT NULL,
+        version INTEGER NOT NULL DEFAULT 1
+    )""",
+    # Same layout as the Mongo compound indexes: filters first, then the sort keys
+    "CREATE INDEX IF NOT EXISTS contact_submitted_at_id ON contact_submissions (submitted_at DESC, id DESC)",
+    "CREATE INDEX IF NOT EXISTS contact_status_submitted_at_id ON contact_submissions (status, submitted_at DESC, id DESC)",
+    "CREATE INDEX IF NOT EXISTS contact_interest_submitted_at_id ON contact_submissions (interest, submitted_at DESC, id DESC)",
+    "CREATE INDEX IF NOT EXISTS contact_status_interest_submitted_at_id ON contact_submissions (status, interest, submitted_at DESC, id DESC)",
+    # Full-text index over the search fields, kept in sync by triggers
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS contact_search USING fts5(
+        {', '.join(SEARCH_FIELD_WEIGHTS)}, content='contact_submissions', content_rowid='rowid'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS contact_search_insert AFTER INSERT ON contact_submissions BEGIN
+        INSERT INTO contact_search (rowid, {', '.join(SEARCH_FIELD_WEIGHTS)})
+        VALUES (new.rowid, {', '.join(f'new.{field}' for field in SEARCH_FIELD_WEIGHTS)});
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS contact_search_delete AFTER DELETE ON contact_submissions BEGIN
+        INSERT INTO contact_search (contact_search, rowid, {', '.join(SEARCH_FIELD_WEIGHTS)})
+        VALUES ('delete', old.rowid, {', '.join(f'old.{field}' for field in SEARCH_FIELD_WEIGHTS)});
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS contact_search_update AFTER UPDATE OF {', '.join(SEARCH_FIELD_WEIGHTS)} ON contact_submissions BEGIN
+        INSERT INTO contact_search (contact_search, rowid, {', '.join(SEARCH_FIELD_WEIGHTS)})
+        VALUES ('delete', old.rowid, {', '.join(f'old.{field}' for field in SEARCH_FIELD_WEIGHTS)});
+        INSERT INTO contact_search (rowid, {', '.join(SEARCH_FIELD_WEIGHTS)})
+        VALUES (new.rowid, {', '.join(f'new.{field}' for field in SEARCH_FIELD_WEIGHTS)});
+    END""",
+    """CREATE TABLE IF NOT EXISTS status_checks (
+        id TEXT NOT NULL UNIQUE,
+        client_name TEXT NOT NULL,
+        timestamp TEXT NOT NULL
+    )""",
+    "CREATE INDEX IF NOT EXISTS status_checks_timestamp ON status_checks (timestamp)",
+    "CREATE INDEX IF NOT EXISTS status_checks_client_timestamp ON status_checks (client_name, timestamp)",
+    """CREATE TABLE IF NOT EXISTS status_check_summaries (
+        resolution TEXT NOT NULL,
+        client_name TEXT NOT NULL,
+        bucket_start TEXT NOT NULL,
+        count INTEGER NOT NULL,
+        first_seen TEXT NOT NULL,
+        last_seen TEXT NOT NULL,
+        PRIMARY KEY (resolution, client_name, bucket_start)
+    )""",
+    "CREATE INDEX IF NOT EXISTS status_check_summaries_bucket_start ON status_check_summaries (resolution, bucket_start)",
+    """CREATE TABLE IF NOT EXISTS contact_idempotency_keys (
+        key TEXT PRIMARY KEY,
+        record TEXT NOT NULL,
+        expires_at TEXT NOT NULL
+    )""",
+    "CREATE INDEX IF NOT EXISTS idempotency_expires_at ON contact_idempotency_keys (expires_at)",
+    """CREATE TABLE IF NOT EXISTS rate_limit_buckets (
+        key TEXT PRIMARY KEY,
+        tokens REAL NOT NULL,
+        updated_at REAL NOT NULL
+    )""",
+    """CREATE TABLE IF NOT EXISTS outbox (
+        id TEXT PRIMARY KEY,
+        topic TEXT NOT NULL,
+        source_id TEXT NOT NULL,
+        payload TEXT NOT NULL,
+        status TEXT NOT NULL,
+        attempts INTEGER NOT NULL,
+        next_attempt_at TEXT NOT NULL,
+        created_at TEXT NOT NULL,
+        last_error TEXT
+    )""",
+    "CREATE INDEX IF NOT EXISTS outbox_status_next_attempt_at ON outbox (status, next_attempt_at)",
+    """CREATE TABLE IF NOT EXISTS contact_stats (
+        day TEXT NOT NULL,
+        dimension TEXT NOT NULL,
+        value TEXT NOT NULL,
+        count INTEGER NOT NULL,
+        PRIMARY KEY (day, dimension, value)
+    )""",
+]
+
+
+def _to_sql(value):
+    if isinstance(value, datetime):
+        return value.isoformat(timespec="microseconds")
+    return value
+
+
+OUTBOX_COLUMNS = ("id", "topic", "source_id", "payload", "status", "attempts", "next_attempt_at", "created_at", "last_error")
+OUTBOX_INSERT_SQL = f"INSERT INTO outbox ({', '.join(OUTBOX_COLUMNS)}) VALUES ({', '.join('?' for _ in OUTBOX_COLUMNS)})"
+
+
+def _outbox_row(message: dict) -> tuple:
+    return tuple(
+        json.dumps(message["payload"]) if column == "payload" else _to_sql(message.get(column))
+        for column in OUTBOX_COLUMNS
+    )
+
+
+def _outbox_message(row) -> dict:
+    message = dict(zip(OUTBOX_COLUMNS, row))
+    message["payload"] = json.loads(message["payload"])
+    for column in ("next_attempt_at", "created_at"):
+        message[column] = datetime.fromisoformat(message[column])
+    return message
+
+
+class SQLiteRepository:
+    table = ""
+    columns: Sequence[str] = ()
+    datetime_columns: Sequence[str] = ()
+    # Values for columns a document does not have
+    defaults: Dict[str, object] = {}
+
+    def __init__(self, connection, write_lock: asyncio.Lock):
+        self.connection = connection
+        # Serialises writers so a bulk insert transaction never swallows a
+        # concurrent single insert on the shared connection
+        self.write_lock = write_lock
+        self.insert_sql = (
+            f"INSERT INTO {self.table} ({', '.join(self.columns)}) "
+            f"VALUES ({', '.join('?' for _ in self.columns)})"
+        )
+
+    def _row(self, document: dict) -> tuple:
+        return tuple(_to_sql(document.get(column, self.defaults.get(column))) for column in self.columns)
+
+    def _columns(self, fields: Optional[Sequence[str]]) -> Sequence[str]:
+        if not fields:
+            return self.columns
+        unknown = set(fields) - set(self.columns)
+        if unknown:
+            raise ValueError(f"Unknown {self.table} fields: {', '.join(sorted(unknown))}")
+        return fields
+
+    def _document(self, row, columns: Sequence[str]) -> dict:
+        document = dict(zip(columns, row))
+        for column in self.datetime_columns:
+            if document.get(column) is not None:
+                document[column] = datetime.fromisoformat(document[column])
+        return document
+
+    async def _fetch(self, columns: Sequence[str], sql: str, parameters: Sequence = ()) -> List[dict]:
+        """Run ``SELECT <columns> <sql>`` and convert the rows to documents."""
+        async with self.connection.execute(f"SELECT {', '.join(columns)} {sql}", parameters) as cursor:
+            return [self._document(row, columns) for row in await cursor.fetchall()]
+
+    async def insert(self, document: dict) -> None:
+        async with self.write_lock:
+            try:
+                await self.connection.execute(self.insert_sql, self._row(document))
+            except sqlite3.IntegrityError as e:
+                raise DuplicateKeyError(str(e))
+
+    async def insert_many(self, documents: List[dict], outbox: Sequence[dict] = ()) -> None:
+        """Insert ``documents``, plus the ``outbox`` messages of those written, in one transaction."""
+        rows = [self._row(document) for document in documents]
+        failed = {}
+        async with self.write_lock:
+            await self.connection.execute("BEGIN")
+            try:
+                await self.connection.execute("SAVEPOINT bulk")
+                try:
+                    await self.connection.executemany(self.insert_sql, rows)
+                    await self.connection.execute("RELEASE bulk")
+                except sqlite3.IntegrityError:
+                    # executemany cannot tell which rows failed, so retry row by row
+                    await self.connection.execute("ROLLBACK TO bulk")
+                    await self.connection.execute("RELEASE bulk")
+                    for index, row in enumerate(rows):
+                        try:
+                            await self.connection.execute(self.insert_sql, row)
+                        except sqlite3.IntegrityError as e:
+                            failed[index] = str(e)
+                if outbox:
+                    failed_ids = {documents[index]["id"] for index in failed}
+                    await self.connection.executemany(
+                        OUTBOX_INSERT_SQL,
+                        [_outbox_row(message) for message in outbox if message["source_id"] not in failed_ids],
+                    )
+                await self.connection.execute("COMMIT")
+            except BaseException:
+                await self.connection.execute("ROLLBACK")
+                raise
+        if failed:
+            raise BulkInsertError(failed)
+
+    async def get(self, document_id: str, fields: Optional[Sequence[str]] = None) -> Optional[dict]:
+        rows = await self._fetch(self._columns(fields), f"FROM {self.table} WHERE id = ?", (document_id,))
+        return rows[0] if rows else None
+
+
+def _range_clauses(column: str, since: Optional[datetime], until: Optional[datetime]) -> Tuple[List[str], List]:
+    clauses = []
+    parameters = []
+    if since:
+        clauses.append(f"{column} >= ?")
+        parameters.append(_to_sql(since))
+    if until:
+        clauses.append(f"{column} < ?")
+        parameters.append(_to_sql(until))
+    return clauses, parameters
+
+
+def _filter_clauses(filters: ContactFilters) -> Tuple[List[str], List]:
+    clauses = []
+    parameters = []
+    if filters.status:
+        clauses.append("status = ?")
+        parameters.append(filters.status)
+    if filters.interest:
+        clauses.append("interest = ?")
+        parameters.append(filters.interest)
+    range_clauses, range_parameters = _range_clauses("submitted_at", filters.submitted_after, filters.submitted_before)
+    return clauses + range_clauses, parameters + range_parameters
+
+
+class SQLiteContactRepository(SQLiteRepository, ContactRepository):
+    table = "contact_submissions"
+    columns = ("id", "name", "email", "organization", "interest", "message", "submitted_at", "status", "version")
+    datetime_columns = ("submitted_at",)
+    defaults = {"version": INITIAL_VERSION}
+
+    async def insert(self, document: dict, outbox: Sequence[dict] = ()) -> None:
+        if not outbox:
+            return await super().insert(document)
+        async with self.write_lock:
+            await self.connection.execute("BEGIN")
+            try:
+                await self.connection.execute(self.insert_sql, self._row(document))
+                await self.connection.executemany(OUTBOX_INSERT_SQL, [_outbox_row(message) for message in outbox])
+                await self.connection.execute("COMMIT")
+            except BaseException as e:
+                await self.connection.execute("ROLLBACK")
+                if isinstance(e, sqlite3.IntegrityError):
+                    raise DuplicateKeyError(str(e))
+                raise
+
+    async def list_page(self, filters: ContactFilters, limit: int, after: Optional[ContactKey] = None,
+                        fields: Optional[Sequence[str]] = None) -> List[dict]:
+        clauses, parameters = _filter_clauses(filters)
+        if after:
+            clauses.append("(submitted_at, id) < (?, ?)")
+            parameters.extend([_to_sql(after[0]), after[1]])
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        return await self._fetch(
+            self._columns(fields),
+            f"FROM {self.table} {where} ORDER BY submitted_at DESC, id DESC LIMIT ?",
+            (*parameters, limit),
+        )
+
+    async def iterate(self, filters: ContactFilters, after: Optional[ContactKey] = None, batch_size: int = 500,
+                      fields: Optional[Sequence[str]] = None) -> AsyncIterator[dict]:
+        # The keyset needs submitted_at and id even when they are not requested
+        columns = self._columns(fields)
+        extra = [column for column in ("submitted_at", "id") if column not in columns]
+        while True:
+            batch = await self.list_page(filters, batch_size, after, [*columns, *extra])
+            for document in batch:
+                yield {column: document[column] for column in columns} if extra else document
+            if len(batch) < batch_size:
+                return
+            after = (batch[-1]["submitted_at"], batch[-1]["id"])
+
+    async def search(self, query: str, filters: ContactFilters, limit: int, offset: int = 0,
+                     fields: Optional[Sequence[str]] = None) -> List[dict]:
+        terms = set(tokenize(query))
+        if not terms:
+            return []
+        # Quoted terms so user input cannot inject FTS5 query syntax
+        match = " OR ".join(f'"{term}"' for term in sorted(terms))
+        clauses, parameters = _filter_clauses(filters)
+        where = "".join(f" AND {clause}" for clause in clauses)
+        columns = self._columns(fields)
+        weights = ", ".join(str(float(weight)) for weight in SEARCH_FIELD_WEIGHTS.values())
+        async with self.connection.execute(
+            f"SELECT -bm25(contact_search, {weights}) AS score, {', '.join(f'c.{column}' for column in columns)} "
+            f"FROM contact_search JOIN {self.table} c ON c.rowid = contact_search.rowid "
+            f"WHERE contact_search MATCH ?{where} ORDER BY score DESC LIMIT ? OFFSET ?",
+            (match, *parameters, limit, offset),
+        ) as cursor:
+            rows = await cursor.fetchall()
+        return [{**self._document(row[1:], columns), "score": row[0]} for row in rows]
+
+    async def set_status(self, document_id: str, status: str, expected_version: Optional[int] = None) -> Optional[dict]:
+        async with self.write_lock:
+            # IMMEDIATE so the row cannot change between the read and the update
+            await self.connection.execute("BEGIN IMMEDIATE")
+            try:
+                rows = await self._fetch(self.columns, "FROM contact_submissions WHERE id = ?", (document_id,))
+                previous = rows[0] if rows else None
+                if previous is not None and expected_version is not None and previous["version"] != expected_version:
+                    previous = None
+                if previous is not None:
+                    await self.connection.execute(
+                        "UPDATE contact_submissions SET status = ?, version = version + 1 WHERE id = ?", (status, document_id)
+                    )
+                await self.connection.execute("COMMIT")
+            except BaseException:
+                await self.connection.execute("ROLLBACK")
+                raise
+        return previous
+
+    async def set_status_many(self, status: str, ids: Optional[Sequence[str]] = None,
+                              filters: Optional[ContactFilters] = None) -> List[dict]:
+        if ids is not None:
+            # One bound JSON array instead of a parameter per id
+            clauses, parameters = ["id IN (SELECT value FROM json_each(?))"], [json.dumps(list(ids))]
+        else:
+            clauses, parameters = _filter_clauses(filters or ContactFilters())
+        where = " AND ".join(clauses + ["status != ?"])
+        parameters = parameters + [status]
+        async with self.write_lock:
+            await self.connection.execute("BEGIN IMMEDIATE")
+            try:
+                previous = await self._fetch(("id", "status", "submitted_at", "version"), f"FROM contact_submissions WHERE {where}", parameters)
+                if previous:
+                    await self.connection.execute(
+                        f"UPDATE contact_submissions SET status = ?, version = version + 1 WHERE {where}", [status] + parameters
+                    )
+                await self.connection.execute("COMMIT")
+            except BaseException:
+                await self.connection.execute("ROLLBACK")
+                raise
+        return previous
+
+
+class SQLiteStatusCheckRepository(SQLiteRepository, StatusCheckRepository):
+    table = "status_checks"
+    columns = ("id", "client_name", "timestamp")
+    datetime_columns = ("timestamp",)
+    summary_columns = ("client_name", "bucket_start", "count", "first_seen", "last_seen")
+
+    # Each tier is grouped from the one below it; timestamps are ISO-8601
+    # text, so truncating the string truncates the time
+    DOWNSAMPLE_SELECT = {
+        "minute": "SELECT 'minute', client_name, substr(timestamp, 1, 16) || ':00.000000', "
+                  "COUNT(*), MIN(timestamp), MAX(timestamp) FROM status_checks "
+                  "WHERE timestamp >= ? AND timestamp < ? GROUP BY 2, 3",
+        "hour": "SELECT 'hour', client_name, substr(bucket_start, 1, 13) || ':00:00.000000', "
+                "SUM(count), MIN(first_seen), MAX(last_seen) FROM status_check_summaries "
+                "WHERE resolution = 'minute' AND bucket_start >= ? AND bucket_start < ? GROUP BY 2, 3",
+    }
+
+    def __init__(self, connection, write_lock: asyncio.Lock, retention: StatusRetention):
+        super().__init__(connection, write_lock)
+        self.retention = retention
+
+    async def list(self, limit: int, fields: Optional[Sequence[str]] = None, client_name: Optional[str] = None,
+                   since: Optional[datetime] = None, until: Optional[datetime] = None) -> List[dict]:
+        clauses, parameters = _range_clauses("timestamp", since, until)
+        if client_name:
+            clauses.append("client_name = ?")
+            parameters.append(client_name)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        return await self._fetch(
+            self._columns(fields),
+            f"FROM {self.table} {where} ORDER BY timestamp DESC, rowid DESC LIMIT ?",
+            (*parameters, limit),
+        )
+
+    async def iterate(self, batch_size: int = 500, fields: Optional[Sequence[str]] = None) -> AsyncIterator[dict]:
+        columns = self._columns(fields)
+        last_rowid = 0
+        while True:
+            async with self.connection.execute(
+                f"SELECT rowid, {', '.join(columns)} FROM {self.table} WHERE rowid > ? ORDER BY rowid LIMIT ?",
+                (last_rowid, batch_size),
+            ) as cursor:
+                rows = await cursor.fetchall()
+            for row in rows:
+                yield self._document(row[1:], columns)
+            if len(rows) < batch_size:
+                return
+            last_rowid = rows[-1][0]
+
+    async def summaries(self, resolution: str, limit: int, client_name: Optional[str] = None,
+                        since: Optional[datetime] = None, until: Optional[datetime] = None) -> List[dict]:
+        clauses, parameters = _range_clauses("bucket_start", since, until)
+        if client_name:
+            clauses.append("client_name = ?")
+            parameters.append(client_name)
+        where = "".join(f" AND {clause}" for clause in clauses)
+        async with self.connection.execute(
+            f"SELECT {', '.join(self.summary_columns)} FROM status_check_summaries WHERE resolution = ?{where} "
+            "ORDER BY bucket_start DESC, client_name DESC LIMIT ?",
+            (resolution, *parameters, limit),
+        ) as cursor:
+            rows = await cursor.fetchall()
+        return [
+            {**dict(zip(self.summary_columns, row)), "bucket_start": datetime.fromisoformat(row[1]),
+             "first_seen": datetime.fromisoformat(row[3]), "last_seen": datetime.fromisoformat(row[4])}
+            for row in rows
+        ]
+
+    async def downsample(self, resolution: str, until: datetime) -> None:
+        async with self.connection.execute(
+            "SELECT MAX(bucket_start) FROM status_check_summaries WHERE resolution = ?", (resolution,)
+        ) as cursor:
+            (start,) = await cursor.fetchone()
+        async with self.write_lock:
+            await self.connection.execute(
+                "INSERT INTO status_check_summaries (resolution, client_name, bucket_start, count, first_seen, last_seen) "
+                f"{self.DOWNSAMPLE_SELECT[resolution]} "
+                "ON CONFLICT (resolution, client_name, bucket_start) DO UPDATE SET "
+                "count = excluded.count, first_seen = excluded.first_seen, last_seen = excluded.last_seen",
+                (start or "", _to_sql(until)),
+            )
+
+    async def purge(self, now: datetime) -> None:
+        async with self.write_lock:
+            await self.connection.execute("DELETE FROM status_checks WHERE timestamp < ?", (_to_sql(now - self.retention.raw),))
+            for resolution in SUMMARY_RESOLUTIONS:
+                await self.connection.execute(
+                    "DELETE FROM status_check_summaries WHERE resolution = ? AND bucket_start < ?",
+                    (resolution, _to_sql(now - getattr(self.retention, resolution))),
+                )
+
+
+class SQLiteIdempotencyRepository(IdempotencyRepository):
+    # Expired claims are swept after this many new claims
+    PURGE_EVERY = 1000
+
+    def __init__(self, connection, write_lock: asyncio.Lock):
+        self.connection = connection
+        self.write_lock = write_lock
+        self._claims_since_purge = 0
+
+    async def claim(self, key: str, record: dict, expires_at: datetime) -> Optional[dict]:
+        now = _to_sql(datetime.utcnow())
+        async with self.write_lock:
+            self._claims_since_purge += 1
+            if self._claims_since_purge >= self.PURGE_EVERY:
+                self._claims_since_purge = 0
+                await self.connection.execute("DELETE FROM contact_idempotency_keys WHERE expires_at <= ?", (now,))
+            # Insert, or take over a claim that has already expired
+            cursor = await self.connection.execute(
+                "INSERT INTO contact_idempotency_keys (key, record, expires_at) VALUES (?, ?, ?) "
+                "ON CONFLICT (key) DO UPDATE SET record = excluded.record, expires_at = excluded.expires_at "
+                "WHERE contact_idempotency_keys.expires_at <= ?",
+                (key, json.dumps(record), _to_sql(expires_at), now),
+            )
+            if cursor.rowcount:
+                return None
+        async with self.connection.execute(
+            "SELECT record, expires_at FROM contact_idempotency_keys WHERE key = ?", (key,)
+        ) as cursor:
+            row = await cursor.fetchone()
+        if row is None:
+            return None
+        return {**json.loads(row[0]), "expires_at": datetime.fromisoformat(row[1])}
+
+    async def complete(self, key: str, record: dict, expires_at: datetime) -> None:
+        async with self.write_lock:
+            await self.connection.execute(
+                "UPDATE contact_idempotency_keys SET record = ?, expires_at = ? "
+                "WHERE key = ? AND json_extract(record, '$.id') = ?",
+                (json.dumps(record), _to_sql(expires_at), key, record.get("id")),
+            )
+
+    async def release(self, key: str) -> None:
+        async with self.write_lock:
+            await self.connection.execute("DELETE FROM contact_idempotency_keys WHERE key = ?", (key,))
+
+
+class SQLiteRateLimitRepository(RateLimitRepository):
+    """Token buckets in the database file, shared by every worker process on the node."""
+
+    def __init__(self, connection, write_lock: asyncio.Lock):
+        self.connection = connection
+        self.write_lock = write_lock
+
+    async def take(self, key: str, rate: float, burst: float) -> Tuple[bool, float]:
+        async with self.write_lock:
+            # IMMEDIATE takes the file's write lock up front, so the
+            # read-modify-write cannot interleave with another process
+            await self.connection.execute("BEGIN IMMEDIATE")
+            try:
+                async with self.connection.execute(
+                    "SELECT tokens, updated_at FROM rate_limit_buckets WHERE key = ?", (key,)
+                ) as cursor:
+                    row = await cursor.fetchone()
+                now = time.time()
+                tokens, updated = row if row else (burst, now)
+                allowed, tokens, retry_after = take_token(tokens, max(0.0, now - updated), rate, burst)
+                await self.connection.execute(
+                    "INSERT INTO rate_limit_buckets (key, tokens, updated_at) VALUES (?, ?, ?) "
+                    "ON CONFLICT (key) DO UPDATE SET tokens = excluded.tokens, updated_at = excluded.updated_at",
+                    (key, tokens, now),
+                )
+                await self.connection.execute("COMMIT")
+            except BaseException:
+                await self.connection.execute("ROLLBACK")
+                raise
+        return allowed, retry_after
+
+
+class SQLiteOutboxRepository(OutboxRepository):
+    def __init__(self, connection, write_lock: asyncio.Lock):
+        self.connection = connection
+        self.write_lock = write_lock
+
+    async def claim(self, limit: int, now: datetime, lease_until: datetime) -> List[dict]:
+        async with self.write_lock:
+            # A single statement, so workers in other processes cannot claim the same rows
+            async with self.connection.execute(
+                "UPDATE outbox SET next_attempt_at = ?, attempts = attempts + 1 WHERE id IN ("
+                "SELECT id FROM outbox WHERE status = 'pending' AND next_attempt_at <= ? "
+                "ORDER BY next_attempt_at LIMIT ?) "
+                f"RETURNING {', '.join(OUTBOX_COLUMNS)}",
+                (_to_sql(lease_until), _to_sql(now), limit),
+            ) as cursor:
+                rows = await cursor.fetchall()
+        return sorted((_outbox_message(row) for row in rows), key=lambda message: message["created_at"])
+
+    async def complete(self, message_ids: Sequence[str]) -> None:
+        async with self.write_lock:
+            await self.connection.executemany("DELETE FROM outbox WHERE id = ?", [(message_id,) for message_id in message_ids])
+
+    async def retry(self, message_id: str, next_attempt_at: datetime, error: str) -> None:
+        async with self.write_lock:
+            await self.connection.execute(
+                "UPDATE outbox SET next_attempt_at = ?, last_error = ? WHERE id = ?",
+                (_to_sql(next_attempt_at), error, message_id),
+            )
+
+    async def dead_letter(self, message_id: str, error: str) -> None:
+        async with self.write_lock:
+            await self.connection.execute(
+                "UPDATE outbox SET status = 'dead', last_error = ? WHERE id = ?", (error, message_id)
+            )
+
+    async def counts(self) -> Dict[str, int]:
+        async with self.connection.execute("SELECT status, COUNT(*) FROM outbox GROUP BY status") as cursor:
+            rows = await cursor.fetchall()
+        return {**{status: 0 for status in OUTBOX_STATUSES}, **dict(rows)}
+
+
+class SQLiteContactStatsRepository(ContactStatsRepository):
+    # submitted_at is ISO-8601 text, so its first ten characters are the day
+    REBUILD_SQL = [
+        "DELETE FROM contact_stats",
+        "INSERT INTO contact_stats (day, dimension, value, count) "
+        "SELECT substr(submitted_at, 1, 10), 'total', '', COUNT(*) FROM contact_submissions GROUP BY 1",
+        "INSERT INTO contact_stats (day, dimension, value, count) "
+        "SELECT substr(submitted_at, 1, 10), 'status', COALESCE(NULLIF(status, ''), :unspecified), COUNT(*) "
+        "FROM contact_submissions GROUP BY 1, 3",
+        "INSERT INTO contact_stats (day, dimension, value, count) "
+        "SELECT substr(submitted_at, 1, 10), 'interest', COALESCE(NULLIF(interest, ''), :unspecified), COUNT(*) "
+        "FROM contact_submissions GROUP BY 1, 3",
+    ]
+
+    def __init__(self, connection, write_lock: asyncio.Lock):
+        self.connection = connection
+        self.write_lock = write_lock
+
+    async def increment(self, deltas: Dict[StatsBucket, int]) -> None:
+        if not deltas:
+            return
+        async with self.write_lock:
+            await self.connection.executemany(
+                "INSERT INTO contact_stats (day, dimension, value, count) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (day, dimension, value) DO UPDATE SET count = count + excluded.count",
+                [(*bucket, delta) for bucket, delta in deltas.items()],
+            )
+
+    async def buckets(self, since: Optional[str] = None, until: Optional[str] = None) -> List[dict]:
+        async with self.connection.execute(
+            "SELECT day, dimension, value, count FROM contact_stats "
+            "WHERE day >= COALESCE(?, day) AND day <= COALESCE(?, day) ORDER BY day, dimension, value",
+            (since, until),
+        ) as cursor:
+            rows = await cursor.fetchall()
+        return [{"day": day, "dimension": dimension, "value": value, "count": count} for day, dimension, value, count in rows]
+
+    async def rebuild(self) -> int:
+        async with self.write_lock:
+            await self.connection.execute("BEGIN IMMEDIATE")
+            try:
+                for statement in self.REBUILD_SQL:
+                    await self.connection.execute(statement, {"unspecified": UNSPECIFIED})
+                await self.connection.execute("COMMIT")
+            except BaseException:
+                await self.connection.execute("ROLLBACK")
+                raise
+        async with self.connection.execute("SELECT COUNT(*) FROM contact_stats") as cursor:
+            (count,) = await cursor.fetchone()
+        return count
+
+
+class SQLiteEngine(StorageEngine):
+    name = "sqlite"
+
+    def __init__(self, path: str, status_retention: Optional[StatusRetention] = None):
+        self.path = path
+        self.status_retention = status_retention or StatusRetention()
+        self.connection = None
+
+    async def open(self) -> None:
+        if aiosqlite is None:
+            raise RuntimeError("The sqlite storage engine requires aiosqlite (pip install aiosqlite)")
+        # Autocommit mode; bulk inserts open their own transactions
+        self.connection = await aiosqlite.connect(self.path, isolation_level=None)
+        await self.connection.execute("PRAGMA journal_mode=WAL")
+        await self.connection.execute("PRAGMA synchronous=NORMAL")
+        # Other worker processes may hold the write lock briefly
+        await self.connection.execute("PRAGMA busy_timeout=5000")
+        async with self.connection.execute("SELECT 1 FROM sqlite_master WHERE name = 'contact_search'") as cursor:
+            has_search_index = await cursor.fetchone() is not None
+        for statement in SCHEMA:
+            await self.connection.execute(statement)
+        async with self.connection.execute("SELECT name FROM pragma_table_info('contact_submissions')") as cursor:
+            contact_columns = {name for (name,) in await cursor.fetchall()}
+        if "version" not in contact_columns:
+            # Databases created before submissions were versioned
+            await self.connection.execute("ALTER TABLE contact_submissions ADD COLUMN version INTEGER NOT NULL DEFAULT 1")
+        if not has_search_index:
+            # Index submissions stored before search existed
+            await self.connection.execute("INSERT INTO contact_search (contact_search) VALUES ('rebuild')")
+        write_lock = asyncio.Lock()
+        self.contacts = SQLiteContactRepository(self.connection, write_lock)
+        self.status_checks = SQLiteStatusCheckRepository(self.connection, write_lock, self.status_retention)
+        self.idempotency = SQLiteIdempotencyRepository(self.connection, write_lock)
+        self.rate_limits = SQLiteRateLimitRepository(self.connection, write_lock)
+        self.contact_stats = SQLiteContactStatsRepository(self.connection, write_lock)
+        self.outbox = SQLiteOutboxRepository(self.connection, write_lock)
+
+    async def ping(self) -> None:
+        # Queued behind the other statements on the connection's thread
+        await self.connection.execute("SELECT 1")
+
+    async def close(self) -> None:
+        if self.connection is not None:
+            await self.connection.close()
@@ -0,0 +1,123 @@
+"""Write-behind buffering that coalesces single-document inserts into bulk insert flushes."""
+
+import asyncio
+import logging
+from collections import deque
+from typing import Awaitable, Callable, Deque, List, Optional, Tuple
+
+from storage import BulkInsertError, Repository
+
+logger = logging.getLogger(__name__)
+
+
+class BufferFullError(Exception):
+    """Raised when the buffer cannot accept more documents (full or shutting down)."""
+
+
+class WriteBuffer:
+    """Bounded in-process queue of documents flushed with unordered bulk inserts.
+
+    A flush happens as soon as ``max_batch`` documents are pending, or
+    ``flush_interval`` seconds after the first pending document arrived,
+    whichever comes first. ``submit`` never waits for room: when
+    ``max_queue`` documents are already pending it raises ``BufferFullError``
+    so callers can push back instead of piling up memory. ``on_flush`` is
+    awaited with the written documents after every flush that wrote
+    something, before waiters are released. ``outbox`` returns the outbox
+    messages to store with a batch, for repositories that take them.
+    """
+
+    def __init__(self, repository: Repository, max_batch: int = 100, flush_interval: float = 0.05, max_queue: int = 10000,
+                 on_flush: Optional[Callable[[List[dict]], Awaitable[None]]] = None,
+                 outbox: Optional[Callable[[List[dict]], List[dict]]] = None):
+        self._repository = repository
+        self._on_flush = on_flush
+        self._outbox = outbox
+        self._max_batch = max_batch
+        self._flush_interval = flush_interval
+        self._max_queue = max_queue
+        self._pending: Deque[Tuple[dict, Optional[asyncio.Future]]] = deque()
+        self._wakeup = asyncio.Event()
+        self._batch_full = asyncio.Event()
+        self._closing = False
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    def __len__(self):
+        return len(self._pending)
+
+    def submit(self, document: dict, wait: bool = True) -> Optional[asyncio.Future]:
+        """Queue a document for insertion.
+
+        With ``wait`` a future is returned that resolves once the document is
+        written (or fails with the write error); otherwise the write is
+        fire-and-forget and failures are only logged.
+        """
+        if self._closing or len(self._pending) >= self._max_queue:
+            raise BufferFullError()
+        future = asyncio.get_running_loop().create_future() if wait else None
+        self._pending.append((document, future))
+        self._wakeup.set()
+        if len(self._pending) >= self._max_batch:
+            self._batch_full.set()
+        return future
+
+    async def close(self):
+        """Stop accepting documents and flush everything still pending."""
+        self._closing = True
+        self._wakeup.set()
+        self._batch_full.set()
+        if self._task is not None:
+            await self._task
+
+    async def _run(self):
+        while True:
+            if not self._pending:
+                if self._closing:
+                    return
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+            if len(self._pending) < self._max_batch and not self._closing:
+                self._batch_full.clear()
+                try:
+                    await asyncio.wait_for(self._batch_full.wait(), self._flush_interval)
+                except asyncio.TimeoutError:
+                    pass
+            batch = [self._pending.popleft() for _ in range(min(len(self._pending), self._max_batch))]
+            await self._flush(batch)
+
+    async def _flush(self, batch: List[Tuple[dict, Optional[asyncio.Future]]]):
+        write_errors = {}
+        documents = [document for document, _ in batch]
+        try:
+            if self._outbox is not None:
+                await self._repository.insert_many(documents, self._outbox(documents))
+            else:
+                await self._repository.insert_many(documents)
+        except BulkInsertError as e:
+            # Unordered inserts keep going past bad documents; only those fail
+            write_errors = e.failed
+        except Exception as e:
+            logger.error(f"Write buffer flush of {len(batch)} documents failed: {str(e)}")
+            for _, future in batch:
+                if future is not None and not future.done():
+                    future.set_exception(e)
+            return
+
+        if self._on_flush is not None and len(write_errors) < len(batch):
+            try:
+                await self._on_flush([document for index, (document, _) in enumerate(batch) if index not in write_errors])
+            except Exception as e:
+                logger.error(f"Write buffer on_flush callback failed: {str(e)}")
+        for index, (document, future) in enumerate(batch):
+            if index in write_errors:
+                logger.error(f"Write buffer insert of {document.get('id')} failed: {write_errors[index]}")
+            if future is None or future.done():
+                continue
+            if index in write_errors:
+                future.set_exception(RuntimeError(write_errors[index]))
+            else:
+                future.set_result(document.get("id"))
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+GreenLoop Project batch submission benchmark
+Compares the throughput of submitting N contact forms as individual
+POST /api/contact calls against POST /api/contact/batch in chunks.
+
+Runs against the configured STORAGE_ENGINE using a scratch database that is
+dropped afterwards.
+
+    STORAGE_ENGINE=memory python benchmarks/bench_batch.py --items 5000 --batch-size 500 --concurrency 16
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import time
+
+import common
+
+BENCH_DB_NAME = os.environ.get("BENCH_DB_NAME", "greenloop_bench_batch")
+
+INTERESTS = ["Learning about products", "Partnership opportunities", "Joining the community", "Other"]
+
+
+def make_items(count):
+    return [
+        {
+            "name": f"Sign-up {i}",
+            "email": f"signup{i}@example.com",
+            "organization": "Bench Event",
+            "interest": INTERESTS[i % len(INTERESTS)],
+            "message": f"Signed up at the community event, row {i} of the sheet.",
+        }
+        for i in range(count)
+    ]
+
+
+async def run_single(app, items, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def post(item):
+        async with semaphore:
+            result = await common.asgi_request(
+                app, "POST", "/api/contact",
+                headers={"content-type": "application/json"}, body=json.dumps(item).encode(),
+            )
+            return result["status"] == 200
+
+    start = time.perf_counter()
+    accepted = sum(await asyncio.gather(*(post(item) for item in items)))
+    return accepted, time.perf_counter() - start
+
+
+async def run_batch(app, items, batch_size, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def post(chunk):
+        async with semaphore:
+            result = await common.asgi_request(
+                app, "POST", "/api/contact/batch",
+                headers={"content-type": "application/json"}, body=json.dumps(chunk).encode(),
+            )
+            return json.loads(result["body"])["accepted"] if result["status"] == 200 else 0
+
+    chunks = [items[i:i + batch_size] for i in range(0, len(items), batch_size)]
+    start = time.perf_counter()
+    accepted = sum(await asyncio.gather(*(post(chunk) for chunk in chunks)))
+    return accepted, time.perf_counter() - start
+
+
+async def run(args):
+    common.use_scratch_datastore(BENCH_DB_NAME)
+    import server
+
+    items = make_items(args.items)
+    results = []
+    # Each mode gets a freshly opened datastore
+    for mode in ("single", "batch"):
+        async with server.app.router.lifespan_context(server.app):
+            try:
+                await common.asgi_request(server.app, "GET", "/api/")
+                if mode == "single":
+                    accepted, elapsed = await run_single(server.app, items, args.concurrency)
+                else:
+                    accepted, elapsed = await run_batch(server.app, items, args.batch_size, args.concurrency)
+            finally:
+                await common.drop_scratch_datastore(server.datastore)
+        results.append({"mode": mode if mode == "single" else f"batch/{args.batch_size}", "accepted": accepted,
+                        "seconds": round(elapsed, 3), "items_per_sec": round(accepted / elapsed, 1)})
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=5000)
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--output", help="write results to this JSON file")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    print(f"{'mode':<12}{'accepted':>10}{'seconds':>10}{'items/s':>12}")
+    for r in results:
+        print(f"{r['mode']:<12}{r['accepted']:>10}{r['seconds']:>10.2f}{r['items_per_sec']:>12.1f}")
+    if len(results) == 2 and results[0]["items_per_sec"]:
+        print(f"speedup: {results[1]['items_per_sec'] / results[0]['items_per_sec']:.1f}x")
+    if args.output:
+        common.write_json(args.output, {"items": args.items, "results": results})
+
+
+if __name__ == "__main__":
+    main()
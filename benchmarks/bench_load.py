@@ -0,0 +1,326 @@
+#!/usr/bin/env python3
+"""
+GreenLoop Project load and latency benchmark
+Runs a concurrent async load generator against POST/GET /api/contact and
+POST/GET /api/status, one scenario at a time, and reports throughput and
+p50/p95/p99 latency per scenario.
+
+Targets:
+  in-process (default)  drives the ASGI app directly, no sockets involved
+  --spawn               starts a local uvicorn worker and talks HTTP to it
+  --url URL             talks HTTP to an already running server
+
+The app uses STORAGE_ENGINE=memory unless another engine is configured, so no
+outside services are needed. Results can be written as JSON and compared
+against a previous run; the command exits with status 1 when a scenario
+regresses past the configured thresholds. Startup times are reported too: the
+phases the server timed itself (open, warm-up), the lifespan for in-process
+runs and the time from process start until GET /api/readyz succeeds for
+--spawn.
+
+    python benchmarks/bench_load.py --duration 10 --output results.json
+    python benchmarks/bench_load.py --duration 10 --baseline results.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+from datetime import datetime, timezone
+from pathlib import Path
+
+import common
+
+os.environ.setdefault("STORAGE_ENGINE", "memory")
+BENCH_DB_NAME = os.environ.get("BENCH_DB_NAME", "greenloop_bench_load")
+
+INTERESTS = ["Learning about products", "Partnership opportunities", "Joining the community", "Other"]
+
+
+def contact_payload(i):
+    return {
+        "name": f"Load Tester {i}",
+        "email": f"load{i}@example.com",
+        "organization": "Bench Org",
+        "interest": INTERESTS[i % len(INTERESTS)],
+        "message": f"Load test submission number {i} checking the contact pipeline.",
+    }
+
+
+# name -> (method, path, query string, body factory)
+SCENARIOS = {
+    "contact_post": ("POST", "/api/contact", "", contact_payload),
+    "contact_get": ("GET", "/api/contact", "limit=100", None),
+    "status_post": ("POST", "/api/status", "", lambda i: {"client_name": f"load-client-{i % 20}"}),
+    "status_get": ("GET", "/api/status", "", None),
+}
+
+
+class InProcessTarget:
+    """Calls the ASGI app directly inside its lifespan."""
+
+    name = "in-process"
+
+    async def __aenter__(self):
+        common.use_scratch_datastore(BENCH_DB_NAME)
+        import server
+
+        self.server = server
+        self._lifespan = server.app.router.lifespan_context(server.app)
+        start = time.perf_counter()
+        await self._lifespan.__aenter__()
+        self.startup = {"lifespan_ms": round((time.perf_counter() - start) * 1000, 2), **server.startup_timings}
+        return self
+
+    async def __aexit__(self, *exc_info):
+        try:
+            await common.drop_scratch_datastore(self.server.datastore)
+        finally:
+            await self._lifespan.__aexit__(*exc_info)
+
+    async def request(self, method, path, query="", payload=None):
+        body = json.dumps(payload).encode() if payload is not None else b""
+        headers = {"content-type": "application/json"} if payload is not None else {}
+        result = await common.asgi_request(self.server.app, method, path, query, headers, body, keep_body=False)
+        return result["status"]
+
+
+class HttpTarget:
+    """Talks HTTP to a running server over a pool of keep-alive connections."""
+
+    def __init__(self, base_url, concurrency, startup=None):
+        self.name = base_url
+        self.base_url = base_url.rstrip("/")
+        self.concurrency = concurrency
+        self.startup = startup
+
+    async def __aenter__(self):
+        try:
+            import httpx
+        except ImportError:
+            sys.exit("HTTP targets need httpx (pip install httpx)")
+        self.client = httpx.AsyncClient(
+            base_url=self.base_url,
+            timeout=30,
+            limits=httpx.Limits(max_connections=self.concurrency, max_keepalive_connections=self.concurrency),
+        )
+        if self.startup is None:
+            # A server started elsewhere only has its own account of startup
+            response = await self.client.get("/api/readyz")
+            self.startup = response.json().get("startup_ms") if response.status_code == 200 else None
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.client.aclose()
+
+    async def request(self, method, path, query="", payload=None):
+        url = f"{path}?{query}" if query else path
+        response = await self.client.request(method, url, json=payload)
+        return response.status_code
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def spawn_uvicorn(port):
+    """Start a worker and wait until it reports ready; returns the process and its startup times."""
+    env = dict(os.environ)
+    env["DB_NAME"] = BENCH_DB_NAME
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "server:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=common.BACKEND_DIR, env=env,
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            sys.exit(f"uvicorn exited with status {process.returncode}")
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/api/readyz", timeout=1) as response:
+                ready = json.load(response)
+            return process, {"process_to_ready_ms": round((time.perf_counter() - start) * 1000, 2), **ready["startup_ms"]}
+        except OSError:
+            time.sleep(0.05)
+    process.terminate()
+    sys.exit("uvicorn did not become ready within 30 seconds")
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(0, min(len(sorted_values) - 1, int(round(fraction * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[rank]
+
+
+def summarize(latencies, errors, elapsed):
+    latencies.sort()
+    ms = [latency * 1000 for latency in latencies]
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "seconds": round(elapsed, 3),
+        "throughput_rps": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "latency_ms": {
+            "mean": round(sum(ms) / len(ms), 3) if ms else None,
+            "p50": round(percentile(ms, 0.50), 3) if ms else None,
+            "p95": round(percentile(ms, 0.95), 3) if ms else None,
+            "p99": round(percentile(ms, 0.99), 3) if ms else None,
+            "max": round(ms[-1], 3) if ms else None,
+        },
+    }
+
+
+async def run_scenario(target, scenario, concurrency, duration, max_requests):
+    method, path, query, make_body = SCENARIOS[scenario]
+    latencies = []
+    errors = 0
+    counter = 0
+    deadline = time.perf_counter() + duration
+
+    async def worker():
+        nonlocal errors, counter
+        while time.perf_counter() < deadline and (max_requests is None or counter < max_requests):
+            counter += 1
+            payload = make_body(counter) if make_body else None
+            start = time.perf_counter()
+            try:
+                status = await target.request(method, path, query, payload)
+            except Exception:
+                status = None
+            latencies.append(time.perf_counter() - start)
+            if status is None or status >= 400:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies, errors, time.perf_counter() - start)
+
+
+async def seed(target, count):
+    """Give the list endpoints something to read."""
+    for offset in range(0, count, 500):
+        chunk = [contact_payload(i) for i in range(offset, min(offset + 500, count))]
+        await target.request("POST", "/api/contact/batch", payload=chunk)
+    for i in range(min(count, 1000)):
+        await target.request("POST", "/api/status", payload={"client_name": f"seed-client-{i % 20}"})
+
+
+async def run(args, target):
+    async with target:
+        if target.startup:
+            print("Startup: " + "  ".join(f"{phase.removesuffix('_ms')} {ms} ms" for phase, ms in target.startup.items()))
+        print(f"{'scenario':<14}{'requests':>9}{'errors':>8}{'req/s':>11}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}", flush=True)
+        await seed(target, args.seed)
+        results = {}
+        for scenario in args.scenarios:
+            results[scenario] = await run_scenario(target, scenario, args.concurrency, args.duration, args.requests)
+            print(format_row(scenario, results[scenario]), flush=True)
+        return results
+
+
+def format_row(scenario, result):
+    latency = result["latency_ms"]
+    cells = [latency[key] if latency[key] is not None else float("nan") for key in ("p50", "p95", "p99")]
+    return (f"{scenario:<14}{result['requests']:>9}{result['errors']:>8}{result['throughput_rps']:>11.1f}"
+            + "".join(f"{cell:>10.2f}" for cell in cells))
+
+
+def compare(results, baseline, max_throughput_drop, max_latency_increase):
+    """Print the change against a baseline run and return the regressions found."""
+    regressions = []
+    print(f"\n{'scenario':<14}{'metric':<16}{'baseline':>12}{'current':>12}{'change':>10}")
+    for scenario, current in results.items():
+        previous = baseline.get("scenarios", {}).get(scenario)
+        if not previous:
+            continue
+        checks = [("throughput_rps", previous["throughput_rps"], current["throughput_rps"], True)]
+        for key in ("p95", "p99"):
+            checks.append((f"{key}_ms", previous["latency_ms"][key], current["latency_ms"][key], False))
+        for metric, old, new, higher_is_better in checks:
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            regressed = -change > max_throughput_drop if higher_is_better else change > max_latency_increase
+            flag = "  REGRESSION" if regressed else ""
+            print(f"{scenario:<14}{metric:<16}{old:>12.2f}{new:>12.2f}{change:>+10.1%}{flag}")
+            if regressed:
+                regressions.append(f"{scenario} {metric}: {old:.2f} -> {new:.2f} ({change:+.1%})")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    target_group = parser.add_mutually_exclusive_group()
+    target_group.add_argument("--url", help="base URL of a running server, e.g. http://127.0.0.1:8001")
+    target_group.add_argument("--spawn", action="store_true", help="start a local uvicorn worker to test against")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=5.0, help="seconds per scenario")
+    parser.add_argument("--requests", type=int, help="stop a scenario after this many requests")
+    parser.add_argument("--seed", type=int, default=1000, help="contact submissions to create before measuring")
+    parser.add_argument("--output", help="write results to this JSON file")
+    parser.add_argument("--baseline", help="compare against results from a previous run")
+    parser.add_argument("--max-throughput-drop", type=float, default=0.15,
+                        help="fail when throughput falls by more than this fraction (default 0.15)")
+    parser.add_argument("--max-latency-increase", type=float, default=0.25,
+                        help="fail when p95/p99 latency grows by more than this fraction (default 0.25)")
+    args = parser.parse_args()
+
+    process = None
+    if args.spawn:
+        port = free_port()
+        process, startup = spawn_uvicorn(port)
+        target = HttpTarget(f"http://127.0.0.1:{port}", args.concurrency, startup)
+    elif args.url:
+        target = HttpTarget(args.url, args.concurrency)
+    else:
+        target = InProcessTarget()
+
+    print(f"Target: {target.name}  concurrency: {args.concurrency}  duration: {args.duration}s/scenario")
+    try:
+        results = asyncio.run(run(args, target))
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+
+    report = {
+        "meta": {
+            "target": target.name,
+            "storage_engine": os.environ.get("STORAGE_ENGINE"),
+            "concurrency": args.concurrency,
+            "duration": args.duration,
+            "requests": args.requests,
+            "seed": args.seed,
+            "python": platform.python_version(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+        },
+        "startup": target.startup,
+        "scenarios": results,
+    }
+    if args.output:
+        common.write_json(args.output, report)
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text())
+        regressions = compare(results, baseline, args.max_throughput_drop, args.max_latency_increase)
+        if regressions:
+            print("\nRegressions beyond threshold:")
+            for regression in regressions:
+                print(f"  - {regression}")
+            sys.exit(1)
+        print("\nNo regressions beyond threshold.")
+
+
+if __name__ == "__main__":
+    main()
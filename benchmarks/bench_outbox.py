@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+GreenLoop Project notification pipeline benchmark
+Posts contact submissions with email notifications on, delivered by the
+in-process outbox workers to a local aiosmtpd server, and reports POST
+/api/contact latency next to how long the emails took to arrive.
+
+--smtp-delay makes the SMTP server slow to accept each message, which should
+move the delivery numbers but not the request latency. --no-notify runs the
+same load with notifications off, as the baseline to compare against.
+
+    python benchmarks/bench_outbox.py --requests 2000 --smtp-delay 50
+    python benchmarks/bench_outbox.py --requests 2000 --no-notify
+
+Needs aiosmtpd (pip install aiosmtpd).
+"""
+
+import argparse
+import asyncio
+import email
+import json
+import os
+import re
+import sys
+import time
+
+import common
+from bench_load import contact_payload, free_port, percentile
+
+os.environ.setdefault("STORAGE_ENGINE", "memory")
+BENCH_DB_NAME = os.environ.get("BENCH_DB_NAME", "greenloop_bench_outbox")
+SUBJECT_NUMBER = re.compile(r"Load Tester (\d+)$")
+
+
+class RecordingHandler:
+    """aiosmtpd handler noting when the email for each submission arrived."""
+
+    def __init__(self, delay):
+        self.delay = delay
+        self.received = {}
+
+    async def handle_DATA(self, server, session, envelope):
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        subject = email.message_from_bytes(envelope.content)["Subject"] or ""
+        match = SUBJECT_NUMBER.search(subject)
+        if match:
+            self.received[int(match.group(1))] = time.perf_counter()
+        return "250 Message accepted for delivery"
+
+
+def milliseconds(values):
+    values = sorted(value * 1000 for value in values)
+    if not values:
+        return None
+    return {key: round(percentile(values, fraction), 2) for key, fraction in (("p50", 0.5), ("p95", 0.95), ("p99", 0.99))}
+
+
+async def run(args, handler):
+    common.use_scratch_datastore(BENCH_DB_NAME)
+    import server
+
+    lifespan = server.app.router.lifespan_context(server.app)
+    await lifespan.__aenter__()
+    latencies = []
+    submitted = {}
+    errors = 0
+    counter = 0
+
+    async def client():
+        nonlocal counter, errors
+        while counter < args.requests:
+            counter += 1
+            number = counter
+            body = json.dumps(contact_payload(number)).encode()
+            start = time.perf_counter()
+            result = await common.asgi_request(
+                server.app, "POST", "/api/contact", headers={"content-type": "application/json"}, body=body, keep_body=False
+            )
+            submitted[number] = time.perf_counter()
+            latencies.append(submitted[number] - start)
+            if result["status"] != 200:
+                errors += 1
+
+    try:
+        start = time.perf_counter()
+        await asyncio.gather(*(client() for _ in range(args.concurrency)))
+        load_seconds = time.perf_counter() - start
+        drained_at = None
+        if not args.no_notify:
+            deadline = time.perf_counter() + args.drain_timeout
+            while len(handler.received) < len(submitted) - errors and time.perf_counter() < deadline:
+                await asyncio.sleep(0.05)
+            drained_at = time.perf_counter()
+        outbox = await server.datastore.outbox.counts()
+    finally:
+        try:
+            await common.drop_scratch_datastore(server.datastore)
+        finally:
+            await lifespan.__aexit__(None, None, None)
+
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput_rps": round(len(latencies) / load_seconds, 1),
+        "post_latency_ms": milliseconds(latencies),
+        "emails_received": len(handler.received),
+        "delivery_lag_ms": milliseconds([handler.received[n] - submitted[n] for n in handler.received if n in submitted]),
+        "drain_seconds_after_load": round(drained_at - start - load_seconds, 3) if drained_at else None,
+        "outbox": outbox,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--smtp-delay", type=float, default=20.0, help="milliseconds the SMTP server takes per message")
+    parser.add_argument("--workers", type=int, default=4, help="outbox workers (OUTBOX_WORKERS)")
+    parser.add_argument("--batch-size", type=int, default=20, help="messages per SMTP connection (OUTBOX_BATCH_SIZE)")
+    parser.add_argument("--drain-timeout", type=float, default=120.0, help="seconds to wait for every email")
+    parser.add_argument("--no-notify", action="store_true", help="run with notifications off, as a baseline")
+    parser.add_argument("--output", help="write results to this JSON file")
+    args = parser.parse_args()
+
+    try:
+        from aiosmtpd.controller import Controller
+    except ImportError:
+        sys.exit("This benchmark needs aiosmtpd (pip install aiosmtpd)")
+
+    handler = RecordingHandler(args.smtp_delay / 1000)
+    controller = Controller(handler, hostname="127.0.0.1", port=free_port())
+    controller.start()
+    os.environ["NOTIFY_EMAIL_TO"] = "" if args.no_notify else "team@greenloop.test"
+    os.environ["SMTP_HOST"] = controller.hostname
+    os.environ["SMTP_PORT"] = str(controller.port)
+    os.environ["OUTBOX_WORKERS"] = str(args.workers)
+    os.environ["OUTBOX_BATCH_SIZE"] = str(args.batch_size)
+    os.environ["OUTBOX_WORKER_MODE"] = "in-process"
+    try:
+        results = asyncio.run(run(args, handler))
+    finally:
+        controller.stop()
+
+    print(json.dumps(results, indent=2))
+    if args.output:
+        common.write_json(args.output, {
+            "meta": {"storage_engine": os.environ.get("STORAGE_ENGINE"), **vars(args)},
+            "results": results,
+        })
+
+
+if __name__ == "__main__":
+    main()
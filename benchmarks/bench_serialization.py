@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+GreenLoop Project read-path serialization microbenchmark
+Measures the per-document cost of turning stored contact submissions into a
+GET /api/contact response body:
+
+  models  the previous path: ContactSubmission(**doc) for every full stored
+          document (including Mongo's _id), FastAPI re-validating the list
+          against response_model, jsonable_encoder and JSONResponse rendering
+  direct  the current path: documents already projected to the public fields
+          by the query, encoded straight to bytes with fast_json
+
+Both paths must produce identical bytes; the benchmark checks that first.
+
+    python benchmarks/bench_serialization.py --sizes 1000 10000 100000
+"""
+
+import argparse
+import asyncio
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import List
+
+import common
+
+from bson import ObjectId
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+import fast_json
+from server import CONTACT_FIELDS, ContactSubmission
+
+
+def stored_documents(count):
+    """Documents as a full (unprojected) Mongo read returns them."""
+    start = datetime(2025, 1, 1)
+    return [
+        {
+            "_id": ObjectId(),
+            "id": str(uuid.uuid4()),
+            "name": f"Contact {i}",
+            "email": f"contact{i}@example.com",
+            "organization": "GreenTech Solutions" if i % 2 else None,
+            "interest": "Partnership opportunities" if i % 3 else None,
+            "message": "I'm interested in sustainable packaging solutions for our product line.",
+            "submitted_at": start + timedelta(seconds=i, microseconds=i % 1000 * 1000),
+            "status": "new",
+        }
+        for i in range(count)
+    ]
+
+
+async def models_path(documents, field):
+    models = [ContactSubmission(**document) for document in documents]
+    content = await serialize_response(field=field, response_content=models)
+    return JSONResponse(content).body
+
+
+def direct_path(documents):
+    return fast_json.dumps(documents)
+
+
+def best_of(repeat, function):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--repeat", type=int, default=3, help="runs per size; the fastest is reported")
+    parser.add_argument("--output", help="write results to this JSON file")
+    args = parser.parse_args()
+
+    field = create_response_field(name="Response", type_=List[ContactSubmission])
+    results = []
+    print(f"{'docs':>8}{'models us/doc':>16}{'direct us/doc':>16}{'speedup':>10}")
+    for size in args.sizes:
+        documents = stored_documents(size)
+        projected = [{key: document[key] for key in CONTACT_FIELDS} for document in documents]
+        if asyncio.run(models_path(documents, field)) != direct_path(projected):
+            raise SystemExit(f"Output mismatch for {size} documents")
+
+        models_seconds = best_of(args.repeat, lambda: asyncio.run(models_path(documents, field)))
+        direct_seconds = best_of(args.repeat, lambda: direct_path(projected))
+        result = {
+            "docs": size,
+            "models_us_per_doc": round(models_seconds / size * 1e6, 3),
+            "direct_us_per_doc": round(direct_seconds / size * 1e6, 3),
+            "speedup": round(models_seconds / direct_seconds, 1),
+        }
+        results.append(result)
+        print(f"{size:>8}{result['models_us_per_doc']:>16.2f}{result['direct_us_per_doc']:>16.2f}{result['speedup']:>9.1f}x")
+    if args.output:
+        common.write_json(args.output, {"results": results})
+
+
+if __name__ == "__main__":
+    main()
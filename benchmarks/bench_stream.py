@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+GreenLoop Project live feed benchmark
+Connects growing numbers of in-process subscribers to GET /api/contact/stream,
+posts contact submissions at a steady rate and reports how long each event
+took to reach the subscribers, next to POST latency and memory per
+subscriber. That shows how many concurrent subscribers one worker can hold.
+
+--slow adds subscribers that never read; they should be dropped once their
+buffer (CONTACT_STREAM_CLIENT_BUFFER) is full instead of growing memory.
+
+    python benchmarks/bench_stream.py --subscribers 100,1000,5000
+    python benchmarks/bench_stream.py --subscribers 1000 --slow 100
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import time
+from array import array
+
+import common
+from bench_load import contact_payload, percentile
+
+os.environ.setdefault("STORAGE_ENGINE", "memory")
+BENCH_DB_NAME = os.environ.get("BENCH_DB_NAME", "greenloop_bench_stream")
+ID_PREFIX = b'data: {"id":"'
+ID_LENGTH = 36
+
+
+class Subscriber:
+    """Drives one SSE request through the app, noting when each submission's event arrived."""
+
+    def __init__(self, app, stop, ids, slow=False):
+        self.app = app
+        self.stop = stop
+        # Shared by all subscribers, so each id is held once rather than once per subscriber
+        self.ids = ids
+        self.slow = slow
+        self.connected = asyncio.Event()
+        self.arrived_ids = []
+        self.arrived_at = array("d")
+
+    async def run(self):
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "GET",
+            "scheme": "http",
+            "path": "/api/contact/stream",
+            "raw_path": b"/api/contact/stream",
+            "root_path": "",
+            "query_string": b"",
+            "headers": [(b"accept", b"text/event-stream")],
+            "client": ("127.0.0.1", 50000),
+            "server": ("bench", 80),
+        }
+        request_sent = False
+
+        async def receive():
+            nonlocal request_sent
+            if not request_sent:
+                request_sent = True
+                return {"type": "http.request", "body": b"", "more_body": False}
+            await self.stop.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            if message["type"] != "http.response.body":
+                return
+            if not self.connected.is_set():
+                self.connected.set()
+                return
+            if self.slow:
+                # Never finishes reading, like a client whose socket is full
+                await self.stop.wait()
+                return
+            now = time.perf_counter()
+            chunk = message.get("body", b"")
+            position = chunk.find(ID_PREFIX)
+            while position != -1:
+                start = position + len(ID_PREFIX)
+                submission_id = chunk[start:start + ID_LENGTH]
+                self.arrived_ids.append(self.ids.setdefault(submission_id, submission_id))
+                self.arrived_at.append(now)
+                position = chunk.find(ID_PREFIX, start)
+
+        await self.app(scope, receive, send)
+
+
+def milliseconds(values):
+    values = sorted(value * 1000 for value in values)
+    if not values:
+        return None
+    return {key: round(percentile(values, fraction), 2) for key, fraction in (("p50", 0.5), ("p95", 0.95), ("p99", 0.99))}
+
+
+async def run_step(server, count, args, first_number):
+    stop = asyncio.Event()
+    ids = {}
+    subscribers = [Subscriber(server.app, stop, ids) for _ in range(count)]
+    slow = [Subscriber(server.app, stop, ids, slow=True) for _ in range(args.slow)]
+    rss_before = common.peak_rss_mb()
+    start = time.perf_counter()
+    tasks = [asyncio.create_task(subscriber.run()) for subscriber in subscribers + slow]
+    await asyncio.gather(*(subscriber.connected.wait() for subscriber in subscribers + slow))
+    connect_seconds = time.perf_counter() - start
+    rss_connected = common.peak_rss_mb()
+    dropped_before = server.contact_events.dropped
+
+    posted = {}
+    post_latencies = []
+    errors = 0
+    interval = 1 / args.rate
+    next_post = time.perf_counter()
+    # Numbered on from earlier steps, which the duplicate check would otherwise swallow
+    for number in range(first_number, first_number + args.events):
+        await asyncio.sleep(max(0.0, next_post - time.perf_counter()))
+        next_post += interval
+        body = json.dumps(contact_payload(number)).encode()
+        started = time.perf_counter()
+        result = await common.asgi_request(server.app, "POST", "/api/contact", headers={"content-type": "application/json"}, body=body)
+        post_latencies.append(time.perf_counter() - started)
+        if result["status"] != 200:
+            errors += 1
+            continue
+        posted[json.loads(result["body"])["id"].encode()] = started
+    await asyncio.sleep(args.settle)
+
+    lags = [
+        arrived - posted[submission_id]
+        for subscriber in subscribers
+        for submission_id, arrived in zip(subscriber.arrived_ids, subscriber.arrived_at)
+        if submission_id in posted
+    ]
+    expected = len(posted) * count
+    stats = {
+        "subscribers": count,
+        "slow_subscribers": args.slow,
+        "connect_seconds": round(connect_seconds, 3),
+        "kb_per_subscriber": round((rss_connected - rss_before) * 1024 / max(1, count + args.slow), 2),
+        "events": len(posted),
+        "post_errors": errors,
+        "post_latency_ms": milliseconds(post_latencies),
+        "delivered": round(len(lags) / expected, 4) if expected else None,
+        "delivery_lag_ms": milliseconds(lags),
+        "dropped": server.contact_events.dropped - dropped_before,
+        "peak_rss_mb": round(common.peak_rss_mb(), 1),
+    }
+    stop.set()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    return stats
+
+
+async def run(args):
+    common.use_scratch_datastore(BENCH_DB_NAME)
+    import server
+
+    lifespan = server.app.router.lifespan_context(server.app)
+    await lifespan.__aenter__()
+    results = []
+    try:
+        for step, count in enumerate(args.subscribers):
+            results.append(await run_step(server, count, args, step * args.events))
+            print(json.dumps(results[-1]), flush=True)
+    finally:
+        try:
+            await common.drop_scratch_datastore(server.datastore)
+        finally:
+            await lifespan.__aexit__(None, None, None)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--subscribers", default="100,1000,5000", help="comma-separated subscriber counts to step through")
+    parser.add_argument("--slow", type=int, default=0, help="extra subscribers that never read")
+    parser.add_argument("--events", type=int, default=300, help="submissions posted per step")
+    parser.add_argument("--rate", type=float, default=50.0, help="submissions posted per second")
+    parser.add_argument("--settle", type=float, default=1.0, help="seconds to wait for the last events after posting")
+    parser.add_argument("--output", help="write results to this JSON file")
+    args = parser.parse_args()
+    args.subscribers = [int(count) for count in args.subscribers.split(",")]
+    # Every subscriber may connect; the heartbeat should not show up in the numbers
+    os.environ.setdefault("CONTACT_STREAM_MAX_CLIENTS", str(max(args.subscribers) + args.slow))
+    os.environ.setdefault("CONTACT_STREAM_HEARTBEAT", "60")
+
+    results = asyncio.run(run(args))
+    if args.output:
+        common.write_json(args.output, {
+            "meta": {"storage_engine": os.environ.get("STORAGE_ENGINE"), **vars(args)},
+            "results": results,
+        })
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+GreenLoop Project streaming benchmark
+Compares the buffered JSON list response of GET /api/status against the
+NDJSON streaming mode (?stream=1): peak RSS, time to first byte and total time.
+
+Each mode runs in a fresh subprocess that seeds its own scratch datastore, so
+peak RSS is not shared between them.
+
+    STORAGE_ENGINE=memory python benchmarks/bench_streaming.py --docs 100000
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import uuid
+from datetime import datetime
+
+import common
+
+BENCH_DB_NAME = os.environ.get("BENCH_DB_NAME", "greenloop_bench_streaming")
+MODES = {
+    "list": "",
+    "stream": "stream=1",
+}
+
+
+async def seed(datastore, docs):
+    batch = []
+    for i in range(docs):
+        batch.append({"id": str(uuid.uuid4()), "client_name": f"bench-client-{i % 50}", "timestamp": datetime.utcnow()})
+        if len(batch) == 10000:
+            await datastore.status_checks.insert_many(batch)
+            batch = []
+    if batch:
+        await datastore.status_checks.insert_many(batch)
+
+
+async def run_child(mode, docs):
+    common.use_scratch_datastore(BENCH_DB_NAME)
+    import server
+
+    async with server.app.router.lifespan_context(server.app):
+        try:
+            await seed(server.datastore, docs)
+            # Warm up imports and the router on a tiny request
+            await common.asgi_request(server.app, "GET", "/api/")
+            rss_before = common.peak_rss_mb()
+            result = await common.asgi_request(server.app, "GET", "/api/status", MODES[mode], keep_body=mode == "list")
+        finally:
+            await common.drop_scratch_datastore(server.datastore)
+    body = result.pop("body")
+    documents = result["lines"] if mode == "stream" else len(json.loads(body))
+    return {
+        "mode": mode,
+        "status": result["status"],
+        "documents": documents,
+        "bytes": result["bytes"],
+        "ttfb_ms": round(result["ttfb_ms"], 2),
+        "total_ms": round(result["total_ms"], 2),
+        "peak_rss_mb": round(common.peak_rss_mb(), 1),
+        "peak_rss_delta_mb": round(common.peak_rss_mb() - rss_before, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=100000, help="status checks to seed")
+    parser.add_argument("--output", help="write results to this JSON file")
+    parser.add_argument("--child", choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(asyncio.run(run_child(args.child, args.docs))))
+        return
+
+    results = []
+    for mode in MODES:
+        output = subprocess.run(
+            [sys.executable, __file__, "--child", mode, "--docs", str(args.docs)],
+            check=True, capture_output=True, text=True,
+        ).stdout
+        results.append(json.loads(output.strip().splitlines()[-1]))
+
+    print(f"{'mode':<8}{'docs':>10}{'MiB':>10}{'TTFB ms':>12}{'total ms':>12}{'peak RSS':>12}{'RSS delta':>12}")
+    for r in results:
+        print(f"{r['mode']:<8}{r['documents']:>10}{r['bytes'] / 2**20:>10.1f}{r['ttfb_ms']:>12.1f}"
+              f"{r['total_ms']:>12.1f}{r['peak_rss_mb']:>12.1f}{r['peak_rss_delta_mb']:>12.1f}")
+    if args.output:
+        common.write_json(args.output, {"docs": args.docs, "results": results})
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Shared helpers for the GreenLoop Project backend benchmarks.
+
+The benchmarks drive the FastAPI app in-process through raw ASGI calls so that
+time-to-first-byte can be measured per response body chunk (httpx's ASGI
+transport buffers the whole body before returning).
+
+They run against whichever STORAGE_ENGINE is configured (mongo by default);
+STORAGE_ENGINE=memory needs no outside services at all.
+"""
+
+import asyncio
+import json
+import os
+import resource
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# A benchmark is a single client hammering the write endpoints, which the
+# per-client rate limits exist to stop; measure the app, not the limiter
+os.environ.setdefault("RATE_LIMIT_ENABLED", "0")
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "backend"
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+
+def use_scratch_datastore(name):
+    """Point the app at a throwaway database; call before importing server."""
+    os.environ["DB_NAME"] = name
+    os.environ.setdefault("SQLITE_PATH", os.path.join(tempfile.mkdtemp(prefix="greenloop-bench-"), f"{name}.db"))
+
+
+async def drop_scratch_datastore(datastore):
+    if datastore.name == "mongo":
+        await datastore.client.drop_database(datastore.db_name)
+    elif datastore.name == "sqlite":
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(datastore.path + suffix):
+                os.remove(datastore.path + suffix)
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process so far, in MiB."""
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in KiB on Linux and in bytes on macOS
+    return usage / (1024 * 1024) if sys.platform == "darwin" else usage / 1024
+
+
+async def asgi_request(app, method, path, query_string="", headers=None, body=b"", keep_body=True):
+    """Run a single request through an ASGI app and time it.
+
+    Returns a dict with the status code, response size, newline count, time to
+    first body byte and total time (both in milliseconds). The body itself is
+    only kept with ``keep_body`` so large streams do not skew memory numbers.
+    """
+    raw_headers = [(k.lower().encode(), v.encode()) for k, v in (headers or {}).items()]
+    if body:
+        raw_headers.append((b"content-length", str(len(body)).encode()))
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": query_string.encode(),
+        "headers": raw_headers,
+        "client": ("127.0.0.1", 50000),
+        "server": ("bench", 80),
+    }
+    request_sent = False
+    finished = asyncio.Event()
+    result = {"status": None, "bytes": 0, "lines": 0, "ttfb_ms": None, "total_ms": None}
+    body_parts = []
+
+    async def receive():
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        # Only report a disconnect once the response is complete
+        await finished.wait()
+        return {"type": "http.disconnect"}
+
+    start = time.perf_counter()
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            result["status"] = message["status"]
+        elif message["type"] == "http.response.body":
+            chunk = message.get("body", b"")
+            if chunk and result["ttfb_ms"] is None:
+                result["ttfb_ms"] = (time.perf_counter() - start) * 1000
+            result["bytes"] += len(chunk)
+            result["lines"] += chunk.count(b"\n")
+            if keep_body:
+                body_parts.append(chunk)
+
+    try:
+        await app(scope, receive, send)
+    finally:
+        finished.set()
+    result["total_ms"] = (time.perf_counter() - start) * 1000
+    result["body"] = b"".join(body_parts)
+    return result
+
+
+def write_json(path, data):
+    """Write benchmark results as pretty-printed JSON."""
+    Path(path).write_text(json.dumps(data, indent=2, default=str) + "\n")
+
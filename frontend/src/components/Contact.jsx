@@ -1,4 +1,4 @@
-import React, { useState } from 'react';
+import React, { useRef, useState } from 'react';
 import { Send, MapPin, Mail, Phone, Instagram, Facebook, Twitter, Linkedin, Youtube, CheckCircle, AlertCircle, Loader } from 'lucide-react';
 import axios from 'axios';
 import { mockData } from './mock';
@@ -6,6 +6,9 @@ import { mockData } from './mock';
 const BACKEND_URL = process.env.REACT_APP_BACKEND_URL;
 const API = `${BACKEND_URL}/api`;
 
+const newIdempotencyKey = () =>
+  window.crypto?.randomUUID?.() ?? `${Date.now()}-${Math.random().toString(36).slice(2)}`;
+
 const Contact = () => {
   const [formData, setFormData] = useState({
     name: '',
@@ -17,6 +20,8 @@ const Contact = () => {
   const [isSubmitted, setIsSubmitted] = useState(false);
   const [isLoading, setIsLoading] = useState(false);
   const [error, setError] = useState(null);
+  // One key per filled-in form, so retries and double clicks are not stored twice
+  const idempotencyKey = useRef(null);
 
   const handleInputChange = (e) => {
     const { name, value } = e.target;
@@ -24,6 +29,7 @@ const Contact = () => {
       ...prev,
       [name]: value
     }));
+    idempotencyKey.current = null;
     // Clear error when user starts typing
     if (error) {
       setError(null);
@@ -36,9 +42,15 @@ const Contact = () => {
     setError(null);
 
     try {
-      const response = await axios.post(`${API}/contact`, formData);
+      if (!idempotencyKey.current) {
+        idempotencyKey.current = newIdempotencyKey();
+      }
+      const response = await axios.post(`${API}/contact`, formData, {
+        headers: { 'Idempotency-Key': idempotencyKey.current }
+      });
       
       if (response.data.success) {
+        idempotencyKey.current = null;
         setIsSubmitted(true);
         // Reset form after 5 seconds
         setTimeout(() => {
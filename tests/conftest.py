@@ -0,0 +1,58 @@
+"""Fixtures for testing the API through TestClient on the in-memory and SQLite engines."""
+
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "backend"
+# The backend modules import each other as top-level modules
+sys.path.insert(0, str(BACKEND_DIR))
+
+# Read when server is imported; background work and throttling would make the tests racy
+os.environ.setdefault("STORAGE_ENGINE", "memory")
+os.environ["RATE_LIMIT_ENABLED"] = "0"
+os.environ["STATUS_DOWNSAMPLE_INTERVAL"] = "0"
+os.environ["NOTIFY_EMAIL_TO"] = ""
+
+from starlette.testclient import TestClient  # noqa: E402
+
+from storage import create_engine  # noqa: E402
+
+
+@pytest.fixture
+def server():
+    import server
+
+    return server
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def client(request, server, tmp_path, monkeypatch):
+    """The app with its lifespan running on a fresh datastore."""
+    monkeypatch.setenv("STORAGE_ENGINE", request.param)
+    monkeypatch.setenv("SQLITE_PATH", str(tmp_path / "greenloop.db"))
+    with TestClient(server.app) as test_client:
+        yield test_client
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def engine(request, tmp_path):
+    """A storage engine on its own, unopened: open it in the event loop the test runs."""
+    return create_engine(request.param, sqlite_path=str(tmp_path / "greenloop.db"))
+
+
+@pytest.fixture
+def contact_payload():
+    def make(i, **fields):
+        return {
+            "name": f"Tester {i}",
+            "email": f"tester{i}@example.com",
+            "organization": "Test Org",
+            "interest": "Other",
+            "message": f"Test submission number {i} for the contact form.",
+            **fields,
+        }
+
+    return make
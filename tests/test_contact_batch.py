@@ -0,0 +1,16 @@
+def test_invalid_items_report_errors_per_field(client, contact_payload):
+    items = [
+        contact_payload(1),
+        contact_payload(2, name="A", email="not-an-email"),
+        "not an object",
+    ]
+
+    response = client.post("/api/contact/batch", json=items)
+
+    assert response.status_code == 200
+    valid, invalid, malformed = response.json()["results"]
+    assert valid["success"] is True
+    assert invalid["success"] is False
+    assert set(invalid["errors"]) == {"name", "email"}
+    assert invalid["errors"]["name"] == ["Value error, Name must be at least 2 characters long"]
+    assert malformed["errors"] == {"validation": ["Each submission must be a JSON object"]}
@@ -0,0 +1,84 @@
+from datetime import datetime
+
+
+def post_contacts(client, contact_payload, count):
+    ids = []
+    for i in range(count):
+        response = client.post("/api/contact", json=contact_payload(i))
+        assert response.status_code == 200
+        ids.append(response.json()["id"])
+    return ids
+
+
+def test_cursor_pages_through_every_submission_once(client, contact_payload):
+    ids = post_contacts(client, contact_payload, 5)
+
+    seen = []
+    cursor = None
+    while True:
+        params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+        response = client.get("/api/contact", params=params)
+        assert response.status_code == 200
+        page = response.json()
+        assert len(page) <= 2
+        seen.extend(submission["id"] for submission in page)
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+
+    assert sorted(seen) == sorted(ids)
+    assert len(seen) == len(set(seen))
+
+
+def test_unchanged_list_is_answered_with_304_until_a_write(client, contact_payload):
+    post_contacts(client, contact_payload, 2)
+    first = client.get("/api/contact")
+    etag = first.headers["ETag"]
+
+    unchanged = client.get("/api/contact", headers={"If-None-Match": etag})
+    assert unchanged.status_code == 304
+
+    post_contacts(client, contact_payload, 1)
+    changed = client.get("/api/contact", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+    assert len(changed.json()) == 3
+
+
+def dated_submission(day, **fields):
+    return {
+        "id": f"dated-{day}",
+        "name": f"Dated {day}",
+        "email": f"dated{day}@example.com",
+        "organization": None,
+        "interest": "Other",
+        "message": "Stored with a fixed submission time.",
+        "submitted_at": datetime(2026, 1, day, 12, 0),
+        "status": "new",
+        "version": 1,
+        **fields,
+    }
+
+
+def test_filtered_pages_hold_only_matching_submissions(client, server):
+    for day in range(1, 8):
+        document = dated_submission(day, status="reviewed" if day % 2 else "new")
+        client.portal.call(server.datastore.contacts.insert, document)
+    # submitted_after is inclusive, submitted_before exclusive
+    params = {"status": "reviewed", "submitted_after": "2026-01-03T12:00:00", "submitted_before": "2026-01-07T12:00:00"}
+
+    seen = []
+    cursor = None
+    while True:
+        response = client.get("/api/contact", params={**params, "limit": 1, **({"cursor": cursor} if cursor else {})})
+        seen.extend(submission["name"] for submission in response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+
+    assert seen == ["Dated 5", "Dated 3"]
+    assert client.get("/api/contact", params={"interest": "Bulk orders"}).json() == []
+
+
+def test_malformed_cursor_is_rejected(client):
+    assert client.get("/api/contact", params={"cursor": "not-a-cursor"}).status_code == 400
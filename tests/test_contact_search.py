@@ -0,0 +1,59 @@
+import pytest
+
+SUBMISSIONS = {
+    "name": {"name": "Compost Champion", "organization": "Green Homes", "message": "Please send your catalogue."},
+    "organization": {"name": "Jane Doe", "organization": "Compost Collective", "message": "We run a community garden."},
+    "message": {"name": "Sam Lee", "organization": "Seed Swap", "message": "We would love to compost your pouches."},
+    "neither": {"name": "Alex Kim", "organization": "Paper Works", "message": "Interested in seed paper for events."},
+    "nor": {"name": "Robin Hart", "organization": "Café Verde", "message": "Do you offer bulk orders for shops?"},
+}
+
+
+@pytest.fixture
+def submissions(client, contact_payload):
+    ids = {}
+    for i, (key, fields) in enumerate(SUBMISSIONS.items()):
+        ids[key] = client.post("/api/contact", json=contact_payload(i, **fields)).json()["id"]
+    return ids
+
+
+def search(client, **params):
+    response = client.get("/api/contact/search", params=params)
+    assert response.status_code == 200
+    return response
+
+
+def test_name_matches_rank_above_organization_and_message_matches(client, submissions):
+    results = search(client, q="compost").json()
+
+    assert [result["id"] for result in results] == [submissions[key] for key in ("name", "organization", "message")]
+    scores = [result["score"] for result in results]
+    assert scores == sorted(scores, reverse=True)
+
+
+def test_any_word_of_the_query_matches_whatever_its_case(client, submissions):
+    results = search(client, q="JANE catalogue").json()
+
+    assert sorted(result["id"] for result in results) == sorted([submissions["organization"], submissions["name"]])
+
+
+def test_filters_and_pages(client, submissions):
+    client.patch(f"/api/contact/{submissions['message']}", json={"status": "reviewed"})
+
+    reviewed = search(client, q="compost", status="reviewed").json()
+    first = search(client, q="compost", limit=2)
+    last = search(client, q="compost", limit=2, offset=first.headers["X-Next-Offset"])
+
+    assert [result["id"] for result in reviewed] == [submissions["message"]]
+    assert [result["id"] for result in first.json() + last.json()] == [
+        submissions[key] for key in ("name", "organization", "message")
+    ]
+    assert "X-Next-Offset" not in last.headers
+
+
+def test_new_submissions_are_found_right_away(client, submissions, contact_payload):
+    assert search(client, q="worms").json() == []
+
+    created = client.post("/api/contact", json=contact_payload(9, message="Could your pouches hold worms for composting?"))
+
+    assert [result["id"] for result in search(client, q="worms").json()] == [created.json()["id"]]
@@ -0,0 +1,101 @@
+import asyncio
+from datetime import date, datetime, timedelta
+
+import rebuild_contact_stats
+from server import summarize_contact_stats
+from storage import engine_from_env
+
+
+def imported_submission(i, day, status="new", interest=None):
+    """A submission written straight to the repository, as the importer does, bypassing the rollup."""
+    return {
+        "id": f"imported-{i}",
+        "name": f"Imported {i}",
+        "email": f"imported{i}@example.com",
+        "organization": None,
+        "interest": interest,
+        "message": f"Imported submission number {i}.",
+        "submitted_at": datetime.combine(day, datetime.min.time()) + timedelta(hours=9),
+        "status": status,
+        "version": 1,
+    }
+
+
+# A Monday, the Wednesday after and the next Monday
+IMPORTED = [
+    imported_submission(1, date(2026, 3, 2), interest="Bulk orders"),
+    imported_submission(2, date(2026, 3, 4), status="responded", interest="Bulk orders"),
+    imported_submission(3, date(2026, 3, 9)),
+]
+
+
+def test_rollup_follows_submissions_and_status_changes(client, contact_payload):
+    ids = [
+        client.post("/api/contact", json=contact_payload(i, interest="Other" if i else "Bulk orders")).json()["id"]
+        for i in range(3)
+    ]
+    client.patch(f"/api/contact/{ids[0]}", json={"status": "reviewed"})
+    client.patch("/api/contact", json={"status": "responded", "ids": ids[1:]})
+    # Rollup days are UTC
+    today = datetime.utcnow().date()
+
+    stats = client.get("/api/contact/stats").json()
+
+    counts = {"total": 3, "by_status": {"responded": 2, "reviewed": 1}, "by_interest": {"Bulk orders": 1, "Other": 2}}
+    assert stats == {**counts, "period": "day", "series": [{"start": today.isoformat(), **counts}]}
+    later = client.get("/api/contact/stats", params={"since": (today + timedelta(days=1)).isoformat()}).json()
+    assert later["total"] == 0
+    assert later["series"] == []
+
+
+def test_rebuild_counts_submissions_written_around_the_rollup(engine):
+    async def scenario():
+        await engine.open()
+        try:
+            for document in IMPORTED:
+                await engine.contacts.insert(document)
+            missed = await engine.contact_stats.buckets()
+            rebuilt = await engine.contact_stats.rebuild()
+            return missed, rebuilt, await engine.contact_stats.buckets()
+        finally:
+            await engine.close()
+
+    missed, rebuilt, buckets = asyncio.run(scenario())
+
+    assert missed == []
+    assert rebuilt == len(buckets)
+    days = summarize_contact_stats(buckets, "day")
+    assert days["total"] == 3
+    assert days["by_status"] == {"new": 2, "responded": 1}
+    assert days["by_interest"] == {"Bulk orders": 2, "unspecified": 1}
+    assert [point["start"] for point in days["series"]] == ["2026-03-02", "2026-03-04", "2026-03-09"]
+    # Weeks start on Monday
+    weeks = summarize_contact_stats(buckets, "week")["series"]
+    assert [(point["start"], point["total"]) for point in weeks] == [("2026-03-02", 2), ("2026-03-09", 1)]
+
+
+def test_rebuild_script(tmp_path, monkeypatch):
+    monkeypatch.setenv("STORAGE_ENGINE", "sqlite")
+    monkeypatch.setenv("SQLITE_PATH", str(tmp_path / "greenloop.db"))
+
+    async def stored_buckets():
+        datastore = engine_from_env()
+        await datastore.open()
+        try:
+            return await datastore.contact_stats.buckets("2026-03-04", "2026-03-09")
+        finally:
+            await datastore.close()
+
+    async def import_submissions():
+        datastore = engine_from_env()
+        await datastore.open()
+        try:
+            await datastore.contacts.insert_many(IMPORTED)
+        finally:
+            await datastore.close()
+
+    asyncio.run(import_submissions())
+    asyncio.run(rebuild_contact_stats.main())
+
+    # since and until are inclusive
+    assert summarize_contact_stats(asyncio.run(stored_buckets()), "day")["total"] == 2
@@ -0,0 +1,77 @@
+from datetime import datetime
+
+
+def legacy_submission(submission_id):
+    """A submission stored before submissions were versioned."""
+    return {
+        "id": submission_id,
+        "name": "Legacy Tester",
+        "email": "legacy@example.com",
+        "organization": None,
+        "interest": None,
+        "message": "Stored before the status workflow existed.",
+        "submitted_at": datetime(2024, 1, 1),
+        "status": "new",
+    }
+
+
+def test_unversioned_submission_reads_as_version_one(client, server):
+    client.portal.call(server.datastore.contacts.insert, legacy_submission("legacy-1"))
+
+    assert client.get("/api/contact/legacy-1").json()["version"] == 1
+    assert [submission["version"] for submission in client.get("/api/contact").json()] == [1]
+
+    response = client.patch("/api/contact/legacy-1", json={"status": "reviewed", "version": 1})
+    assert response.status_code == 200
+    assert client.get("/api/contact/legacy-1").json()["version"] == 2
+
+
+def test_update_from_a_stale_version_conflicts(client, contact_payload):
+    submission_id = client.post("/api/contact", json=contact_payload(1)).json()["id"]
+
+    updated = client.patch(f"/api/contact/{submission_id}", json={"status": "reviewed", "version": 1})
+    stale = client.patch(f"/api/contact/{submission_id}", json={"status": "responded", "version": 1})
+
+    assert updated.status_code == 200
+    assert updated.json()["version"] == 2
+    assert stale.status_code == 409
+    assert client.get(f"/api/contact/{submission_id}").json()["status"] == "reviewed"
+
+
+def test_missing_submission(client):
+    assert client.get("/api/contact/missing").status_code == 404
+    assert client.patch("/api/contact/missing", json={"status": "reviewed"}).status_code == 404
+
+
+def test_unknown_status_is_rejected(client, contact_payload):
+    submission_id = client.post("/api/contact", json=contact_payload(1)).json()["id"]
+
+    assert client.patch(f"/api/contact/{submission_id}", json={"status": "archived"}).status_code == 422
+
+
+def test_bulk_update_by_ids_counts_only_changed_submissions(client, contact_payload):
+    ids = [client.post("/api/contact", json=contact_payload(i)).json()["id"] for i in range(3)]
+    client.patch(f"/api/contact/{ids[0]}", json={"status": "reviewed"})
+
+    response = client.patch("/api/contact", json={"status": "reviewed", "ids": ids + ["missing"]})
+
+    assert response.json() == {"success": True, "status": "reviewed", "updated": 2}
+    versions = {submission["id"]: submission["version"] for submission in client.get("/api/contact").json()}
+    # The submission already reviewed kept its version
+    assert versions == {ids[0]: 2, ids[1]: 2, ids[2]: 2}
+
+
+def test_bulk_update_by_filter(client, contact_payload):
+    for i in range(4):
+        client.post("/api/contact", json=contact_payload(i, interest="Bulk orders" if i % 2 else "Other"))
+
+    response = client.patch("/api/contact", json={"status": "responded", "filter": {"interest": "Bulk orders"}})
+
+    assert response.json()["updated"] == 2
+    responded = client.get("/api/contact", params={"status": "responded"}).json()
+    assert sorted(submission["name"] for submission in responded) == ["Tester 1", "Tester 3"]
+
+
+def test_bulk_update_needs_either_ids_or_filter(client):
+    assert client.patch("/api/contact", json={"status": "reviewed"}).status_code == 422
+    assert client.patch("/api/contact", json={"status": "reviewed", "ids": [], "filter": {}}).status_code == 422
@@ -0,0 +1,107 @@
+import asyncio
+import json
+
+import pytest
+
+from event_stream import EventBroker, SlowSubscriberError, SubscriberLimitError
+
+
+def events(frames):
+    """(id, event, data) of each SSE frame in ``frames``."""
+    parsed = []
+    for frame in frames.decode().split("\n\n"):
+        if not frame:
+            continue
+        fields = dict(line.split(": ", 1) for line in frame.split("\n"))
+        parsed.append((fields.get("id"), fields["event"], json.loads(fields["data"])))
+    return parsed
+
+
+def publish(broker, count, start=1):
+    return [broker.publish("created", {"id": f"submission-{i}"}) for i in range(start, start + count)]
+
+
+def test_resuming_replays_the_events_after_last_event_id():
+    async def scenario():
+        broker = EventBroker()
+        ids = publish(broker, 3)
+        subscription = broker.subscribe(ids[0])
+        replayed = await subscription.get(1)
+        publish(broker, 1, start=4)
+        return ids, replayed, await subscription.get(1)
+
+    ids, replayed, live = asyncio.run(scenario())
+
+    assert events(replayed) == [
+        (ids[1], "created", {"id": "submission-2"}),
+        (ids[2], "created", {"id": "submission-3"}),
+    ]
+    assert [data for _, _, data in events(live)] == [{"id": "submission-4"}]
+
+
+def test_resuming_from_the_latest_event_replays_nothing():
+    async def scenario():
+        broker = EventBroker()
+        ids = publish(broker, 2)
+        return await broker.subscribe(ids[-1]).get(0.01)
+
+    assert asyncio.run(scenario()) == b""
+
+
+@pytest.mark.parametrize("last_event_id", ["evicted", "00000000-1"])
+def test_resuming_from_an_event_no_longer_kept_sends_reset(last_event_id):
+    async def scenario():
+        broker = EventBroker(replay_size=2)
+        ids = publish(broker, 3)
+        if last_event_id == "evicted":
+            # Pushed out of the replay buffer by the later events
+            subscription = broker.subscribe(ids[0])
+        else:
+            # From before a restart
+            subscription = broker.subscribe(last_event_id)
+        return ids, await subscription.get(1), broker.stats()
+
+    ids, frames, stats = asyncio.run(scenario())
+
+    assert events(frames) == [(ids[-1], "reset", {})]
+    assert stats["resets"] == 1
+
+
+def test_a_subscriber_with_a_full_buffer_is_dropped():
+    async def scenario():
+        broker = EventBroker(client_buffer=2)
+        slow = broker.subscribe()
+        keeping_up = broker.subscribe()
+        publish(broker, 2)
+        await keeping_up.get(1)
+        publish(broker, 1, start=3)
+        with pytest.raises(SlowSubscriberError):
+            await slow.get(1)
+        return events(await keeping_up.get(1)), broker.stats()
+
+    delivered, stats = asyncio.run(scenario())
+
+    assert [data for _, _, data in delivered] == [{"id": "submission-3"}]
+    assert stats["dropped"] == 1
+    assert stats["subscribers"] == 1
+
+
+def test_subscribers_beyond_the_limit_are_refused():
+    broker = EventBroker(max_subscribers=2)
+    first = broker.subscribe()
+    broker.subscribe()
+
+    with pytest.raises(SubscriberLimitError):
+        broker.subscribe()
+    broker.unsubscribe(first)
+    broker.subscribe()
+    assert len(broker) == 2
+
+
+def test_stream_answers_503_at_the_subscriber_limit(client, server, monkeypatch):
+    monkeypatch.setattr(server, "contact_events", EventBroker(max_subscribers=0))
+
+    response = client.get("/api/contact/stream")
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "30"
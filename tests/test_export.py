@@ -0,0 +1,73 @@
+import asyncio
+import csv
+import io
+
+import pytest
+
+import export
+
+
+@pytest.fixture
+def submissions(client, contact_payload):
+    for i in range(5):
+        fields = {"interest": "Bulk orders" if i % 2 else "Other"}
+        if i == 4:
+            fields["organization"] = "=HYPERLINK(\"http://example.com\")"
+        assert client.post("/api/contact", json=contact_payload(i, **fields)).status_code == 200
+
+
+def test_csv_export(client, server, submissions):
+    response = client.get("/api/contact/export")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "text/csv; charset=utf-8"
+    assert response.headers["content-disposition"].startswith('attachment; filename="contact-submissions-')
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert list(rows[0]) == list(server.CONTACT_FIELDS)
+    assert [row["name"] for row in rows] == [f"Tester {i}" for i in range(4, -1, -1)]
+    # Cells a spreadsheet would run as a formula are escaped
+    assert rows[0]["organization"] == "'=HYPERLINK(\"http://example.com\")"
+    assert rows[0]["version"] == "1"
+
+
+def test_csv_export_filters(client, submissions):
+    rows = list(csv.DictReader(io.StringIO(client.get("/api/contact/export", params={"interest": "Bulk orders"}).text)))
+
+    assert [row["name"] for row in rows] == ["Tester 3", "Tester 1"]
+
+
+def test_parquet_export(client, server, submissions, monkeypatch):
+    pq = pytest.importorskip("pyarrow.parquet")
+    monkeypatch.setattr(server, "EXPORT_PARQUET_ROW_GROUP_SIZE", 2)
+
+    response = client.get("/api/contact/export", params={"format": "parquet"})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/vnd.apache.parquet"
+    parquet = pq.ParquetFile(io.BytesIO(response.content))
+    assert parquet.metadata.num_row_groups == 3
+    table = parquet.read()
+    assert table.schema == server.CONTACT_EXPORT_SCHEMA
+    assert table.column("name").to_pylist() == [f"Tester {i}" for i in range(4, -1, -1)]
+    assert table.column("version").to_pylist() == [1] * 5
+
+
+def test_csv_chunks_are_encoded_as_documents_arrive():
+    pulled = []
+
+    async def documents():
+        for i in range(5):
+            pulled.append(i)
+            yield {"id": str(i), "name": f"Tester {i}"}
+
+    async def scenario():
+        chunks = export.csv_chunks(documents(), ("id", "name"), rows_per_chunk=2)
+        first = await chunks.__anext__()
+        pulled_for_first = len(pulled)
+        return first, pulled_for_first, [chunk async for chunk in chunks]
+
+    first, pulled_for_first, rest = asyncio.run(scenario())
+
+    assert pulled_for_first == 2
+    assert first == b"id,name\r\n0,Tester 0\r\n1,Tester 1\r\n"
+    assert len(rest) == 2
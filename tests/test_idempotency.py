@@ -0,0 +1,109 @@
+import asyncio
+import time
+
+from starlette.testclient import TestClient
+
+
+def wait_until(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def test_retry_with_the_same_key_replays_the_original_response(client, contact_payload):
+    headers = {"Idempotency-Key": "retry-1"}
+
+    first = client.post("/api/contact", json=contact_payload(1), headers=headers)
+    retry = client.post("/api/contact", json=contact_payload(1), headers=headers)
+
+    assert first.status_code == retry.status_code == 200
+    assert retry.json()["id"] == first.json()["id"]
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert len(client.get("/api/contact").json()) == 1
+
+
+def test_key_reused_for_a_different_submission_is_rejected(client, contact_payload):
+    headers = {"Idempotency-Key": "reused-1"}
+    client.post("/api/contact", json=contact_payload(1), headers=headers)
+
+    response = client.post("/api/contact", json=contact_payload(2), headers=headers)
+
+    assert response.status_code == 422
+    assert len(client.get("/api/contact").json()) == 1
+
+
+def test_identical_submissions_without_a_key_are_both_stored(client, contact_payload):
+    client.post("/api/contact", json=contact_payload(1))
+    client.post("/api/contact", json=contact_payload(1))
+
+    assert len(client.get("/api/contact").json()) == 2
+
+
+def test_retry_during_a_failing_write_is_not_told_it_succeeded(client, server, contact_payload):
+    headers = {"Idempotency-Key": "concurrent-1"}
+
+    async def scenario():
+        import httpx
+
+        contacts = server.datastore.contacts
+        insert = contacts.insert
+        started, fail = asyncio.Event(), asyncio.Event()
+
+        async def slow_failing_insert(document, outbox=()):
+            started.set()
+            await fail.wait()
+            raise RuntimeError("datastore unavailable")
+
+        contacts.insert = slow_failing_insert
+        try:
+            async with httpx.AsyncClient(transport=httpx.ASGITransport(app=server.app), base_url="http://test") as http:
+                first = asyncio.create_task(http.post("/api/contact", json=contact_payload(1), headers=headers))
+                await started.wait()
+                retry = await http.post("/api/contact", json=contact_payload(1), headers=headers)
+                fail.set()
+                return await first, retry
+        finally:
+            contacts.insert = insert
+
+    first, retry = client.portal.call(scenario)
+
+    assert first.status_code == 500
+    assert retry.status_code == 409
+    assert retry.headers["Retry-After"] == "1"
+    # The failed write freed the key: the next retry is stored, not replayed
+    again = client.post("/api/contact", json=contact_payload(1), headers=headers)
+    assert again.status_code == 200
+    assert "Idempotent-Replayed" not in again.headers
+    assert [submission["id"] for submission in client.get("/api/contact").json()] == [again.json()["id"]]
+
+
+def test_failed_buffered_flush_frees_the_key(server, monkeypatch, contact_payload):
+    monkeypatch.setenv("STORAGE_ENGINE", "memory")
+    monkeypatch.setattr(server, "CONTACT_WRITE_MODE", "buffered")
+    monkeypatch.setattr(server, "CONTACT_WRITE_ACK", "enqueue")
+    monkeypatch.setattr(server, "CONTACT_BUFFER_FLUSH_INTERVAL_MS", 10)
+    headers = {"Idempotency-Key": "buffered-1"}
+    with TestClient(server.app) as client:
+        contacts = server.datastore.contacts
+        insert_many = contacts.insert_many
+        failed = []
+
+        async def failing_insert_many(documents, outbox=()):
+            failed.append(documents)
+            raise RuntimeError("datastore unavailable")
+
+        contacts.insert_many = failing_insert_many
+        # Acknowledged on enqueue, before the flush fails
+        assert client.post("/api/contact", json=contact_payload(1), headers=headers).status_code == 200
+        wait_until(lambda: failed)
+        contacts.insert_many = insert_many
+
+        # 409 until the failed flush has released the key, then stored anew
+        responses = []
+        wait_until(lambda: responses.append(client.post("/api/contact", json=contact_payload(1), headers=headers))
+                   or responses[-1].status_code != 409)
+
+        assert responses[-1].status_code == 200
+        assert "Idempotent-Replayed" not in responses[-1].headers
+        wait_until(lambda: len(client.get("/api/contact").json()) == 1)
@@ -0,0 +1,106 @@
+import argparse
+import asyncio
+from datetime import datetime
+
+import pandas as pd
+
+import import_contacts
+from storage import ContactFilters, engine_from_env
+
+CSV = """name,email,organization,interest,message
+Ada Lovelace,ada@example.com,Analytical Engines,Other,Interested in your seed paper range.
+B,bad-address,,Other,Too short
+Grace Hopper,grace@example.com,,Unknown interest,Looking into bulk orders for our office.
+Alan Turing,alan@example.com,,,Please send more details about the upcycled pouches.
+"""
+
+
+def test_invalid_rows_go_to_the_rejects_file(tmp_path, monkeypatch):
+    monkeypatch.setenv("STORAGE_ENGINE", "sqlite")
+    monkeypatch.setenv("SQLITE_PATH", str(tmp_path / "greenloop.db"))
+    source = tmp_path / "leads.csv"
+    source.write_text(CSV)
+    args = argparse.Namespace(path=str(source), format=None, rejects=None, chunk_size=2, batch_size=10,
+                              workers=1, dry_run=False)
+
+    asyncio.run(import_contacts.main(args))
+
+    rejects = pd.read_csv(tmp_path / "leads.csv.rejected.csv")
+    # Numbered from 1, not counting the header
+    assert list(rejects["row"]) == [2, 3]
+    assert "Name must be at least 2 characters long" in rejects["errors"][0]
+    assert "Message must be at least 10 characters long" in rejects["errors"][0]
+    assert "Interest must be one of" in rejects["errors"][1]
+
+    async def stored_names():
+        datastore = engine_from_env()
+        await datastore.open()
+        try:
+            return sorted(document["name"] for document in await datastore.contacts.list_page(ContactFilters(), 10))
+        finally:
+            await datastore.close()
+
+    assert asyncio.run(stored_names()) == ["Ada Lovelace", "Alan Turing"]
+
+
+JSONL = """{"id": "lead-1", "name": "Ada Lovelace", "email": "ada@example.com", "message": "Interested in your seed paper range.", "submitted_at": "2025-06-01T09:30:00Z", "status": "responded"}
+{"id": "lead-2", "name": 42, "email": "numbers@example.com", "message": "A name that is not a string."}
+{"id": "lead-3", "name": "Alan Turing", "email": "alan@example.com", "interest": "Bulk orders", "message": "Please send more details about the upcycled pouches."}
+"""
+
+
+def import_args(path, **options):
+    return argparse.Namespace(**{"path": str(path), "format": None, "rejects": None, "chunk_size": 10,
+                                 "batch_size": 10, "workers": 1, "dry_run": False, **options})
+
+
+def stored_submissions():
+    async def read():
+        datastore = engine_from_env()
+        await datastore.open()
+        try:
+            submissions = await datastore.contacts.list_page(ContactFilters(), 10)
+            return submissions, await datastore.contact_stats.buckets()
+        finally:
+            await datastore.close()
+
+    return asyncio.run(read())
+
+
+def test_jsonl_import_keeps_ids_times_and_statuses(tmp_path, monkeypatch):
+    monkeypatch.setenv("STORAGE_ENGINE", "sqlite")
+    monkeypatch.setenv("SQLITE_PATH", str(tmp_path / "greenloop.db"))
+    source = tmp_path / "leads.jsonl"
+    source.write_text(JSONL)
+
+    asyncio.run(import_contacts.main(import_args(source)))
+
+    submissions, buckets = stored_submissions()
+    ada = next(submission for submission in submissions if submission["id"] == "lead-1")
+    assert sorted(submission["id"] for submission in submissions) == ["lead-1", "lead-3"]
+    assert (ada["submitted_at"], ada["status"], ada["version"]) == (datetime(2025, 6, 1, 9, 30), "responded", 1)
+    # The analytics rollup counts imported submissions too
+    assert sum(bucket["count"] for bucket in buckets if bucket["dimension"] == "total") == 2
+    rejects = pd.read_csv(tmp_path / "leads.jsonl.rejected.csv")
+    assert list(rejects["row"]) == [2]
+    assert "name: Input should be a valid string" in rejects["errors"][0]
+
+    # Importing the same file again stores nothing twice
+    asyncio.run(import_contacts.main(import_args(source)))
+
+    assert len(stored_submissions()[0]) == 2
+    rejects = pd.read_csv(tmp_path / "leads.jsonl.rejected.csv")
+    assert list(rejects["row"]) == [1, 2, 3]
+    assert rejects["errors"][0].startswith("id: ")
+
+
+def test_dry_run_only_writes_the_rejects_file(tmp_path, monkeypatch):
+    monkeypatch.setenv("STORAGE_ENGINE", "sqlite")
+    monkeypatch.setenv("SQLITE_PATH", str(tmp_path / "greenloop.db"))
+    source = tmp_path / "leads.csv"
+    source.write_text(CSV)
+
+    asyncio.run(import_contacts.main(import_args(source, dry_run=True, rejects=str(tmp_path / "rejects.csv"))))
+
+    assert list(pd.read_csv(tmp_path / "rejects.csv")["row"]) == [2, 3]
+    assert stored_submissions() == ([], [])
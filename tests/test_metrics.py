@@ -0,0 +1,25 @@
+import re
+
+from storage.memory import MemoryRateLimitRepository
+
+
+def request_count(metrics_text, method, route, status):
+    pattern = (
+        r'^greenloop_http_request_duration_seconds_count\{method="%s",route="%s",status="%s"\} (\S+)$'
+        % (method, re.escape(route), status)
+    )
+    match = re.search(pattern, metrics_text, re.MULTILINE)
+    return float(match.group(1)) if match else 0.0
+
+
+def test_throttled_requests_are_counted(client, server, monkeypatch, contact_payload):
+    monkeypatch.setattr(server.rate_limiter, "enabled", True)
+    monkeypatch.setattr(server.rate_limiter, "store", MemoryRateLimitRepository())
+    before = client.get("/api/metrics").text
+
+    statuses = [client.post("/api/contact", json=contact_payload(i)).status_code for i in range(8)]
+
+    assert statuses == [200] * 5 + [429] * 3
+    after = client.get("/api/metrics").text
+    assert request_count(after, "POST", "/api/contact", "429") - request_count(before, "POST", "/api/contact", "429") == 3
+    assert request_count(after, "POST", "/api/contact", "200") - request_count(before, "POST", "/api/contact", "200") == 5
@@ -0,0 +1,53 @@
+import json
+
+import pytest
+
+
+@pytest.fixture
+def small_batches(server, monkeypatch):
+    # Several repository batches per stream, so batch boundaries are crossed
+    monkeypatch.setattr(server, "STREAM_BATCH_SIZE", 2)
+
+
+def ndjson(response):
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+def test_contact_list_streams_every_matching_submission(client, contact_payload, small_batches):
+    for i in range(5):
+        client.post("/api/contact", json=contact_payload(i, interest="Other" if i % 2 else "Bulk orders"))
+
+    streamed = ndjson(client.get("/api/contact", params={"stream": 1, "limit": 1}))
+    listed = client.get("/api/contact").json()
+    bulk = ndjson(client.get("/api/contact", params={"interest": "Bulk orders"},
+                             headers={"Accept": "application/x-ndjson"}))
+
+    # Newest first, like the JSON list, and not cut off at limit
+    assert streamed == listed
+    assert [submission["name"] for submission in bulk] == ["Tester 4", "Tester 2", "Tester 0"]
+
+
+def test_contact_stream_resumes_after_a_cursor(client, contact_payload, small_batches):
+    for i in range(5):
+        client.post("/api/contact", json=contact_payload(i))
+    first_page = client.get("/api/contact", params={"limit": 2})
+
+    rest = ndjson(client.get("/api/contact", params={"stream": 1, "cursor": first_page.headers["X-Next-Cursor"]}))
+
+    assert [submission["name"] for submission in first_page.json() + rest] == [f"Tester {i}" for i in range(4, -1, -1)]
+
+
+def test_status_checks_stream_in_the_order_they_were_recorded(client, small_batches):
+    for name in ("alpha", "beta", "gamma"):
+        client.post("/api/status", json={"client_name": name})
+
+    streamed = ndjson(client.get("/api/status", headers={"Accept": "application/x-ndjson"}))
+
+    assert [check["client_name"] for check in streamed] == ["alpha", "beta", "gamma"]
+    assert set(streamed[0]) == {"id", "client_name", "timestamp"}
+
+
+def test_empty_stream(client):
+    assert ndjson(client.get("/api/contact", params={"stream": 1})) == []
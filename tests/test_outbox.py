@@ -0,0 +1,246 @@
+"""OutboxWorker delivering contact notifications to a local SMTP server, on the in-memory and SQLite engines."""
+
+import asyncio
+import email
+import socket
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+aiosmtpd_controller = pytest.importorskip("aiosmtpd.controller")
+
+import outbox  # noqa: E402
+from notifications import CONTACT_SUBMITTED, ContactEmailHandler, SMTPMailer, contact_notification  # noqa: E402
+from outbox import OutboxWorker  # noqa: E402
+
+ACCEPTED = "250 Message accepted for delivery"
+
+
+class Inbox:
+    """aiosmtpd handler answering every email with ``reply``, keeping those it accepts."""
+
+    def __init__(self):
+        self.reply = ACCEPTED
+        self.emails = []
+
+    async def handle_DATA(self, server, session, envelope):
+        if self.reply == ACCEPTED:
+            self.emails.append(email.message_from_bytes(envelope.content))
+        return self.reply
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture
+def smtp():
+    inbox = Inbox()
+    controller = aiosmtpd_controller.Controller(inbox, hostname="127.0.0.1", port=free_port())
+    controller.start()
+    inbox.port = controller.port
+    yield inbox
+    controller.stop()
+
+
+def make_worker(engine, smtp, **options):
+    handler = ContactEmailHandler(SMTPMailer("127.0.0.1", smtp.port), "greenloop@localhost", ["team@example.com"])
+    return OutboxWorker(engine.outbox, {CONTACT_SUBMITTED: handler}, **options)
+
+
+async def submit(engine, i):
+    document = {
+        "id": f"submission-{i}",
+        "name": f"Tester {i}",
+        "email": f"tester{i}@example.com",
+        "organization": "Test Org",
+        "interest": "Other",
+        "message": f"Test submission number {i} for the contact form.",
+        "submitted_at": datetime.utcnow(),
+        "status": "new",
+        "version": 1,
+    }
+    await engine.contacts.insert(document, outbox=[contact_notification(document)])
+
+
+def run(engine, smtp, scenario, **options):
+    """Open ``engine`` and run ``scenario`` with a worker delivering its outbox to ``smtp``."""
+    async def main():
+        await engine.open()
+        try:
+            return await scenario(make_worker(engine, smtp, **options))
+        finally:
+            await engine.close()
+
+    return asyncio.run(main())
+
+
+def record_retries(engine):
+    """Wrap ``engine.outbox.retry`` to note how far ahead each retry was scheduled, in seconds."""
+    delays = []
+    retry = engine.outbox.retry
+
+    async def recording(message_id, next_attempt_at, error):
+        delays.append((next_attempt_at - datetime.utcnow()).total_seconds())
+        await retry(message_id, next_attempt_at, error)
+
+    engine.outbox.retry = recording
+    return delays
+
+
+def test_delivers_each_submission_as_an_email(engine, smtp):
+    async def scenario(worker):
+        for i in range(3):
+            await submit(engine, i)
+        claimed = await worker.run_once()
+        return claimed, await engine.outbox.counts(), worker.stats()
+
+    claimed, counts, stats = run(engine, smtp, scenario)
+
+    assert claimed == 3
+    assert counts["pending"] == 0
+    assert stats == {"delivered": 3, "retried": 0, "dead_lettered": 0}
+    assert sorted(message["Subject"] for message in smtp.emails) == [
+        f"New contact form submission from Tester {i}" for i in range(3)
+    ]
+    assert smtp.emails[0]["To"] == "team@example.com"
+
+
+def test_temporary_failures_are_retried_with_growing_backoff(engine, smtp):
+    smtp.reply = "451 Try again later"
+
+    async def scenario(worker):
+        delays = record_retries(engine)
+        await submit(engine, 1)
+        assert await worker.run_once() == 1
+        # Not due again until the backoff has passed
+        assert await worker.run_once() == 0
+        await asyncio.sleep(0.25)
+        assert await worker.run_once() == 1
+        await asyncio.sleep(0.45)
+        smtp.reply = ACCEPTED
+        assert await worker.run_once() == 1
+        return delays, await engine.outbox.counts(), worker.stats()
+
+    delays, counts, stats = run(engine, smtp, scenario, retry_base=0.2)
+
+    assert counts["pending"] == 0
+    assert len(smtp.emails) == 1
+    assert stats == {"delivered": 1, "retried": 2, "dead_lettered": 0}
+    # Attempt n waits between half and all of retry_base * 2 ** (n - 1)
+    assert 0.09 <= delays[0] <= 0.2
+    assert 0.19 <= delays[1] <= 0.4
+
+
+def test_permanent_smtp_errors_are_dead_lettered(engine, smtp):
+    smtp.reply = "550 Mailbox unavailable"
+
+    async def scenario(worker):
+        await submit(engine, 1)
+        await worker.run_once()
+        return await engine.outbox.counts(), worker.stats()
+
+    counts, stats = run(engine, smtp, scenario)
+
+    assert counts["dead"] == 1
+    assert counts["pending"] == 0
+    assert stats == {"delivered": 0, "retried": 0, "dead_lettered": 1}
+
+
+def test_messages_are_dead_lettered_after_max_attempts(engine, smtp):
+    smtp.reply = "451 Try again later"
+
+    async def scenario(worker):
+        await submit(engine, 1)
+        await worker.run_once()
+        await asyncio.sleep(0.1)
+        await worker.run_once()
+        await asyncio.sleep(0.1)
+        # Dead messages are never claimed again
+        assert await worker.run_once() == 0
+        return await engine.outbox.counts(), worker.stats()
+
+    counts, stats = run(engine, smtp, scenario, max_attempts=2, retry_base=0.05)
+
+    assert counts["dead"] == 1
+    assert smtp.emails == []
+    assert stats == {"delivered": 0, "retried": 1, "dead_lettered": 1}
+
+
+def test_messages_of_a_lost_worker_are_claimed_again_once_the_lease_expires(engine, smtp):
+    async def scenario(worker):
+        await submit(engine, 1)
+        # A worker that claimed the message and died before delivering it
+        now = datetime.utcnow()
+        assert len(await engine.outbox.claim(10, now, now + timedelta(seconds=0.2))) == 1
+        assert await worker.run_once() == 0
+        await asyncio.sleep(0.25)
+        return await worker.run_once()
+
+    assert run(engine, smtp, scenario) == 1
+    assert len(smtp.emails) == 1
+
+
+async def wait_for_email(smtp, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not smtp.emails and time.monotonic() < deadline:
+        await asyncio.sleep(0.01)
+
+
+def test_notified_workers_deliver_until_closed(engine, smtp):
+    async def scenario(worker):
+        worker.start()
+        # Let the workers find the outbox empty and go idle
+        await asyncio.sleep(0.05)
+        await submit(engine, 1)
+        worker.notify()
+        await wait_for_email(smtp)
+        await worker.close()
+        return worker.stats()
+
+    stats = run(engine, smtp, scenario, concurrency=2, poll_interval=30, linger=0)
+
+    assert len(smtp.emails) == 1
+    assert stats["delivered"] == 1
+
+
+def test_notify_racing_the_poll_timeout(engine, smtp, monkeypatch):
+    async def scenario(worker):
+        async def notified_as_it_times_out(awaitable, timeout):
+            awaitable.close()
+            worker.notify()
+            raise asyncio.TimeoutError
+
+        monkeypatch.setattr(outbox.asyncio, "wait_for", notified_as_it_times_out)
+        await worker._wait_for_work()
+        return list(worker._idle)
+
+    assert run(engine, smtp, scenario) == []
+
+
+def test_workers_survive_errors_while_idle(engine, smtp):
+    failures = []
+
+    async def scenario(worker):
+        wait_for_work = worker._wait_for_work
+
+        async def failing_once():
+            if not failures:
+                failures.append(True)
+                raise RuntimeError("wakeup lost")
+            await wait_for_work()
+
+        worker._wait_for_work = failing_once
+        worker.start()
+        await asyncio.sleep(0.05)
+        await submit(engine, 1)
+        await wait_for_email(smtp)
+        await worker.close()
+
+    run(engine, smtp, scenario, concurrency=1, poll_interval=0.01, linger=0)
+
+    assert failures
+    assert len(smtp.emails) == 1
@@ -0,0 +1,58 @@
+import asyncio
+
+from storage import mongo_options_from_env
+
+
+def test_liveness_and_readiness(client):
+    assert client.get("/api/healthz").json() == {"status": "ok"}
+
+    ready = client.get("/api/readyz")
+    assert ready.status_code == 200
+    assert ready.json()["status"] == "ready"
+    assert set(ready.json()["startup_ms"]) == {"open_ms", "warm_up_ms", "total_ms"}
+
+
+def test_not_ready_outside_the_lifespan(server):
+    from starlette.testclient import TestClient
+
+    # Without entering the context manager the lifespan never runs
+    response = TestClient(server.app).get("/api/readyz")
+
+    assert response.status_code == 503
+
+
+def test_not_ready_when_the_datastore_is_slow(client, server, monkeypatch):
+    async def slow_ping():
+        await asyncio.sleep(1)
+
+    monkeypatch.setattr(server, "READINESS_TIMEOUT_MS", 20)
+    monkeypatch.setattr(server.datastore, "ping", slow_ping)
+
+    response = client.get("/api/readyz")
+
+    assert response.status_code == 503
+    assert response.json() == {"status": "unavailable", "reason": "No datastore reply within 20 ms"}
+    # Liveness does not depend on the datastore
+    assert client.get("/api/healthz").status_code == 200
+
+
+def test_not_ready_when_the_datastore_fails(client, server, monkeypatch):
+    async def failing_ping():
+        raise ConnectionError("connection refused")
+
+    monkeypatch.setattr(server.datastore, "ping", failing_ping)
+
+    response = client.get("/api/readyz")
+
+    assert response.status_code == 503
+    assert response.json()["reason"] == "Datastore unreachable"
+
+
+def test_mongo_pool_options_come_from_the_environment(monkeypatch):
+    monkeypatch.setenv("MONGO_MAX_POOL_SIZE", "50")
+    monkeypatch.setenv("MONGO_MIN_POOL_SIZE", "5")
+    monkeypatch.setenv("MONGO_COMPRESSORS", "zlib")
+
+    options = mongo_options_from_env()
+
+    assert (options["maxPoolSize"], options["minPoolSize"], options["compressors"]) == (50, 5, "zlib")
@@ -0,0 +1,61 @@
+import asyncio
+
+import httpx
+import pytest
+
+
+def concurrent_posts(server, contact_payload, count):
+    """POST ``count`` submissions while the datastore holds every write; returns the responses and how many writes started."""
+
+    async def scenario():
+        contacts = server.datastore.contacts
+        insert = contacts.insert
+        started, release = [], asyncio.Event()
+
+        async def held_insert(document, outbox=()):
+            started.append(document["id"])
+            await release.wait()
+            await insert(document, outbox)
+
+        contacts.insert = held_insert
+        try:
+            async with httpx.AsyncClient(transport=httpx.ASGITransport(app=server.app), base_url="http://test") as http:
+                posts = [asyncio.create_task(http.post("/api/contact", json=contact_payload(i))) for i in range(count)]
+                # Let every request either reach the datastore or be turned away
+                for _ in range(200):
+                    await asyncio.sleep(0.01)
+                    if len(started) + sum(post.done() for post in posts) == count:
+                        break
+                writes_started = len(started)
+                release.set()
+                return await asyncio.gather(*posts), writes_started
+        finally:
+            contacts.insert = insert
+
+    return scenario
+
+
+@pytest.fixture
+def one_write_at_a_time(server, monkeypatch):
+    # The per-IP buckets stay off, as in the default configuration
+    assert not server.rate_limiter.enabled
+    monkeypatch.setattr(server.rate_limiter, "max_in_flight", 1)
+
+
+def test_writes_beyond_the_concurrency_cap_are_rejected_without_rate_limiting(
+        client, server, contact_payload, one_write_at_a_time):
+    responses, writes_started = client.portal.call(concurrent_posts(server, contact_payload, 3))
+
+    assert writes_started == 1
+    assert sorted(response.status_code for response in responses) == [200, 429, 429]
+    assert all(response.headers["Retry-After"] == "1" for response in responses if response.status_code == 429)
+    assert server.rate_limiter.stats()["in_flight"] == 0
+
+
+def test_concurrency_cap_can_be_turned_off(client, server, contact_payload, one_write_at_a_time, monkeypatch):
+    monkeypatch.setattr(server.rate_limiter, "concurrency_enabled", False)
+
+    responses, writes_started = client.portal.call(concurrent_posts(server, contact_payload, 3))
+
+    assert writes_started == 3
+    assert [response.status_code for response in responses] == [200, 200, 200]
@@ -0,0 +1,46 @@
+from response_cache import ResponseCache
+
+
+def test_read_started_before_an_invalidation_is_not_stored():
+    cache = ResponseCache()
+    key = ResponseCache.key("contact", "/api/contact", "limit=10")
+    generation = cache.generation("contact")
+    # A write lands while the read is awaiting the datastore
+    cache.invalidate("contact")
+
+    entry = cache.put(key, b"[]", generation=generation)
+
+    assert entry.body == b"[]"
+    assert cache.get(key) is None
+
+
+def test_read_is_stored_when_only_another_namespace_changed():
+    cache = ResponseCache()
+    key = ResponseCache.key("contact", "/api/contact", "")
+    generation = cache.generation("contact")
+    cache.invalidate("status")
+
+    cache.put(key, b"[]", generation=generation)
+
+    assert cache.get(key).body == b"[]"
+
+
+def test_writes_invalidate_only_the_lists_they_change(client, server, contact_payload):
+    submission_id = client.post("/api/contact", json=contact_payload(1)).json()["id"]
+    client.post("/api/status", json={"client_name": "probe"})
+    contact_etag = client.get("/api/contact").headers["ETag"]
+    status_etag = client.get("/api/status").headers["ETag"]
+    hits = server.response_cache.stats()["hits"]
+
+    assert client.get("/api/contact").headers["ETag"] == contact_etag
+    assert server.response_cache.stats()["hits"] == hits + 1
+
+    client.post("/api/status", json={"client_name": "probe"})
+    assert client.get("/api/contact", headers={"If-None-Match": contact_etag}).status_code == 304
+    assert client.get("/api/status", headers={"If-None-Match": status_etag}).status_code == 200
+
+    # A status change alters the cached list as much as a new submission does
+    client.patch(f"/api/contact/{submission_id}", json={"status": "reviewed"})
+    changed = client.get("/api/contact", headers={"If-None-Match": contact_etag})
+    assert changed.status_code == 200
+    assert changed.json()[0]["status"] == "reviewed"
@@ -0,0 +1,127 @@
+"""Status check tiers: minute and hour summaries, retention per tier and the tier resolution=auto reads."""
+
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+T = datetime(2026, 3, 1, 10, 0)
+POINTS = [
+    ("a", T + timedelta(seconds=5)),
+    ("b", T + timedelta(seconds=20)),
+    ("a", T + timedelta(seconds=40)),
+    ("a", T + timedelta(minutes=1, seconds=10)),
+    ("a", T + timedelta(hours=1, minutes=15)),
+]
+
+
+def run(engine, scenario):
+    async def main():
+        await engine.open()
+        try:
+            for number, (client_name, timestamp) in enumerate(POINTS):
+                await engine.status_checks.insert({"id": f"check-{number}", "client_name": client_name, "timestamp": timestamp})
+            return await scenario(engine.status_checks)
+        finally:
+            await engine.close()
+
+    return asyncio.run(main())
+
+
+async def downsample(status_checks):
+    await status_checks.downsample("minute", T + timedelta(hours=1, minutes=16))
+    await status_checks.downsample("hour", T + timedelta(hours=2))
+
+
+def summary(client_name, bucket_start, count, first_seen, last_seen):
+    return {"client_name": client_name, "bucket_start": bucket_start, "count": count,
+            "first_seen": first_seen, "last_seen": last_seen}
+
+
+async def tiers(status_checks):
+    return (await status_checks.summaries("minute", 100), await status_checks.summaries("hour", 100))
+
+
+def test_minute_and_hour_summaries(engine):
+    async def scenario(status_checks):
+        await downsample(status_checks)
+        return await tiers(status_checks)
+
+    minutes, hours = run(engine, scenario)
+
+    assert minutes == [
+        summary("a", T + timedelta(hours=1, minutes=15), 1, POINTS[4][1], POINTS[4][1]),
+        summary("a", T + timedelta(minutes=1), 1, POINTS[3][1], POINTS[3][1]),
+        summary("b", T, 1, POINTS[1][1], POINTS[1][1]),
+        summary("a", T, 2, POINTS[0][1], POINTS[2][1]),
+    ]
+    assert hours == [
+        summary("a", T + timedelta(hours=1), 1, POINTS[4][1], POINTS[4][1]),
+        summary("b", T, 1, POINTS[1][1], POINTS[1][1]),
+        summary("a", T, 3, POINTS[0][1], POINTS[3][1]),
+    ]
+
+
+def test_downsampling_again_does_not_count_twice(engine):
+    late = T + timedelta(hours=1, minutes=15, seconds=30)
+
+    async def scenario(status_checks):
+        await downsample(status_checks)
+        first = await tiers(status_checks)
+        await downsample(status_checks)
+        unchanged = await tiers(status_checks)
+        # A point arriving in the newest bucket after it was summarised
+        await status_checks.insert({"id": "check-late", "client_name": "a", "timestamp": late})
+        await downsample(status_checks)
+        return first, unchanged, await tiers(status_checks)
+
+    first, unchanged, (minutes, hours) = run(engine, scenario)
+
+    assert unchanged == first
+    assert minutes[0] == summary("a", T + timedelta(hours=1, minutes=15), 2, POINTS[4][1], late)
+    assert minutes[1:] == first[0][1:]
+    assert hours[0] == summary("a", T + timedelta(hours=1), 2, POINTS[4][1], late)
+    assert hours[1:] == first[1][1:]
+
+
+@pytest.mark.parametrize("age, kept", [
+    (timedelta(days=1), ("raw", "minute", "hour")),
+    (timedelta(days=3), ("minute", "hour")),
+    (timedelta(days=31), ("hour",)),
+    (timedelta(days=401), ()),
+])
+def test_each_tier_is_purged_after_its_retention(engine, age, kept):
+    async def scenario(status_checks):
+        await downsample(status_checks)
+        await status_checks.purge(T + timedelta(hours=2) + age)
+        minutes, hours = await tiers(status_checks)
+        return {"raw": await status_checks.list(100), "minute": minutes, "hour": hours}
+
+    remaining = run(engine, scenario)
+
+    assert tuple(tier for tier, rows in remaining.items() if rows) == kept
+
+
+NOW = datetime(2026, 3, 10, 12, 0)
+
+
+@pytest.mark.parametrize("since, until, resolution", [
+    (None, None, "raw"),
+    (NOW - timedelta(minutes=30), None, "raw"),
+    (NOW - timedelta(hours=3), NOW - timedelta(hours=2), "raw"),
+    (NOW - timedelta(hours=2), None, "minute"),
+    # Short, but older than the raw retention
+    (NOW - timedelta(days=3), NOW - timedelta(days=3) + timedelta(minutes=30), "minute"),
+    (NOW - timedelta(days=2), None, "hour"),
+    # Short, but older than the minute retention
+    (NOW - timedelta(days=40), NOW - timedelta(days=40) + timedelta(minutes=30), "hour"),
+])
+def test_auto_resolution_picks_the_cheapest_tier_holding_the_range(server, since, until, resolution):
+    assert server.status_resolution(since, until, NOW) == resolution
+
+
+def test_auto_resolution_is_reported(client):
+    since = (datetime.utcnow() - timedelta(hours=6)).isoformat()
+
+    assert client.get("/api/status").headers["X-Resolution"] == "raw"
+    assert client.get("/api/status", params={"since": since}).headers["X-Resolution"] == "minute"
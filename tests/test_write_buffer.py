@@ -0,0 +1,168 @@
+"""WriteBuffer on its own against the in-memory and SQLite engines, and buffered POST /api/contact."""
+
+import asyncio
+import time
+from datetime import datetime
+
+import pytest
+from starlette.testclient import TestClient
+
+from storage import ContactFilters, create_engine
+from write_buffer import BufferFullError, WriteBuffer
+
+
+def contact_document(i):
+    return {
+        "id": f"submission-{i}",
+        "name": f"Tester {i}",
+        "email": f"tester{i}@example.com",
+        "organization": "Test Org",
+        "interest": "Other",
+        "message": f"Test submission number {i} for the contact form.",
+        "submitted_at": datetime.utcnow(),
+        "status": "new",
+        "version": 1,
+    }
+
+
+def run(engine, scenario):
+    """Open ``engine`` and run ``scenario`` with its contact repository, recording the size of each bulk insert."""
+    async def main():
+        await engine.open()
+        try:
+            contacts = engine.contacts
+            insert_many = contacts.insert_many
+            batches = []
+
+            async def recording(documents, *args):
+                batches.append(len(documents))
+                await insert_many(documents, *args)
+
+            contacts.insert_many = recording
+            return await scenario(contacts, batches)
+        finally:
+            await engine.close()
+
+    return asyncio.run(main())
+
+
+async def stored_ids(contacts):
+    return sorted(document["id"] for document in await contacts.list_page(ContactFilters(), 100))
+
+
+def test_flushes_as_soon_as_a_batch_is_full(engine):
+    async def scenario(contacts, batches):
+        buffer = WriteBuffer(contacts, max_batch=3, flush_interval=60)
+        buffer.start()
+        written = await asyncio.wait_for(
+            asyncio.gather(*(buffer.submit(contact_document(i)) for i in range(3))), 2
+        )
+        await buffer.close()
+        return written, batches
+
+    written, batches = run(engine, scenario)
+
+    assert written == ["submission-0", "submission-1", "submission-2"]
+    assert batches == [3]
+
+
+def test_flushes_a_partial_batch_after_the_interval(engine):
+    async def scenario(contacts, batches):
+        buffer = WriteBuffer(contacts, max_batch=100, flush_interval=0.1)
+        buffer.start()
+        started = time.monotonic()
+        futures = [buffer.submit(contact_document(i)) for i in range(2)]
+        await asyncio.sleep(0.02)
+        assert batches == []
+        await asyncio.gather(*futures)
+        waited = time.monotonic() - started
+        await buffer.close()
+        return waited, batches, await stored_ids(contacts)
+
+    waited, batches, stored = run(engine, scenario)
+
+    assert waited >= 0.1
+    assert batches == [2]
+    assert stored == ["submission-0", "submission-1"]
+
+
+def test_submit_fails_fast_when_the_queue_is_full(engine):
+    async def scenario(contacts, batches):
+        # Never started, so nothing drains the queue
+        buffer = WriteBuffer(contacts, max_queue=2)
+        buffer.submit(contact_document(1), wait=False)
+        buffer.submit(contact_document(2), wait=False)
+        with pytest.raises(BufferFullError):
+            buffer.submit(contact_document(3), wait=False)
+        return len(buffer)
+
+    assert run(engine, scenario) == 2
+
+
+def test_close_drains_pending_documents_and_refuses_new_ones(engine):
+    async def scenario(contacts, batches):
+        buffer = WriteBuffer(contacts, max_batch=2, flush_interval=60)
+        buffer.start()
+        for i in range(5):
+            buffer.submit(contact_document(i), wait=False)
+        await buffer.close()
+        with pytest.raises(BufferFullError):
+            buffer.submit(contact_document(5))
+        return batches, await stored_ids(contacts)
+
+    batches, stored = run(engine, scenario)
+
+    assert batches == [2, 2, 1]
+    assert stored == [f"submission-{i}" for i in range(5)]
+
+
+def test_failed_documents_fail_only_their_own_waiters(engine):
+    async def scenario(contacts, batches):
+        await contacts.insert(contact_document(2))
+        flushed = []
+
+        async def on_flush(documents):
+            flushed.extend(document["id"] for document in documents)
+
+        buffer = WriteBuffer(contacts, max_batch=3, flush_interval=60, on_flush=on_flush)
+        buffer.start()
+        futures = [buffer.submit(contact_document(i)) for i in range(1, 4)]
+        results = await asyncio.gather(*futures, return_exceptions=True)
+        await buffer.close()
+        return results, flushed
+
+    results, flushed = run(engine, scenario)
+
+    assert results[0] == "submission-1"
+    assert isinstance(results[1], RuntimeError)
+    assert results[2] == "submission-3"
+    assert flushed == ["submission-1", "submission-3"]
+
+
+def test_buffered_api_answers_503_when_full_and_drains_on_shutdown(server, monkeypatch, tmp_path, contact_payload):
+    database = tmp_path / "greenloop.db"
+    monkeypatch.setenv("STORAGE_ENGINE", "sqlite")
+    monkeypatch.setenv("SQLITE_PATH", str(database))
+    monkeypatch.setattr(server, "CONTACT_WRITE_MODE", "buffered")
+    monkeypatch.setattr(server, "CONTACT_WRITE_ACK", "enqueue")
+    monkeypatch.setattr(server, "CONTACT_BUFFER_MAX_QUEUE", 2)
+    monkeypatch.setattr(server, "CONTACT_BUFFER_FLUSH_INTERVAL_MS", 60000)
+
+    with TestClient(server.app) as client:
+        statuses = [client.post("/api/contact", json=contact_payload(i)).status_code for i in range(2)]
+        full = client.post("/api/contact", json=contact_payload(2))
+
+    assert statuses == [200, 200]
+    assert full.status_code == 503
+    assert full.headers["Retry-After"] == "1"
+
+    async def stored_names():
+        engine = create_engine("sqlite", sqlite_path=str(database))
+        await engine.open()
+        try:
+            return sorted(document["name"] for document in await engine.contacts.list_page(ContactFilters(), 10))
+        finally:
+            await engine.close()
+
+    # Shutting down flushed what was still queued
+    assert asyncio.run(stored_names()) == ["Tester 0", "Tester 1"]